@@ -0,0 +1,131 @@
+"""CSC111 Final Project: Twitter Engagement Aggregates
+
+Module Description
+==================
+This module maintains a per-user table of engagement aggregates (sum, count and maximum of likes, reposts,
+replies and their combined influence score) for a Twitter dataset.
+
+The table is computed once per DataFrame and shared by every view that ranks users by engagement, so those
+views no longer group the full dataset on every click. Top-N queries are answered with a partial sort of the
+table, and the table can be updated with a batch of new rows instead of being recomputed.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+import numpy as np
+import pandas as pd
+from preprocess import cached_for_frame
+
+USER_COL = "user_posted"
+ENGAGEMENT_COLUMNS = ["likes", "reposts", "replies"]
+INFLUENCE = "influence"
+AGGREGATED_METRICS = ENGAGEMENT_COLUMNS + [INFLUENCE]
+
+
+def get_user_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """Return the per-user aggregate table of df, computing it on first use only.
+
+    Preconditions:
+    - df contains 'user_posted', 'likes', 'reposts' and 'replies' columns
+    """
+    return cached_for_frame(df, "user_aggregates", build_user_aggregates)
+
+
+def build_user_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a table indexed by user with '<metric>_sum', '<metric>_count' and '<metric>_max' columns
+    for likes, reposts, replies and influence (likes + reposts + replies of each post).
+
+    Missing engagement values are skipped; '<metric>_count' is the number of posts with a value.
+    Posts without a user are left out.
+
+    Preconditions:
+    - df contains 'user_posted', 'likes', 'reposts' and 'replies' columns
+    """
+    # Widen compact int32 counts so that per-user totals cannot overflow
+    values = df[ENGAGEMENT_COLUMNS].astype({col: "int64" for col in ENGAGEMENT_COLUMNS if df[col].dtype.kind in "iu"})
+    values[INFLUENCE] = values.sum(axis=1)
+    grouped = values.groupby(df[USER_COL].rename(USER_COL), observed=True).agg(["sum", "count", "max"])
+    grouped.columns = [f"{metric}_{stat}" for metric, stat in grouped.columns]
+    return grouped
+
+
+def update_user_aggregates(table: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Return the aggregate table of the rows summarized by table together with the new rows in delta.
+
+    Preconditions:
+    - table was returned by build_user_aggregates or update_user_aggregates
+    - delta contains 'user_posted', 'likes', 'reposts' and 'replies' columns
+    """
+    delta_table = build_user_aggregates(delta)
+    users = table.index.union(delta_table.index)
+    old = table.reindex(users)
+    new = delta_table.reindex(users)
+
+    combined = pd.DataFrame(index=users)
+    for metric in AGGREGATED_METRICS:
+        for stat in ("sum", "count"):
+            column = f"{metric}_{stat}"
+            combined[column] = old[column].fillna(0).add(new[column].fillna(0)).astype(table[column].dtype)
+        column = f"{metric}_max"
+        maxima = np.fmax(old[column], new[column])
+        combined[column] = maxima if maxima.isna().any() else maxima.astype(table[column].dtype)
+    return combined
+
+
+def append_rows(df: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Return df with the rows of delta appended, carrying the aggregate table of df over to the new frame
+    by updating it with delta rather than recomputing it.
+
+    Preconditions:
+    - df and delta have the same columns
+    """
+    combined = pd.concat([df, delta], ignore_index=True)
+    table = update_user_aggregates(get_user_aggregates(df), delta)
+    cached_for_frame(combined, "user_aggregates", lambda _: table)
+    return combined
+
+
+def top_from_aggregates(table: pd.DataFrame, column: str, top_n: int) -> pd.Series:
+    """Return the top_n users with the highest value of column in table, in descending order.
+
+    Only the top_n entries are sorted; the rest of the table is partitioned around them.
+
+    Preconditions:
+    - column in table.columns
+    - top_n >= 0
+    """
+    values = table[column].to_numpy()
+    if top_n < len(values):
+        candidates = np.argpartition(-values, top_n)[:top_n] if top_n > 0 else np.zeros(0, dtype=np.intp)
+    else:
+        candidates = np.arange(len(values))
+    order = candidates[np.argsort(-values[candidates], kind="stable")]
+    return pd.Series(values[order], index=table.index[order], name=column)
+
+
+def top_users_by(df: pd.DataFrame, metric: str, top_n: int = 10) -> pd.Series:
+    """Return the top_n users of df by the total of metric, named after the metric.
+
+    Preconditions:
+    - metric in AGGREGATED_METRICS
+    - top_n >= 0
+    """
+    return top_from_aggregates(get_user_aggregates(df), f"{metric}_sum", top_n).rename(metric)
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['numpy', 'pandas', 'preprocess'],  # the names (strs) of imported modules
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
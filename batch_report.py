@@ -0,0 +1,287 @@
+"""CSC111 Final Project: Headless Batch Report
+
+Module Description
+==================
+This module renders every plotter view and the metrics tables of a dataset in one pass, without a display,
+so the daily report can be produced on a server or by a scheduled job instead of through the menu of main.py.
+
+The dataset is loaded once and every view is prepared in this process, so the parsed hashtag index and the
+per-user aggregates are shared by all views. The prepared data is then drawn and saved as PNG and/or SVG by a
+pool of worker processes using matplotlib's non-interactive Agg backend. A summary.json file lists the files
+written, the time spent on each view and the top-user and PageRank tables.
+
+With --stream, the dataset is not loaded at all: the views in STREAM_VIEWS are prepared while streaming the CSV
+through Space-Saving summaries of --capacity counters, and the summary reports HyperLogLog estimates of the
+number of distinct users, hashtags and mentioned users instead of the tables. Memory then stays flat however
+large the file is.
+
+Usage: python batch_report.py twitter-posts.csv --out report --formats png svg
+       python batch_report.py twitter-posts.csv --out report --stream --capacity 10000
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+import matplotlib
+
+matplotlib.use("Agg")  # must be selected before pyplot is imported by plotter
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import plotter
+from data_loader import load_cached_dataset
+from metrics import compute_pagerank, top_users
+from preprocess import parse_profile_names, split_tokens
+from sketches import HyperLogLog, SpaceSaving, stream_column_sketches
+
+IMAGE_FORMATS = ("png", "svg")
+DEFAULT_ENGAGEMENT_LIMIT = 1000
+TABLE_SIZE = 10
+DEFAULT_STREAM_CAPACITY = 10_000
+DISTINCT_PRECISION = 14
+# summary key -> (column of the CSV, cell parser) whose distinct tokens are estimated in a streamed report
+DISTINCT_COLUMNS: dict[str, tuple[str, Callable[[Any], list[str]]]] = {
+    "users": ("user_posted", split_tokens),
+    "hashtags": ("hashtags", split_tokens),
+    "mentioned_users": ("tagged_users", parse_profile_names),
+}
+
+# view name -> (prepare function, message when there is nothing to draw, [(file stem, draw function, draw options)])
+REPORT_VIEWS: dict[str, tuple[Callable[..., Any], str, list[tuple[str, str, dict]]]] = {
+    "user_hashtag_graph": (plotter.prepare_user_hashtag_graph, "No users found with relevant hashtag connections.",
+                           [("user_hashtag_graph", "draw_user_hashtag_graph", {})]),
+    "hashtag_cooccurrence": (plotter.prepare_hashtag_cooccurrence, "No hashtags to form connections.",
+                             [("hashtag_cooccurrence", "draw_hashtag_cooccurrence", {})]),
+    "engagement_distribution": (plotter.prepare_engagement_distribution, "No engagement data available.",
+                                [(f"engagement_{metric}", "draw_engagement_distribution",
+                                  {"metric": metric, "interactive": False})
+                                 for metric in plotter.ENGAGEMENT_METRICS]),
+    "reply_leaderboard": (plotter.prepare_reply_leaderboard, "No reply data available.",
+                          [("reply_leaderboard", "draw_reply_leaderboard", {})]),
+    "hashtag_wordcloud": (plotter.prepare_hashtag_wordcloud, "No hashtags available for word cloud.",
+                          [("hashtag_wordcloud", "draw_hashtag_wordcloud", {})]),
+    "top_mentioned_users": (plotter.prepare_top_mentioned_users, "No mentions found.",
+                            [("top_mentioned_users", "draw_top_mentioned_users", {})]),
+    "influence_scores": (plotter.prepare_influence_scores, "No influence data available.",
+                         [("influence_scores", "draw_influence_scores", {})]),
+}
+
+
+# view name -> (column of the CSV counted for the view, function preparing the view from its counts,
+#               message when there is nothing to draw, drawings)
+STREAM_VIEWS: dict[str, tuple[str, Callable[..., Any], str, list[tuple[str, str, dict]]]] = {
+    "hashtag_wordcloud": ("hashtags", plotter.prepare_counted_hashtag_wordcloud, "No hashtags available for word cloud.",
+                          [("hashtag_wordcloud", "draw_hashtag_wordcloud", {})]),
+    "top_mentioned_users": ("tagged_users", plotter.prepare_counted_top_mentioned_users, "No mentions found.",
+                            [("top_mentioned_users", "draw_top_mentioned_users", {})]),
+}
+
+
+def generate_report(file_path: str, out_dir: str, formats: tuple[str, ...] = ("png",), workers: Optional[int] = None,
+                    engagement_limit: int = DEFAULT_ENGAGEMENT_LIMIT) -> dict:
+    """Render every view in REPORT_VIEWS and the metrics tables of the dataset at file_path into out_dir,
+    write out_dir/summary.json and return its content.
+
+    Views with nothing to draw are listed in the summary with the message the plot would have printed.
+    workers is the number of rendering processes (by default one per CPU).
+
+    Preconditions:
+    - formats is non-empty and every entry is in IMAGE_FORMATS
+    - workers is None or workers > 0
+    - engagement_limit > 0
+    """
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    df = load_cached_dataset(file_path)
+    load_seconds = time.perf_counter() - start
+
+    views = {}
+    jobs = []
+    for name, (prepare, empty_message, drawings) in REPORT_VIEWS.items():
+        view_start = time.perf_counter()
+        prepared = _prepared_args(prepare(df, engagement_limit) if name == "engagement_distribution" else prepare(df))
+        _add_view(views, jobs, name, prepared, time.perf_counter() - view_start, empty_message, drawings)
+
+    tables = metrics_tables(df)
+    _render_views(views, jobs, out_dir, formats, workers)
+    return _write_summary(out_dir, {
+        "dataset": os.path.abspath(file_path),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "rows": len(df),
+        "load_seconds": load_seconds,
+        "total_seconds": time.perf_counter() - start,
+        "views": views,
+        "tables": tables,
+    })
+
+
+def generate_stream_report(file_path: str, out_dir: str, formats: tuple[str, ...] = ("png",),
+                           workers: Optional[int] = None, capacity: int = DEFAULT_STREAM_CAPACITY) -> dict:
+    """Render every view in STREAM_VIEWS of the CSV file at file_path into out_dir by streaming the file,
+    write out_dir/summary.json and return its content.
+
+    The file is read once, and each chunk updates every sketch: the counts behind the views are kept in
+    Space-Saving summaries of capacity counters, and the summary lists HyperLogLog estimates of the number of
+    distinct tokens of every entry of DISTINCT_COLUMNS with their relative standard error, so memory does not
+    grow with the file.
+
+    Preconditions:
+    - formats is non-empty and every entry is in IMAGE_FORMATS
+    - workers is None or workers > 0
+    - capacity > 0
+    """
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+
+    summaries = {name: SpaceSaving(capacity) for name in STREAM_VIEWS}
+    distinct_sketches = {key: HyperLogLog(DISTINCT_PRECISION) for key in DISTINCT_COLUMNS}
+    plan = [(column, split_tokens, [summaries[name]]) for name, (column, _, _, _) in STREAM_VIEWS.items()]
+    plan.extend((column, parse, [distinct_sketches[key]]) for key, (column, parse) in DISTINCT_COLUMNS.items())
+    stream_column_sketches(file_path, plan)
+    stream_seconds = time.perf_counter() - start
+
+    views = {}
+    jobs = []
+    for name, (_, prepare, empty_message, drawings) in STREAM_VIEWS.items():
+        view_start = time.perf_counter()
+        prepared = _prepared_args(prepare(summaries[name]))
+        _add_view(views, jobs, name, prepared, time.perf_counter() - view_start, empty_message, drawings)
+
+    distinct = {key: {"estimate": sketch.estimate(), "relative_error": sketch.relative_error}
+                for key, sketch in distinct_sketches.items()}
+    _render_views(views, jobs, out_dir, formats, workers)
+    return _write_summary(out_dir, {
+        "dataset": os.path.abspath(file_path),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "capacity": capacity,
+        "stream_seconds": stream_seconds,
+        "total_seconds": time.perf_counter() - start,
+        "views": views,
+        "distinct": distinct,
+    })
+
+
+def _add_view(views: dict, jobs: list, name: str, prepared: Optional[tuple], prepare_seconds: float,
+              empty_message: str, drawings: list[tuple[str, str, dict]]) -> None:
+    """Record the view name in views, and add a rendering job to jobs for each of its drawings unless there
+    is nothing to draw.
+    """
+    views[name] = {"prepare_seconds": prepare_seconds}
+    if prepared is None:
+        views[name]["skipped"] = empty_message
+        return
+    views[name]["files"] = []
+    jobs.extend((name, stem, draw, options, prepared) for stem, draw, options in drawings)
+
+
+def _render_views(views: dict, jobs: list, out_dir: str, formats: tuple[str, ...], workers: Optional[int]) -> None:
+    """Run every rendering job in jobs on a pool of workers processes, recording the files written and the
+    rendering time of each view in views.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(render_view, draw, prepared, options, os.path.join(out_dir, stem), formats)
+                   for _, stem, draw, options, prepared in jobs]
+        for (name, _, _, _, _), future in zip(jobs, futures):
+            files, render_seconds = future.result()
+            views[name]["files"].extend(os.path.basename(path) for path in files)
+            views[name]["render_seconds"] = views[name].get("render_seconds", 0.0) + render_seconds
+
+
+def _write_summary(out_dir: str, summary: dict) -> dict:
+    """Write summary to out_dir/summary.json and return it."""
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
+    return summary
+
+
+def metrics_tables(df: pd.DataFrame, top_n: int = TABLE_SIZE) -> dict[str, list[dict]]:
+    """Return the top top_n users of df by each engagement metric and by PageRank, as lists of
+    {'user': ..., 'value': ...} records in ranking order.
+
+    Preconditions:
+    - `top_n` > 0
+    """
+    tables = {f"top_users_by_{metric}": _records(top_users(df, metric, top_n))
+              for metric in plotter.ENGAGEMENT_METRICS}
+    tables["pagerank"] = _records(compute_pagerank(df, top_n))
+    return tables
+
+
+def render_view(draw: str, prepared: tuple, options: dict, path_stem: str,
+                formats: tuple[str, ...]) -> tuple[list[str], float]:
+    """Draw prepared with the plotter function named draw and save the figure as path_stem.<format> for every
+    format. Return the paths written and the time taken in seconds.
+
+    Runs in a worker process; the figure is closed once saved.
+    """
+    start = time.perf_counter()
+    fig = getattr(plotter, draw)(*prepared, **options)
+    paths = []
+    for image_format in formats:
+        paths.append(f"{path_stem}.{image_format}")
+        fig.savefig(paths[-1], format=image_format, bbox_inches="tight")
+    plt.close(fig)
+    return paths, time.perf_counter() - start
+
+
+def _prepared_args(prepared: Any) -> Optional[tuple]:
+    """Return the draw arguments for the result of a prepare_* function, or None if there is nothing to draw."""
+    if prepared is None or (isinstance(prepared, (pd.Series, pd.DataFrame)) and prepared.empty):
+        return None
+    return prepared if isinstance(prepared, tuple) else (prepared,)
+
+
+def _records(ranking: pd.Series) -> list[dict]:
+    """Return ranking as a list of {'user': ..., 'value': ...} records with plain Python values."""
+    return [{"user": str(user), "value": value} for user, value in zip(ranking.index, ranking.tolist())]
+
+
+if __name__ == "__main__":
+    if "--lint" in sys.argv:
+        import python_ta
+
+        python_ta.check_all(config={
+            'extra-imports': ['argparse', 'json', 'os', 'sys', 'time', 'concurrent.futures', 'datetime', 'typing',
+                              'matplotlib', 'matplotlib.pyplot', 'pandas', 'plotter', 'data_loader', 'metrics',
+                              'preprocess', 'sketches'],
+            'allowed-io': ['_write_summary'],     # the names (strs) of functions that call print/open/input
+            'max-line-length': 130
+        })
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Render every view and metrics table of a dataset without a display.")
+    parser.add_argument("dataset", nargs="?", default="twitter-posts.csv", help="CSV file of posts")
+    parser.add_argument("--out", default="report", help="directory to write the images and summary.json to")
+    parser.add_argument("--formats", nargs="+", choices=IMAGE_FORMATS, default=["png"], help="image formats to write")
+    parser.add_argument("--workers", type=int, default=None, help="number of rendering processes")
+    parser.add_argument("--engagement-limit", type=int, default=DEFAULT_ENGAGEMENT_LIMIT,
+                        help="value at which the engagement histograms are clipped")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream the CSV through sketches and render only the views in STREAM_VIEWS")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_STREAM_CAPACITY,
+                        help="number of Space-Saving counters per streamed view")
+    arguments = parser.parse_args()
+
+    if arguments.stream:
+        report = generate_stream_report(arguments.dataset, arguments.out, tuple(arguments.formats), arguments.workers,
+                                        arguments.capacity)
+    else:
+        report = generate_report(arguments.dataset, arguments.out, tuple(arguments.formats), arguments.workers,
+                                 arguments.engagement_limit)
+    print(f"Wrote {sum(len(view.get('files', [])) for view in report['views'].values())} files and summary.json "
+          f"to {arguments.out} in {report['total_seconds']:.1f} s.")
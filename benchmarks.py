@@ -0,0 +1,376 @@
+"""CSC111 Final Project: Twitter Pipeline Benchmarks
+
+Module Description
+==================
+This module generates synthetic Twitter datasets and times parts of the analysis pipeline on them, so that
+performance changes can be measured without the real dataset.
+
+The graph builder benchmark compares the vectorized builders in graph_builder against reference copies of the
+original row-by-row (iterrows) implementations, checks that both produce identical graphs, and reports rows/sec.
+
+The pipeline benchmark writes a synthetic CSV of each requested size (users, mentions and hashtags follow
+power laws whose exponent can be set) and times every stage on it: loading, parsing the TagIndex, the three
+graph builders, PageRank and the data preparation of every plotter view, with the peak traced memory of each.
+The results are written to a JSON file named after the current git commit, and compare_benchmarks prints the
+per-stage speedups between two such files. Everything runs in a temporary directory with matplotlib's Agg
+backend, so no display, network or existing cache is used.
+
+Usage: python benchmarks.py --rows 10000 100000 1000000
+       python benchmarks.py --compare benchmark_results/OLD.json benchmark_results/NEW.json
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+import matplotlib
+
+matplotlib.use("Agg")  # must be selected before pyplot is imported by plotter
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import graph_builder
+import plotter
+from data_loader import load_dataset, measure_load
+from layouts import clear_layout_cache
+from metrics import compute_pagerank
+from preprocess import build_tag_index, cached_for_frame, get_tag_index
+
+BENCHMARK_DIR = "benchmark_results"
+SYNTHETIC_START = pd.Timestamp("2025-01-01", tz="UTC")
+SYNTHETIC_CHUNK_ROWS = 500_000
+DEFAULT_ROW_COUNTS = (10_000, 100_000)
+
+# stage name -> function of the compact frame that runs the stage
+FRAME_STAGES: dict[str, Callable[[pd.DataFrame], Any]] = {
+    "tag_index": get_tag_index,
+    "build_interaction_graph": graph_builder.build_interaction_graph,
+    "build_retweet_graph": graph_builder.build_retweet_graph,
+    "build_reply_graph": graph_builder.build_reply_graph,
+    "compute_pagerank": compute_pagerank,
+    "prepare_user_hashtag_graph": plotter.prepare_user_hashtag_graph,
+    "prepare_hashtag_cooccurrence": plotter.prepare_hashtag_cooccurrence,
+    "prepare_engagement_distribution": lambda df: plotter.prepare_engagement_distribution(df, 1000),
+    "prepare_reply_leaderboard": plotter.prepare_reply_leaderboard,
+    "prepare_hashtag_wordcloud": plotter.prepare_hashtag_wordcloud,
+    "prepare_top_mentioned_users": plotter.prepare_top_mentioned_users,
+    "prepare_influence_scores": plotter.prepare_influence_scores,
+}
+
+
+def synthetic_tweets(n_rows: int, n_users: int = 5000, n_hashtags: int = 2000, seed: int = 0,
+                     exponent: float = 1.5, days: int = 30, first_id: int = 0) -> pd.DataFrame:
+    """Return a synthetic dataset in the layout of the compact loader.
+
+    Posting users, mentioned users and hashtags are drawn from Zipf distributions with the given exponent
+    (larger means more skewed), and each tweet has between 0 and 3 mentions and between 0 and 4 hashtags.
+    Posts are numbered from first_id and posted at times spread uniformly over days days from SYNTHETIC_START.
+
+    Preconditions:
+    - n_rows >= 0 and n_users > 0 and n_hashtags > 0
+    - exponent > 1 and days > 0
+    """
+    rng = np.random.default_rng(seed)
+    users = np.array([f"user{i}" for i in range(n_users)], dtype=object)
+    mention_cells = np.array([json.dumps({"profile_name": user}) for user in users], dtype=object)
+    hashtags = np.array([f"#tag{i}" for i in range(n_hashtags)], dtype=object)
+
+    def zipf_codes(size: int, n_values: int) -> np.ndarray:
+        """Draw size codes below n_values, favouring small codes with a power-law tail."""
+        return (rng.zipf(exponent, size) - 1) % n_values
+
+    mention_counts = rng.integers(0, 4, n_rows)
+    hashtag_counts = rng.integers(0, 5, n_rows)
+    tagged_users = _joined_cells(mention_counts, mention_cells[zipf_codes(int(mention_counts.sum()), n_users)], "[", "]")
+    hashtag_cells = _joined_cells(hashtag_counts, hashtags[zipf_codes(int(hashtag_counts.sum()), n_hashtags)], "", "")
+    seconds = np.sort(rng.integers(0, days * 86_400, n_rows))
+
+    return pd.DataFrame({
+        "user_posted": pd.Categorical(users[zipf_codes(n_rows, n_users)]),
+        "id": pd.Series(np.arange(first_id, first_id + n_rows).astype(str), dtype=object),
+        "date_posted": SYNTHETIC_START + pd.to_timedelta(seconds, unit="s"),
+        "likes": rng.poisson(40, n_rows).astype(np.int32),
+        "reposts": rng.poisson(8, n_rows).astype(np.int32),
+        "replies": rng.poisson(4, n_rows).astype(np.int32),
+        "hashtags": pd.Series(hashtag_cells, dtype=object),
+        "tagged_users": pd.Series(tagged_users, dtype=object),
+    })
+
+
+def _joined_cells(counts: np.ndarray, tokens: np.ndarray, prefix: str, suffix: str) -> np.ndarray:
+    """Return one cell per entry of counts joining the next counts[i] tokens with ', ' between prefix and
+    suffix, or NaN where counts[i] is 0.
+
+    Preconditions:
+    - len(tokens) == counts.sum()
+    """
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    cells = np.full(len(counts), prefix, dtype=object)
+    for position in range(int(counts.max()) if len(counts) > 0 else 0):
+        has = counts > position
+        cells[has] = cells[has] + (", " if position > 0 else "") + tokens[starts[has] + position]
+    cells = cells + suffix
+    cells[counts == 0] = np.nan
+    return cells
+
+
+def write_synthetic_csv(file_path: str, n_rows: int, chunk_rows: int = SYNTHETIC_CHUNK_ROWS, seed: int = 0,
+                        **options: Any) -> None:
+    """Write a synthetic dataset of n_rows rows to a CSV file at file_path, generated chunk_rows rows at a
+    time so that datasets of any size can be written. options are passed on to synthetic_tweets.
+
+    Preconditions:
+    - n_rows >= 0 and chunk_rows > 0
+    """
+    for number, first in enumerate(range(0, max(n_rows, 1), chunk_rows)):
+        chunk = synthetic_tweets(min(chunk_rows, n_rows - first), seed=seed + number, first_id=first, **options)
+        chunk.to_csv(file_path, mode="w" if number == 0 else "a", header=number == 0, index=False)
+
+
+def legacy_interaction_graph(df: pd.DataFrame) -> nx.Graph:
+    """Reference copy of the original row-by-row build_interaction_graph."""
+    interaction_graph = nx.Graph()
+    for _, row in df.iterrows():
+        user = row["user_posted"]
+        try:
+            mentions = json.loads(row["tagged_users"])
+            if isinstance(mentions, list):
+                for m in mentions:
+                    if isinstance(m, dict) and 'profile_name' in m:
+                        interaction_graph.add_edge(user, m['profile_name'])
+        except TypeError:
+            continue
+    return interaction_graph
+
+
+def legacy_retweet_graph(df: pd.DataFrame) -> nx.DiGraph:
+    """Reference copy of the original row-by-row build_retweet_graph."""
+    retweet_graph = nx.DiGraph()
+    for _, row in df.iterrows():
+        for tagged_user in str(row["tagged_users"]).split(','):
+            tagged_user = tagged_user.strip()
+            if tagged_user and tagged_user != 'nan':
+                retweet_graph.add_edge(tagged_user, row["user_posted"])
+    return retweet_graph
+
+
+def legacy_reply_graph(df: pd.DataFrame) -> nx.DiGraph:
+    """Reference copy of the original row-by-row build_reply_graph."""
+    reply_graph = nx.DiGraph()
+    for _, row in df.iterrows():
+        for reply in str(row['replies']).split(','):
+            reply = reply.strip()
+            if reply and reply != 'nan':
+                reply_graph.add_edge(row["user_posted"], reply)
+    return reply_graph
+
+
+def same_graph(first: nx.Graph, second: nx.Graph) -> bool:
+    """Return whether the two graphs have the same nodes and edges, in the same insertion order."""
+    return (first.is_directed() == second.is_directed() and list(first.nodes) == list(second.nodes)
+            and list(first.edges) == list(second.edges))
+
+
+def benchmark_graph_builders(n_rows: int = 50_000, seed: int = 0) -> dict[str, dict[str, float]]:
+    """Time the original and vectorized graph builders on a synthetic dataset of n_rows rows.
+
+    The vectorized timings include building the shared TagIndex, since a fresh frame has to be parsed once.
+    Return a mapping from builder name to its rows/sec before and after, and print a summary table.
+
+    Preconditions:
+    - n_rows > 0
+    """
+    df = synthetic_tweets(n_rows, seed=seed)
+    start = time.perf_counter()
+    cached_for_frame(df, "tag_index", build_tag_index)
+    index_seconds = time.perf_counter() - start
+
+    builders = [
+        ("interaction", legacy_interaction_graph, graph_builder.build_interaction_graph, index_seconds),
+        ("retweet", legacy_retweet_graph, graph_builder.build_retweet_graph, index_seconds),
+        ("reply", legacy_reply_graph, graph_builder.build_reply_graph, 0.0),
+    ]
+    results = {}
+    print(f"\n{'Builder':<14}{'Before (rows/s)':>18}{'After (rows/s)':>18}{'Speedup':>10}")
+    for name, legacy, vectorized, setup_seconds in builders:
+        start = time.perf_counter()
+        expected = legacy(df)
+        before = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = vectorized(df)
+        after = time.perf_counter() - start + setup_seconds
+        if not same_graph(expected, actual):
+            raise AssertionError(f"The vectorized {name} graph differs from the original implementation.")
+        results[name] = {"before_rows_per_sec": n_rows / before, "after_rows_per_sec": n_rows / after}
+        print(f"{name:<14}{n_rows / before:>18,.0f}{n_rows / after:>18,.0f}{before / after:>9.1f}x")
+    return results
+
+
+def benchmark_pipeline(n_rows: int, trace_memory: bool = True, **options: Any) -> dict[str, dict[str, float]]:
+    """Write a synthetic CSV of n_rows rows and time every stage of the pipeline on it, returning a mapping
+    from stage name to its 'seconds' and (if trace_memory) its 'peak_mb' of traced memory.
+
+    The stages are writing the CSV, load_dataset in full and compact mode, and then every stage of
+    FRAME_STAGES on the compact frame, in order, so later stages reuse the TagIndex as they do in the app.
+    Tracing memory slows the stages down; with trace_memory False only times are measured. options are
+    passed on to synthetic_tweets.
+
+    Preconditions:
+    - n_rows > 0
+    """
+    results = {}
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)  # keeps the dataset, graph snapshot and layout caches out of the real directories
+        try:
+            clear_layout_cache(None)
+            _run_stage(results, "write_csv", trace_memory, write_synthetic_csv, "tweets.csv", n_rows, **options)
+            _run_stage(results, "load_dataset", trace_memory, load_dataset, "tweets.csv")
+            df = _run_stage(results, "load_dataset_compact", trace_memory, load_dataset, "tweets.csv", compact=True)
+            for name, stage in FRAME_STAGES.items():
+                _run_stage(results, name, trace_memory, stage, df)
+        finally:
+            os.chdir(previous_dir)
+    return results
+
+
+def _run_stage(results: dict[str, dict[str, float]], name: str, trace_memory: bool, stage: Callable[..., Any],
+               *args: Any, **kwargs: Any) -> Any:
+    """Run stage(*args, **kwargs), record its time (and peak memory) under name in results and return its result."""
+    if trace_memory:
+        result, elapsed, peak = measure_load(stage, *args, **kwargs)
+        results[name] = {"seconds": elapsed, "peak_mb": peak / 2 ** 20}
+    else:
+        start = time.perf_counter()
+        result = stage(*args, **kwargs)
+        results[name] = {"seconds": time.perf_counter() - start}
+    return result
+
+
+def run_benchmarks(row_counts: tuple[int, ...] = DEFAULT_ROW_COUNTS, out_dir: str = BENCHMARK_DIR,
+                   trace_memory: bool = True, n_users: Optional[int] = None, n_hashtags: Optional[int] = None,
+                   exponent: float = 1.5, seed: int = 0) -> str:
+    """Run benchmark_pipeline for every row count, print the stage times and write them with the git commit
+    and environment to a JSON file in out_dir. Return the path of the file.
+
+    Unless given, the numbers of users and hashtags grow with the row count (a tenth and a fiftieth of it).
+
+    Preconditions:
+    - all(n_rows > 0 for n_rows in row_counts)
+    - exponent > 1
+    """
+    runs = []
+    for n_rows in row_counts:
+        options = {"n_users": n_users or max(1000, n_rows // 10), "n_hashtags": n_hashtags or max(500, n_rows // 50),
+                   "exponent": exponent, "seed": seed}
+        stages = benchmark_pipeline(n_rows, trace_memory, **options)
+        runs.append({"rows": n_rows, "options": options, "stages": stages})
+
+    commit, dirty = _git_commit()
+    summary = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__, "networkx": nx.__version__},
+        "trace_memory": trace_memory,
+        "runs": runs,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out_path = os.path.join(out_dir, f"{stamp}-{(commit or 'nogit')[:10]}{'-dirty' if dirty else ''}.json")
+    with open(out_path, "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
+
+    print(f"\n{'Stage':<34}" + "".join(f"{run['rows']:>14,}" for run in runs) + "   (seconds / peak MB)")
+    for name in runs[0]["stages"]:
+        cells = [run["stages"][name] for run in runs]
+        print(f"{name:<34}" + "".join(f"{cell['seconds']:>8.2f}" + (f"{cell['peak_mb']:>6.0f}" if "peak_mb" in cell
+                                                                     else " " * 6) for cell in cells))
+    print(f"Results written to {out_path}")
+    return out_path
+
+
+def _git_commit() -> tuple[Optional[str], bool]:
+    """Return the commit checked out in the directory of this module (None outside a git repository)
+    and whether there are uncommitted changes.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=here, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=here,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status.strip())
+
+
+def compare_benchmarks(old_path: str, new_path: str) -> None:
+    """Print the time of every stage in the benchmark results at old_path and new_path, and the speedup
+    from old to new, for every row count present in both.
+    """
+    with open(old_path, encoding="utf-8") as file:
+        old = json.load(file)
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)
+    old_runs = {run["rows"]: run["stages"] for run in old["runs"]}
+
+    print(f"\n{(old['commit'] or 'nogit')[:10]} -> {(new['commit'] or 'nogit')[:10]}")
+    print(f"{'Stage':<34}{'Rows':>12}{'Old (s)':>10}{'New (s)':>10}{'Speedup':>10}")
+    for run in new["runs"]:
+        if run["rows"] not in old_runs:
+            continue
+        for name, stage in run["stages"].items():
+            if name in old_runs[run["rows"]]:
+                before, after = old_runs[run["rows"]][name]["seconds"], stage["seconds"]
+                print(f"{name:<34}{run['rows']:>12,}{before:>10.3f}{after:>10.3f}{before / max(after, 1e-9):>9.2f}x")
+
+
+if __name__ == "__main__":
+    if "--lint" in sys.argv:
+        import python_ta
+
+        python_ta.check_all(config={
+            'extra-imports': ['argparse', 'json', 'os', 'platform', 'subprocess', 'sys', 'tempfile', 'time',
+                              'datetime', 'typing', 'matplotlib', 'networkx', 'numpy', 'pandas', 'graph_builder',
+                              'plotter', 'data_loader', 'layouts', 'metrics', 'preprocess'],
+            'allowed-io': ['benchmark_graph_builders', 'run_benchmarks', 'compare_benchmarks'],
+            'max-line-length': 130
+        })
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Time every stage of the pipeline on synthetic datasets.")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROW_COUNTS), help="dataset sizes to run")
+    parser.add_argument("--users", type=int, default=None, help="number of distinct users (default: rows / 10)")
+    parser.add_argument("--hashtags", type=int, default=None, help="number of distinct hashtags (default: rows / 50)")
+    parser.add_argument("--exponent", type=float, default=1.5, help="power-law exponent of users, mentions and hashtags")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the generator")
+    parser.add_argument("--out", default=BENCHMARK_DIR, help="directory to write the JSON results to")
+    parser.add_argument("--no-memory", action="store_true", help="time the stages without tracing memory")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files instead")
+    arguments = parser.parse_args()
+
+    if arguments.compare:
+        compare_benchmarks(*arguments.compare)
+    else:
+        run_benchmarks(tuple(arguments.rows), arguments.out, not arguments.no_memory, arguments.users,
+                       arguments.hashtags, arguments.exponent, arguments.seed)
@@ -0,0 +1,271 @@
+"""CSC111 Final Project: Centrality Suite
+
+Module Description
+==================
+This module computes several centrality measures of the mention graph that PageRank runs on (see
+metrics.compute_pagerank) and returns them as one table with a row per user.
+
+The graph is built (or loaded from its snapshot) once and shared by every measure. Each measure works directly on
+the CSR arrays of the CompactGraph, and independent measures run concurrently in worker processes. Betweenness,
+the most expensive, is computed with Brandes' algorithm on batches of source nodes at once (one sparse matrix
+product per BFS level), and on large graphs only a random sample of sources is used: enough sources that every
+normalized score is within epsilon of the exact one with probability at least 1 - delta (by Hoeffding's bound).
+The source batches are spread over the worker processes as well.
+
+The measures follow the definitions (and normalizations) of the networkx functions of the same name:
+pagerank, betweenness_centrality, hits, eigenvector_centrality (of the undirected graph) and core_number.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+import numpy as np
+import pandas as pd
+from scipy.sparse import linalg
+from compact_graph import CompactGraph
+from graph_snapshots import load_graph
+from metrics import mention_graph, sparse_pagerank
+from time_index import window_frame
+
+# Measure name -> the columns of the table it fills
+CENTRALITY_MEASURES = {
+    "pagerank": ["pagerank"],
+    "betweenness": ["betweenness"],
+    "hits": ["hub", "authority"],
+    "eigenvector": ["eigenvector"],
+    "k_core": ["k_core"],
+}
+# Upper bound on the number of (node, source) entries of each dense array used by batched betweenness
+BETWEENNESS_BATCH_ENTRIES = 1 << 22
+
+
+def centrality_table(df: pd.DataFrame, measures: Optional[list[str]] = None, workers: Optional[int] = None,
+                     epsilon: float = 0.05, delta: float = 0.1, seed: int = 0, start: Any = None,
+                     end: Any = None) -> pd.DataFrame:
+    """Return a table indexed by user with a column for every measure in measures (all of
+    CENTRALITY_MEASURES by default) on the mention graph of df, sorted by the first column.
+
+    If `start` or `end` is given, only the posts of the time window [start, end) are used. See
+    compute_centralities for workers, epsilon, delta and seed.
+
+    Preconditions:
+    - measures is None or all(measure in CENTRALITY_MEASURES for measure in measures)
+    - workers is None or workers > 0
+    - 0 < epsilon < 1 and 0 < delta < 1
+    """
+    windowed = start is not None or end is not None
+    graph = load_graph(window_frame(df, start, end), "mentions", mention_graph, persist=not windowed)
+    table = compute_centralities(graph, measures, workers, epsilon, delta, seed)
+    return table.sort_values(table.columns[0], ascending=False, kind="stable")
+
+
+def compute_centralities(graph: CompactGraph, measures: Optional[list[str]] = None, workers: Optional[int] = None,
+                         epsilon: float = 0.05, delta: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    """Return a table indexed by the node names of graph (in node order) with a column for every measure in
+    measures (all of CENTRALITY_MEASURES by default).
+
+    The measures run concurrently in up to workers processes (by default one per CPU). Betweenness uses
+    betweenness_sample_size(n_nodes, epsilon, delta) sources drawn with the given seed, which is all of them
+    on small graphs.
+
+    Preconditions:
+    - measures is None or all(measure in CENTRALITY_MEASURES for measure in measures)
+    - workers is None or workers > 0
+    - 0 < epsilon < 1 and 0 < delta < 1
+    """
+    measures = list(CENTRALITY_MEASURES) if measures is None else measures
+    unknown = [measure for measure in measures if measure not in CENTRALITY_MEASURES]
+    if unknown:
+        raise ValueError(f"Unknown centrality measures {unknown}; expected some of {list(CENTRALITY_MEASURES)}.")
+
+    columns = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = {measure: executor.submit(_MEASURES[measure], graph) for measure in measures if measure != "betweenness"}
+        if "betweenness" in measures:
+            sources = betweenness_sources(graph.n_nodes, epsilon, delta, seed)
+            n_chunks = max(1, min(len(sources), workers or os.cpu_count() or 1))
+            partials = [executor.submit(betweenness_partial, graph, chunk) for chunk in np.array_split(sources, n_chunks)]
+            columns["betweenness"] = _normalize_betweenness(sum(job.result() for job in partials), graph.n_nodes,
+                                                            len(sources))
+        for measure, job in jobs.items():
+            values = job.result()
+            columns.update(zip(CENTRALITY_MEASURES[measure], values if measure == "hits" else (values,)))
+
+    ordered = [column for measure in measures for column in CENTRALITY_MEASURES[measure]]
+    return pd.DataFrame({column: columns[column] for column in ordered},
+                        index=pd.Index(graph.names, name="user"))
+
+
+def pagerank_scores(graph: CompactGraph) -> np.ndarray:
+    """Return the PageRank of every node of graph (damping 0.85), as in metrics.compute_pagerank."""
+    return sparse_pagerank(graph.to_csr())[0]
+
+
+def hits_scores(graph: CompactGraph) -> tuple[np.ndarray, np.ndarray]:
+    """Return the HITS hub and authority scores of every node of graph, each summing to 1, as computed by
+    nx.hits (the leading singular vectors of the adjacency matrix).
+    """
+    if graph.n_nodes < 2 or len(graph.neighbors) == 0:
+        uniform = np.full(graph.n_nodes, 1 / max(graph.n_nodes, 1))
+        return uniform, uniform.copy()
+    adjacency = graph.to_csr()
+    vt = linalg.svds(adjacency, k=1, maxiter=100, tol=1.0e-8)[2]
+    authority = np.abs(vt.flatten().real)
+    hub = adjacency @ authority
+    return hub / hub.sum(), authority / authority.sum()
+
+
+def eigenvector_scores(graph: CompactGraph, max_iter: int = 100, tol: float = 1.0e-6) -> np.ndarray:
+    """Return the eigenvector centrality of every node of the undirected version of graph, found by power
+    iteration on A + I as nx.eigenvector_centrality does.
+
+    The mention graph directs every edge from the lower to the higher numbered user, so it has no cycles and
+    its directed eigenvector centrality is degenerate; the undirected version is used instead.
+
+    Raise a ValueError if the iteration has not converged after max_iter iterations. An empty graph has no
+    scores.
+
+    Preconditions:
+    - max_iter > 0 and tol > 0
+    """
+    if graph.n_nodes == 0:
+        return np.zeros(0)
+    adjacency = graph.to_csr()
+    if graph.directed:
+        adjacency = ((adjacency + adjacency.T) > 0).astype(np.float64).tocsr()
+    scores = np.full(graph.n_nodes, 1 / max(graph.n_nodes, 1))
+    for _ in range(max_iter):
+        previous = scores
+        scores = previous + adjacency @ previous
+        norm = np.linalg.norm(scores)
+        scores = scores / (norm if norm > 0 else 1)
+        if np.abs(scores - previous).sum() < graph.n_nodes * tol:
+            return scores
+    raise ValueError(f"Eigenvector centrality did not converge within {max_iter} iterations.")
+
+
+def core_numbers(graph: CompactGraph) -> np.ndarray:
+    """Return the core number of every node of graph, as nx.core_number defines it: the largest k such that
+    the node belongs to a subgraph in which every node has degree at least k. For a directed graph the degree
+    is the in-degree plus the out-degree. Self-loops are ignored.
+
+    Nodes are peeled in batches: every node whose remaining degree is at most the current k is removed at once.
+    """
+    adjacency = graph.to_csr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    if graph.directed:
+        adjacency = (adjacency + adjacency.T).tocsr()
+    adjacency = adjacency.astype(np.int64)
+
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    core = np.zeros(graph.n_nodes, dtype=np.int64)
+    removed = np.zeros(graph.n_nodes, dtype=bool)
+    k = 0
+    while not removed.all():
+        k = max(k, int(degree[~removed].min()))
+        peel = ~removed & (degree <= k)
+        while peel.any():
+            core[peel] = k
+            removed |= peel
+            degree -= adjacency @ peel.astype(np.int64)
+            peel = ~removed & (degree <= k)
+    return core
+
+
+def betweenness_sample_size(n_nodes: int, epsilon: float, delta: float) -> int:
+    """Return the number of sources to sample so that, by Hoeffding's inequality and a union bound over the
+    nodes, every normalized betweenness score is within epsilon of its exact value with probability at least
+    1 - delta. The result is capped at n_nodes (exact betweenness).
+
+    Preconditions:
+    - 0 < epsilon < 1 and 0 < delta < 1
+    """
+    if n_nodes == 0:
+        return 0
+    return min(n_nodes, math.ceil(math.log(2 * n_nodes / delta) / (2 * epsilon ** 2)))
+
+
+def betweenness_sources(n_nodes: int, epsilon: float, delta: float, seed: int) -> np.ndarray:
+    """Return the source nodes used for betweenness: all nodes if the sample size reaches n_nodes, and a
+    random sample of betweenness_sample_size(n_nodes, epsilon, delta) nodes drawn with seed otherwise.
+    """
+    size = betweenness_sample_size(n_nodes, epsilon, delta)
+    if size >= n_nodes:
+        return np.arange(n_nodes)
+    return np.sort(np.random.default_rng(seed).choice(n_nodes, size=size, replace=False))
+
+
+def betweenness_partial(graph: CompactGraph, sources: np.ndarray) -> np.ndarray:
+    """Return the unnormalized sum over sources of the Brandes dependency of every node of graph.
+
+    The sources are processed in batches: a BFS from every source of a batch advances one level per sparse
+    matrix product, counting shortest paths, and the dependencies are then accumulated back level by level.
+    """
+    adjacency = graph.to_csr()
+    transpose = adjacency.T.tocsr()
+    n_nodes = graph.n_nodes
+    total = np.zeros(n_nodes)
+    batch_size = max(1, BETWEENNESS_BATCH_ENTRIES // max(n_nodes, 1))
+    for first in range(0, len(sources), batch_size):
+        batch = sources[first:first + batch_size]
+        columns = np.arange(len(batch))
+        dist = np.full((n_nodes, len(batch)), -1, dtype=np.int32)
+        paths = np.zeros((n_nodes, len(batch)))
+        dist[batch, columns] = 0
+        paths[batch, columns] = 1.0
+
+        level, frontier = 0, dist == 0
+        while frontier.any():
+            reached = transpose @ np.where(frontier, paths, 0.0)
+            frontier = (reached > 0) & (dist < 0)
+            level += 1
+            dist[frontier] = level
+            paths[frontier] = reached[frontier]
+
+        dependency = np.zeros((n_nodes, len(batch)))
+        for depth in range(level - 1, 0, -1):
+            at_depth = dist == depth
+            share = np.where(at_depth, (1.0 + dependency) / np.where(at_depth, paths, 1.0), 0.0)
+            dependency += np.where(dist == depth - 1, paths * (adjacency @ share), 0.0)
+        dependency[batch, columns] = 0.0
+        total += dependency.sum(axis=1)
+    return total
+
+
+def _normalize_betweenness(total: np.ndarray, n_nodes: int, n_sources: int) -> np.ndarray:
+    """Scale summed dependencies from n_sources sources as nx.betweenness_centrality(normalized=True) does."""
+    scale = 1 / ((n_nodes - 1) * (n_nodes - 2)) if n_nodes > 2 else 1.0
+    if 0 < n_sources < n_nodes:
+        scale *= n_nodes / n_sources
+    return total * scale
+
+
+_MEASURES = {
+    "pagerank": pagerank_scores,
+    "hits": hits_scores,
+    "eigenvector": eigenvector_scores,
+    "k_core": core_numbers,
+}
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['math', 'os', 'concurrent.futures', 'typing', 'numpy', 'pandas', 'scipy.sparse',
+                          'compact_graph', 'graph_snapshots', 'metrics', 'time_index'],
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
@@ -0,0 +1,263 @@
+"""CSC111 Final Project: Community Detection
+
+Module Description
+==================
+This module finds communities of users in the mention graph and clusters of hashtags in the hashtag
+co-occurrence graph, by label propagation on the CSR arrays of a CompactGraph.
+
+Every node starts in a community of its own and repeatedly joins the community with the largest total edge
+weight among its neighbors, until no node wants to move. Each round is computed for all the nodes that may
+move at once (one pass over their edges), and a random half of the moving nodes moves per round so that
+neighbors cannot keep swapping communities. Only nodes next to a node that moved are looked at again in the
+next round. Directed graphs are treated as undirected. The modularity of the result is reported with it.
+
+Because the search starts from any labelling, update_communities continues from earlier communities when new
+edges arrive, which only moves the nodes around the new edges. get_communities keeps the communities of a frame
+with it (next to its cached graph), so the plots can color nodes by community without computing them again.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from compact_graph import CompactGraph
+from cooccurrence import cooccurrence_matrix
+from graph_snapshots import load_graph
+from instrumentation import count, traced
+from metrics import mention_graph
+from preprocess import cached_for_frame, get_tag_index
+
+# Graph kind -> function returning the graph and its edge weights (None if unweighted) for a frame, given
+# whether a graph that has to be built may be saved as a snapshot
+COMMUNITY_GRAPHS = {
+    "mentions": lambda df, persist: (load_graph(df, "mentions", mention_graph, persist=persist), None),
+    "hashtags": lambda df, persist: hashtag_graph(df),
+}
+MAX_ROUNDS = 100
+
+
+@dataclass
+class Communities:
+    """The communities found in a graph.
+
+    Instance Attributes:
+    - names: the name of every node of the graph, in node order.
+    - labels: the community of every node; communities are numbered from 0 in decreasing order of size.
+    - modularity: the modularity of the communities in the (undirected) graph.
+    - rounds: the number of label propagation rounds it took to find them.
+
+    Representation Invariants:
+    - len(self.labels) == len(self.names)
+    - self.labels.min() == 0 if len(self.labels) > 0
+    """
+    names: np.ndarray
+    labels: np.ndarray
+    modularity: float
+    rounds: int
+
+    @property
+    def n_communities(self) -> int:
+        """Return the number of communities."""
+        return int(self.labels.max()) + 1 if len(self.labels) > 0 else 0
+
+    def as_series(self) -> pd.Series:
+        """Return the community of every node as a Series indexed by node name."""
+        return pd.Series(self.labels, index=pd.Index(self.names, name="node"), name="community")
+
+    def sizes(self) -> np.ndarray:
+        """Return the number of nodes in every community."""
+        return np.bincount(self.labels, minlength=self.n_communities)
+
+
+def get_communities(df: pd.DataFrame, kind: str = "mentions", seed: int = 0, persist: bool = True) -> Communities:
+    """Return the communities of the graph of the given kind (see COMMUNITY_GRAPHS) for df, computing them
+    on first use only. If persist is False, a graph built for them is not saved as a snapshot (pass False
+    for the frame of a time window, as compute_pagerank does).
+
+    Preconditions:
+    - kind in COMMUNITY_GRAPHS
+    """
+    def build(frame: pd.DataFrame) -> Communities:
+        graph, weights = COMMUNITY_GRAPHS[kind](frame, persist)
+        return find_communities(graph, weights, seed)
+    return cached_for_frame(df, f"communities:{kind}", build)
+
+
+def hashtag_graph(df: pd.DataFrame) -> tuple[CompactGraph, np.ndarray]:
+    """Return the undirected hashtag co-occurrence graph of df, over every hashtag of the vocabulary, and
+    the weight (co-occurrence count) of every stored edge.
+    """
+    counts = cooccurrence_matrix(get_tag_index(df).hashtags)
+    counts.sort_indices()
+    graph = CompactGraph(counts.indptr.astype(np.int64), counts.indices.astype(np.int32),
+                         np.asarray(get_tag_index(df).hashtags.vocab, dtype=object), directed=False)
+    return graph, counts.data.astype(np.float64)
+
+
+@traced
+def find_communities(graph: CompactGraph, weights: Optional[np.ndarray] = None, seed: int = 0) -> Communities:
+    """Return the communities of graph found by label propagation, starting with every node on its own.
+
+    weights gives the weight of every stored edge (aligned with graph.neighbors); every edge weighs 1 if it
+    is None. Ties between equally heavy communities are broken at random with the given seed.
+
+    Preconditions:
+    - weights is None or len(weights) == len(graph.neighbors)
+    """
+    adjacency = undirected_adjacency(graph, weights)
+    labels, rounds = propagate_labels(adjacency, np.arange(graph.n_nodes), np.ones(graph.n_nodes, dtype=bool), seed)
+    return _communities(graph.names, adjacency, labels, rounds)
+
+
+@traced
+def update_communities(previous: Communities, graph: CompactGraph, weights: Optional[np.ndarray] = None,
+                       changed: Optional[list] = None, seed: int = 0) -> Communities:
+    """Return the communities of graph, a graph grown from the one previous was found in, continuing the
+    label propagation from the communities of previous.
+
+    Nodes keep their community in previous (matched by name) and new nodes start on their own. If changed
+    (the names of the endpoints of the new edges) is given, only those nodes and the new nodes are looked at
+    first; otherwise every node is.
+
+    Preconditions:
+    - weights is None or len(weights) == len(graph.neighbors)
+    """
+    adjacency = undirected_adjacency(graph, weights)
+    old_labels = pd.Series(previous.labels, index=pd.Index(previous.names)).reindex(graph.names).to_numpy()
+    is_new = np.isnan(old_labels)
+    labels = np.where(is_new, previous.n_communities + np.cumsum(is_new) - 1, np.nan_to_num(old_labels))
+    labels = labels.astype(np.int64)
+
+    if changed is None:
+        active = np.ones(graph.n_nodes, dtype=bool)
+    else:
+        active = is_new | pd.Index(graph.names).isin(changed)
+    labels, rounds = propagate_labels(adjacency, labels, active, seed)
+    return _communities(graph.names, adjacency, labels, rounds)
+
+
+def undirected_adjacency(graph: CompactGraph, weights: Optional[np.ndarray] = None) -> sparse.csr_matrix:
+    """Return the symmetric weighted adjacency matrix of graph. For a directed graph, nodes are joined if there
+    is an edge between them in either direction, by the heavier of the two.
+    """
+    adjacency = graph.to_csr()
+    if weights is not None:
+        adjacency.data = np.asarray(weights, dtype=np.float64)
+    if graph.directed:
+        adjacency = adjacency.maximum(adjacency.T).tocsr()
+    return adjacency
+
+
+def propagate_labels(adjacency: sparse.csr_matrix, labels: np.ndarray, active: np.ndarray,
+                     seed: int = 0) -> tuple[np.ndarray, int]:
+    """Run label propagation on the symmetric matrix adjacency from the given labels, looking first at the
+    nodes marked in active. Return the final labels and the number of rounds.
+
+    In each round every active node finds the labels of largest total weight among its neighbors; a node
+    whose label is not one of them wants to move to one of them (chosen at random). A random half of those
+    nodes move, and the next round looks at the nodes that did not move and the neighbors of those that did.
+
+    Preconditions:
+    - adjacency is square and symmetric, and labels and active have one entry per row
+    """
+    rng = np.random.default_rng(seed)
+    labels = labels.copy()
+    active = active.copy()
+    n_nodes = adjacency.shape[0]
+    rounds = 0
+    while rounds < MAX_ROUNDS and active.any():
+        rounds += 1
+        rows = np.flatnonzero(active)
+        count("visits", len(rows))
+        best = _best_labels(adjacency[rows], labels, labels[rows], rng)
+        wants_move = (best >= 0) & (best != labels[rows])
+        moving = rows[wants_move & (rng.random(len(rows)) < 0.5)]
+        labels[moving] = best[np.searchsorted(rows, moving)]
+
+        moved = np.zeros(n_nodes, dtype=bool)
+        moved[moving] = True
+        active = np.zeros(n_nodes, dtype=bool)
+        active[rows[wants_move]] = True
+        active |= (adjacency @ moved.astype(np.float64)) > 0
+    return labels, rounds
+
+
+def _best_labels(rows: sparse.csr_matrix, labels: np.ndarray, current: np.ndarray,
+                 rng: np.random.Generator) -> np.ndarray:
+    """Return, for every row of rows (a slice of the adjacency matrix), the label of largest total weight
+    among its entries, or -1 if the row is empty. Ties go to the current label of the row if it is one of
+    them, and to a random one of them otherwise.
+    """
+    owner = np.repeat(np.arange(rows.shape[0]), np.diff(rows.indptr))
+    best = np.full(rows.shape[0], -1, dtype=np.int64)
+    if len(owner) == 0:
+        return best
+    width = int(labels.max()) + 1
+    keys, inverse = np.unique(owner * width + labels[rows.indices], return_inverse=True)
+    scores = np.bincount(inverse, weights=rows.data)
+    key_owner, key_label = keys // width, keys % width
+
+    new_owner = np.r_[True, key_owner[1:] != key_owner[:-1]]
+    starts = np.flatnonzero(new_owner)
+    is_top = scores == np.maximum.reduceat(scores, starts)[np.cumsum(new_owner) - 1]
+
+    # The top label of highest priority is the last entry of its row once sorted by priority
+    priority = np.where(is_top, rng.random(len(keys)) + (key_label == current[key_owner]), -1.0)
+    order = np.lexsort((priority, key_owner))
+    last = order[np.r_[starts[1:] - 1, len(keys) - 1]]
+    best[key_owner[last]] = key_label[last]
+    return best
+
+
+def modularity(adjacency: sparse.csr_matrix, labels: np.ndarray) -> float:
+    """Return the modularity of the communities given by labels in the undirected graph with the symmetric
+    weighted adjacency matrix adjacency, as nx.community.modularity defines it (a self-loop counts once
+    towards the weight of its community and twice towards the degree of its node).
+    """
+    loops = adjacency.diagonal()
+    total = (adjacency.sum() + loops.sum()) / 2
+    if total == 0:
+        return 0.0
+    coo = adjacency.tocoo()
+    same = labels[coo.row] == labels[coo.col]
+    inside = np.bincount(labels[coo.row[same]], weights=coo.data[same], minlength=labels.max() + 1)
+    inside += np.bincount(labels, weights=loops, minlength=labels.max() + 1)
+    degree = np.asarray(adjacency.sum(axis=1)).ravel() + loops
+    community_degree = np.bincount(labels, weights=degree, minlength=labels.max() + 1)
+    return float(np.sum(inside / 2 / total - (community_degree / (2 * total)) ** 2))
+
+
+def _communities(names: np.ndarray, adjacency: sparse.csr_matrix, labels: np.ndarray, rounds: int) -> Communities:
+    """Return the Communities of the given labels, renumbered from 0 in decreasing order of size."""
+    if len(labels) == 0:
+        return Communities(names, labels.astype(np.int64), 0.0, rounds)
+    codes, _ = pd.factorize(labels)
+    sizes = np.bincount(codes)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+    labels = rank[codes]
+    return Communities(names, labels, modularity(adjacency, labels), rounds)
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['dataclasses', 'typing', 'numpy', 'pandas', 'scipy', 'scipy.sparse', 'compact_graph',
+                          'cooccurrence', 'graph_snapshots', 'instrumentation', 'metrics',
+                          'preprocess'],
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
@@ -0,0 +1,197 @@
+"""CSC111 Final Project: Compact Graph
+
+Module Description
+==================
+This module provides CompactGraph, an integer-id graph representation for the user graphs of graph_builder.
+
+Nodes are numbered 0..n-1 and their names kept in an interning table, and the adjacency is stored in CSR form:
+an offsets array and an int32 array of neighbor ids. That costs a few bytes per edge instead of the hundreds of
+bytes of networkx's nested dictionaries. Degrees, neighbors and connected components are computed on the
+arrays directly; to_networkx and from_networkx convert for the visualization code.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Optional
+import networkx as nx
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+
+
+@dataclass
+class CompactGraph:
+    """A simple graph (no parallel edges) stored as CSR arrays over integer node ids.
+
+    For a directed graph the arrays hold the successors of every node. For an undirected graph every edge
+    is stored in both directions, except that a self-loop is stored once.
+
+    Instance Attributes:
+    - offsets: int64 array of length n_nodes + 1; the neighbors of node i are neighbors[offsets[i]:offsets[i + 1]].
+    - neighbors: int32 array of neighbor ids, ascending within each node.
+    - names: object array with the name of every node id.
+    - directed: whether the graph is directed.
+
+    Representation Invariants:
+    - self.offsets[0] == 0 and self.offsets[-1] == len(self.neighbors)
+    - all(0 <= v < len(self.names) for v in self.neighbors)
+    """
+    offsets: np.ndarray
+    neighbors: np.ndarray
+    names: np.ndarray
+    directed: bool
+    _ids: Optional[dict[Any, int]] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_edges(cls, sources: np.ndarray, targets: np.ndarray, directed: bool,
+                   nodes: Optional[np.ndarray] = None) -> CompactGraph:
+        """Return the graph with an edge from sources[i] to targets[i] for every i (repeated edges are kept
+        once). Nodes are numbered in order of first appearance, first in nodes (if given), then in the edges
+        taken in order with the source of each edge before its target, which is the order networkx would
+        insert them in. Missing values (NaN) are nodes like any other, as they are in networkx.
+
+        Preconditions:
+        - len(sources) == len(targets)
+        """
+        nodes = np.zeros(0, dtype=object) if nodes is None else np.asarray(nodes, dtype=object)
+        pairs = np.empty(len(nodes) + 2 * len(sources), dtype=object)
+        pairs[:len(nodes)] = nodes
+        pairs[len(nodes)::2] = sources
+        pairs[len(nodes) + 1::2] = targets
+        codes, names = pd.factorize(pairs, use_na_sentinel=False)
+        u, v = codes[len(nodes)::2], codes[len(nodes) + 1::2]
+        return cls.from_codes(u, v, np.asarray(names, dtype=object), directed)
+
+    @classmethod
+    def from_codes(cls, u: np.ndarray, v: np.ndarray, names: np.ndarray, directed: bool) -> CompactGraph:
+        """Return the graph over the nodes named by names with an edge from u[i] to v[i] for every i.
+
+        Preconditions:
+        - len(u) == len(v)
+        - all(0 <= node < len(names) for node in u) and all(0 <= node < len(names) for node in v)
+        """
+        u, v = np.asarray(u, dtype=np.int64), np.asarray(v, dtype=np.int64)
+        if not directed:
+            loop = u == v
+            u, v = np.concatenate([u, v[~loop]]), np.concatenate([v, u[~loop]])
+        width = max(len(names), 1)
+        keys = np.unique(u * width + v)
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // width, minlength=len(names)), out=offsets[1:])
+        return cls(offsets, (keys % width).astype(np.int32), names, directed)
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> CompactGraph:
+        """Return the compact form of graph, keeping its node order."""
+        sources = np.empty(graph.number_of_edges(), dtype=object)
+        targets = np.empty(graph.number_of_edges(), dtype=object)
+        for i, (u, v) in enumerate(graph.edges()):
+            sources[i], targets[i] = u, v
+        nodes = np.empty(len(graph), dtype=object)
+        nodes[:] = list(graph)
+        return cls.from_edges(sources, targets, graph.is_directed(), nodes)
+
+    def to_networkx(self) -> nx.Graph:
+        """Return the graph as a networkx Graph (or DiGraph if directed) with the same node order."""
+        graph = nx.DiGraph() if self.directed else nx.Graph()
+        graph.add_nodes_from(self.names)
+        source = np.repeat(np.arange(self.n_nodes), np.diff(self.offsets))
+        if not self.directed:
+            keep = source <= self.neighbors
+            graph.add_edges_from(zip(self.names[source[keep]], self.names[self.neighbors[keep]]))
+        else:
+            graph.add_edges_from(zip(self.names[source], self.names[self.neighbors]))
+        return graph
+
+    def to_csr(self) -> sparse.csr_matrix:
+        """Return the 0/1 adjacency matrix of the graph (symmetric if undirected)."""
+        data = np.ones(len(self.neighbors), dtype=np.float64)
+        return sparse.csr_matrix((data, self.neighbors, self.offsets), shape=(self.n_nodes, self.n_nodes))
+
+    @property
+    def n_nodes(self) -> int:
+        """Return the number of nodes."""
+        return len(self.names)
+
+    @property
+    def n_edges(self) -> int:
+        """Return the number of edges (each undirected edge counted once)."""
+        if self.directed:
+            return len(self.neighbors)
+        return (len(self.neighbors) + self._self_loops()) // 2
+
+    def node_id(self, name: Hashable) -> int:
+        """Return the id of the node named name. Raise a KeyError if there is no such node."""
+        if self._ids is None:
+            self._ids = {node: i for i, node in enumerate(self.names)}
+        return self._ids[name]
+
+    def degree(self) -> np.ndarray:
+        """Return the degree of every node, counting a self-loop twice as networkx does.
+        For a directed graph this is the in-degree plus the out-degree.
+        """
+        if self.directed:
+            return self.out_degree() + self.in_degree()
+        return self.out_degree() + np.bincount(self._loop_nodes(), minlength=self.n_nodes)
+
+    def out_degree(self) -> np.ndarray:
+        """Return the number of successors of every node (the number of neighbors if undirected)."""
+        return np.diff(self.offsets)
+
+    def in_degree(self) -> np.ndarray:
+        """Return the number of predecessors of every node (the number of neighbors if undirected)."""
+        return np.bincount(self.neighbors, minlength=self.n_nodes)
+
+    def neighbors_of(self, name: Hashable) -> np.ndarray:
+        """Return the names of the neighbors (successors, if directed) of the node named name."""
+        node = self.node_id(name)
+        return self.names[self.neighbors[self.offsets[node]:self.offsets[node + 1]]]
+
+    def connected_components(self, strong: bool = False) -> tuple[int, np.ndarray]:
+        """Return the number of connected components and the component label of every node.
+
+        For a directed graph the components are weakly connected unless strong is True.
+        """
+        return csgraph.connected_components(self.to_csr(), directed=self.directed,
+                                            connection="strong" if strong else "weak")
+
+    def largest_component(self) -> np.ndarray:
+        """Return the names of the nodes of the largest (weakly) connected component, in node order."""
+        if self.n_nodes == 0:
+            return self.names
+        labels = self.connected_components()[1]
+        return self.names[labels == np.argmax(np.bincount(labels))]
+
+    def memory_bytes(self) -> int:
+        """Return the number of bytes taken by the offsets and neighbor arrays and the node names."""
+        return self.offsets.nbytes + self.neighbors.nbytes + int(pd.Series(self.names).memory_usage(deep=True))
+
+    def _loop_nodes(self) -> np.ndarray:
+        """Return the id of every node with a self-loop."""
+        source = np.repeat(np.arange(self.n_nodes), np.diff(self.offsets))
+        return source[source == self.neighbors]
+
+    def _self_loops(self) -> int:
+        """Return the number of self-loops."""
+        return len(self._loop_nodes())
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['dataclasses', 'typing', 'networkx', 'numpy', 'pandas', 'scipy', 'scipy.sparse'],
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
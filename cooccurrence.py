@@ -0,0 +1,174 @@
+"""CSC111 Final Project: Hashtag Co-occurrence Engine
+
+Module Description
+==================
+This module counts how often pairs of hashtags are used together in the same tweet.
+
+The counts are computed as a sparse matrix product: with C the tweet-by-hashtag incidence matrix built from the
+integer-coded hashtags of the shared TagIndex, C^T C holds the co-occurrence count of every pair of hashtags.
+The result is returned directly as a weighted edge list, optionally normalized by PMI or Jaccard similarity,
+and the vocabulary can be pruned to the most frequent hashtags before the product is taken. The subgraph shown
+by the co-occurrence plot is selected on the sparse matrix too, so only that subgraph becomes a networkx graph.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+from typing import Optional
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+from preprocess import ExplodedColumn
+
+NORMALIZATIONS = (None, "pmi", "jaccard")
+
+
+def incidence_matrix(column: ExplodedColumn, binary: bool = False) -> sparse.csr_matrix:
+    """Return the row-by-vocab matrix counting how often each token occurs in each row of column.
+
+    If binary is True, every nonzero entry is 1 instead.
+    """
+    matrix = sparse.csr_matrix((np.ones(len(column.codes), dtype=np.int64), column.codes, column.offsets),
+                               shape=(column.n_rows, len(column.vocab)))
+    matrix.sum_duplicates()
+    if binary:
+        matrix.data[:] = 1
+    return matrix
+
+
+def top_k_tokens(column: ExplodedColumn, top_k: int) -> np.ndarray:
+    """Return a vocab mask of the top_k most frequent tokens of column (ties broken by first appearance).
+
+    Preconditions:
+    - top_k > 0
+    """
+    counts = column.counts()
+    keep = np.zeros(len(column.vocab), dtype=bool)
+    keep[np.argsort(-counts, kind="stable")[:top_k]] = True
+    return keep & (counts > 0)
+
+
+def cooccurrence_matrix(column: ExplodedColumn, binary: bool = False) -> sparse.csr_matrix:
+    """Return the symmetric vocab-by-vocab matrix of pair counts of column.
+
+    Entry (a, b) with a != b counts the pairs of occurrences of a and b within the same row; entry (a, a)
+    counts the pairs of repeated occurrences of a within a row. With binary=True, entry (a, b) is the number
+    of rows containing both a and b, and entry (a, a) the number of rows containing a.
+    """
+    incidence = incidence_matrix(column, binary)
+    product = (incidence.T @ incidence).tocsr()
+    if not binary:
+        # (C^T C)[a, a] is the sum of n_a^2 per row; the number of pairs is the sum of n_a (n_a - 1) / 2.
+        squares = product.diagonal()
+        occurrences = np.asarray(incidence.sum(axis=0)).ravel()
+        product.setdiag((squares - occurrences) // 2)
+        product.eliminate_zeros()
+    return product
+
+
+def cooccurrence_edges(column: ExplodedColumn, top_k: Optional[int] = None,
+                       normalize: Optional[str] = None) -> pd.DataFrame:
+    """Return the weighted co-occurrence edge list of column as a DataFrame with 'source', 'target' and
+    'weight' columns, one row per co-occurring pair with source before target in vocab order.
+
+    If top_k is given, only the top_k most frequent tokens are kept before counting. With no normalization
+    the weight is the number of co-occurring pairs, as in cooccurrence_matrix, and repeated tokens produce
+    self-pairs. With normalize='jaccard' the weight is the number of rows containing both tokens divided by
+    the number of rows containing either; with normalize='pmi' it is log(n_ab * n_rows / (n_a * n_b)) for
+    row counts n. Normalized edge lists leave out self-pairs.
+
+    Preconditions:
+    - top_k is None or top_k > 0
+    - normalize in NORMALIZATIONS
+    """
+    if normalize not in NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization '{normalize}'; expected one of {NORMALIZATIONS}.")
+    if top_k is not None:
+        column = column.select(top_k_tokens(column, top_k))
+
+    full = cooccurrence_matrix(column, binary=normalize is not None)
+    source, target, weight = _upper_triangle(full, with_diagonal=normalize is None)
+
+    if normalize is not None:
+        rows_with = full.diagonal()
+        together = weight.astype(np.float64)
+        if normalize == "jaccard":
+            weight = together / (rows_with[source] + rows_with[target] - together)
+        else:
+            weight = np.log(together * column.n_rows / (rows_with[source] * rows_with[target]))
+
+    return pd.DataFrame({"source": column.vocab[source], "target": column.vocab[target], "weight": weight})
+
+
+def focus_edges(column: ExplodedColumn, max_nodes: int) -> tuple[np.ndarray, pd.DataFrame]:
+    """Return the max_nodes highest-degree tokens of the largest connected component of the co-occurrence
+    graph of column, and the co-occurrence edge list among them in the format of cooccurrence_edges.
+
+    The selection is made on the sparse co-occurrence matrix, so only the displayed subgraph is ever built
+    as a graph. Nodes are returned in the order they would be inserted into a graph built from the full
+    edge list of cooccurrence_edges, and every tie (between equally large components or equal degrees) is
+    broken in that order, so the result matches selecting on the full networkx graph. A node's degree
+    counts a self-pair twice, as networkx does.
+
+    Preconditions:
+    - max_nodes > 0
+    """
+    full = cooccurrence_matrix(column)
+    source, target, weight = _upper_triangle(full, with_diagonal=True)
+    if len(source) == 0:
+        return np.zeros(0, dtype=object), pd.DataFrame({"source": [], "target": [], "weight": []})
+
+    # Position at which each node would first be inserted into a graph built from the edge list
+    n_vocab = len(column.vocab)
+    unseen = 2 * len(source)
+    first_seen = np.full(n_vocab, unseen, dtype=np.int64)
+    np.minimum.at(first_seen, target, 2 * np.arange(len(target)) + 1)
+    np.minimum.at(first_seen, source, 2 * np.arange(len(source)))
+    in_graph = np.flatnonzero(first_seen < unseen)
+
+    # Largest connected component, preferring the one reached first on ties
+    labels = csgraph.connected_components(full, directed=False)[1]
+    sizes = np.bincount(labels[in_graph], minlength=labels.max() + 1)
+    component_first = np.full(len(sizes), unseen, dtype=np.int64)
+    np.minimum.at(component_first, labels[in_graph], first_seen[in_graph])
+    largest = np.lexsort((component_first, -sizes))[0]
+
+    members = in_graph[labels[in_graph] == largest]
+    members = members[np.argsort(first_seen[members], kind="stable")]
+    degree = full.getnnz(axis=1) + (full.diagonal() > 0)
+    focus = members[np.argsort(-degree[members], kind="stable")[:max_nodes]]
+    focus = focus[np.argsort(first_seen[focus], kind="stable")]
+
+    in_focus = np.zeros(n_vocab, dtype=bool)
+    in_focus[focus] = True
+    kept = in_focus[source] & in_focus[target]
+    edges = pd.DataFrame({"source": column.vocab[source[kept]], "target": column.vocab[target[kept]],
+                          "weight": weight[kept]})
+    return column.vocab[focus], edges
+
+
+def _upper_triangle(matrix: sparse.csr_matrix, with_diagonal: bool) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the (row, column, value) arrays of the nonzero upper-triangle entries of matrix,
+    sorted by row and then column.
+    """
+    upper = sparse.triu(matrix, k=0 if with_diagonal else 1).tocoo()
+    order = np.lexsort((upper.col, upper.row))
+    return upper.row[order], upper.col[order], upper.data[order]
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['typing', 'numpy', 'pandas', 'scipy', 'preprocess'],  # the names (strs) of imported modules
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
@@ -5,6 +5,14 @@ Module Description
 This module loads a local Twitter dataset from a CSV file into a pandas DataFrame.
 It includes basic error handling to inform the user if the dataset file is not found in the expected location.
 
+A compact loading mode is also provided: it reads only the columns used by the analyses, stores users as a
+categorical, post dates as UTC timestamps and engagement counts as int32, and can stream the file in chunks
+so large exports fit in memory. The compact frame can be cached next to the CSV in a binary columnar file,
+which is reused on later runs until the CSV changes.
+
+Exports split into many shards (e.g. one CSV per day) can be loaded from a directory or glob pattern: the shards
+are parsed in parallel worker processes, deduplicated by post id and combined into one compact frame.
+
 This module is intended to be used as a foundational utility for all other analysis
 modules in the project.
 
@@ -19,17 +27,53 @@ without the explicit written permission of the project group.
 
 This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
 """
-import python_ta
+import glob
+import hashlib
+import json
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
 import pandas as pd
+from pandas.api.types import union_categoricals
+from instrumentation import count, traced
+from preprocess import cached_for_frame
+
+USER_COL = "user_posted"
+ID_COL = "id"
+DATE_COL = "date_posted"
+COUNT_COLUMNS = ["likes", "reposts", "replies"]
+TEXT_COLUMNS = ["hashtags", "tagged_users"]
+ANALYSIS_COLUMNS = [USER_COL, ID_COL, DATE_COL] + COUNT_COLUMNS + TEXT_COLUMNS
 
+# Bump whenever the compact frame layout changes so that stale caches are rebuilt.
+CACHE_VERSION = 3
+HASH_BLOCK_SIZE = 1 << 20
 
-def load_dataset(file_path: str = "twitter-posts.csv") -> pd.DataFrame:
+
+@traced
+def load_dataset(file_path: str = "twitter-posts.csv", compact: bool = False,
+                 chunksize: Optional[int] = None) -> pd.DataFrame:
     """
     Load the Twitter dataset from a local file.
     Assumes that the file 'twitter-posts.csv' is present in the same folder.
+
+    If `compact` is True, only ANALYSIS_COLUMNS are read, users are stored as a categorical, post dates
+    as UTC timestamps (unparseable dates become NaT) and engagement counts as int32 (missing counts
+    become 0). If `chunksize` is also given, the file is streamed `chunksize` rows at a time so the
+    full object-typed frame is never held in memory.
+
+    Preconditions:
+    - chunksize is None or chunksize > 0
     """
     try:
-        df = pd.read_csv(file_path)
+        if compact:
+            df = _read_compact(file_path, chunksize)
+        else:
+            df = pd.read_csv(file_path)
+        count("rows", len(df))
         print("Dataset loaded successfully.")
         return df
     except FileNotFoundError:
@@ -38,10 +82,348 @@ def load_dataset(file_path: str = "twitter-posts.csv") -> pd.DataFrame:
         )
 
 
+def _read_compact(file_path: str, chunksize: Optional[int]) -> pd.DataFrame:
+    """Read the analysis columns of the CSV at file_path into a compact, typed DataFrame."""
+    read_options = {
+        "usecols": ANALYSIS_COLUMNS,
+        "dtype": {USER_COL: "object", ID_COL: "object", DATE_COL: "object", "hashtags": "object", "tagged_users": "object"},
+    }
+    if chunksize is None:
+        return _compact_frame(pd.read_csv(file_path, **read_options))
+
+    chunks = [_compact_frame(chunk) for chunk in pd.read_csv(file_path, chunksize=chunksize, **read_options)]
+    if not chunks:
+        return _compact_frame(pd.DataFrame(columns=ANALYSIS_COLUMNS))
+    return concat_compact(chunks)
+
+
+def _compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df restricted to ANALYSIS_COLUMNS with categorical users, UTC post dates and int32 engagement counts."""
+    df = df.reset_index(drop=True)  # chunks of a chunked read are numbered from their offset in the file
+    compact = pd.DataFrame(index=df.index)
+    compact[USER_COL] = df[USER_COL].astype("category")
+    compact[ID_COL] = df[ID_COL]
+    compact[DATE_COL] = pd.to_datetime(df[DATE_COL], utc=True, errors="coerce")
+    for col in COUNT_COLUMNS:
+        compact[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int32").to_numpy()
+    for col in TEXT_COLUMNS:
+        compact[col] = df[col].to_numpy()
+    return compact
+
+
+def concat_compact(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate compact frames, merging their user categories instead of falling back to object dtype.
+
+    Preconditions:
+    - frames != []
+    - every frame in frames was produced by the compact loader
+    """
+    users = union_categoricals([frame[USER_COL] for frame in frames])
+    combined = pd.concat([frame.drop(columns=USER_COL) for frame in frames], ignore_index=True)
+    combined.insert(0, USER_COL, users)
+    return combined
+
+
+@dataclass
+class ShardStats:
+    """The ingestion statistics of one shard of a sharded export.
+
+    Instance Attributes:
+    - path: the path of the shard.
+    - rows: the number of rows read from the shard.
+    - duplicates: the number of those rows dropped because their id was already seen in an earlier shard
+      (or earlier in the same shard).
+    - size: the size of the shard in bytes.
+    - seconds: the time the worker took to parse the shard.
+    """
+    path: str
+    rows: int
+    duplicates: int
+    size: int
+    seconds: float
+
+
+def shard_paths(source: str) -> list[str]:
+    """Return the sorted paths of the CSV shards named by source: a directory (every .csv file in it),
+    a glob pattern, or a single file.
+    """
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "*.csv")))
+    return sorted(glob.glob(source))
+
+
+@traced
+def load_shards(source: str, workers: Optional[int] = None,
+                chunksize: Optional[int] = None) -> tuple[pd.DataFrame, list[ShardStats]]:
+    """Load every shard named by source into a single compact frame, parsing the shards in parallel worker
+    processes. Return the frame and the ingestion statistics of each shard, in shard order.
+
+    Posts are deduplicated by id, keeping the first occurrence in shard order; posts without an id are all
+    kept. Each worker returns its shard already in compact form and duplicates are dropped per shard, so the
+    only full-size copy made is the final concatenation. workers is the number of processes (by default one
+    per CPU) and chunksize is passed on to the compact reader of each shard.
+
+    Preconditions:
+    - workers is None or workers > 0
+    - chunksize is None or chunksize > 0
+    """
+    paths = shard_paths(source)
+    if not paths:
+        raise FileNotFoundError(f"No CSV shards match '{source}'. Please check the directory or pattern.")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shards = list(executor.map(_read_shard, paths, [chunksize] * len(paths)))
+
+    ids = pd.concat([frame[ID_COL] for frame, _ in shards], ignore_index=True)
+    duplicated = (ids.duplicated(keep="first") & ids.notna()).to_numpy()
+
+    frames, stats, start = [], [], 0
+    for path, (frame, seconds) in zip(paths, shards):
+        drop = duplicated[start:start + len(frame)]
+        start += len(frame)
+        stats.append(ShardStats(path, len(frame), int(drop.sum()), os.path.getsize(path), seconds))
+        frames.append(frame[~drop] if drop.any() else frame)
+    count("rows", start)
+    count("duplicates", int(duplicated.sum()))
+    return concat_compact(frames), stats
+
+
+def _read_shard(path: str, chunksize: Optional[int]) -> tuple[pd.DataFrame, float]:
+    """Read one shard into a compact frame in a worker process. Return the frame and the time taken."""
+    start = time.perf_counter()
+    frame = _read_compact(path, chunksize)
+    return frame, time.perf_counter() - start
+
+
+def load_cached_shards(source: str, refresh: bool = False, workers: Optional[int] = None) -> pd.DataFrame:
+    """Load the compact dataset of the shards named by source, reusing its binary cache when it is valid.
+
+    The cache is stored next to the shards and keyed by the name, size and modification time of every shard,
+    so adding, removing or changing any shard rebuilds it, as does `refresh`.
+
+    Preconditions:
+    - workers is None or workers > 0
+    """
+    paths = shard_paths(source)
+    if not paths:
+        raise FileNotFoundError(f"No CSV shards match '{source}'. Please check the directory or pattern.")
+    data_path, meta_path = cache_paths(_shard_cache_base(source))
+    listing = [[os.path.basename(path), os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in paths]
+
+    meta = None if refresh else _read_cache_meta(meta_path)
+    listing_digest = hashlib.sha256(json.dumps(listing).encode()).hexdigest()
+    if meta is not None and meta.get("shards") == listing and os.path.exists(data_path):
+        try:
+            df = _read_cache_data(data_path, meta["format"])
+            print("Dataset loaded from cache.")
+            return _with_fingerprint(df, listing_digest)
+        except (OSError, ValueError, ImportError):
+            pass  # unreadable cache; fall through and rebuild it
+
+    df = load_shards(source, workers)[0]
+    print("Dataset loaded successfully.")
+    cache_format = _write_cache_data(df, data_path)
+    _write_json_atomic(meta_path, {"version": CACHE_VERSION, "format": cache_format, "shards": listing})
+    return _with_fingerprint(df, listing_digest)
+
+
+def _shard_cache_base(source: str) -> str:
+    """Return the path the shard cache files of source are named after: the directory itself, or a name
+    derived from the glob pattern in the directory of the pattern.
+    """
+    if os.path.isdir(source):
+        return os.path.normpath(source)
+    digest = hashlib.sha256(source.encode()).hexdigest()[:16]
+    return os.path.join(os.path.dirname(source), f"shards-{digest}")
+
+
+def report_shard_ingestion(source: str, workers: Optional[int] = None) -> None:
+    """Load the shards named by source with load_shards and print the rows, duplicates and throughput
+    of every shard, followed by the total wall time.
+
+    Preconditions:
+    - workers is None or workers > 0
+    """
+    start = time.perf_counter()
+    df, stats = load_shards(source, workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'Shard':<32}{'Rows':>10}{'Dups':>8}{'Time (s)':>10}{'Rows/s':>12}{'MB/s':>8}")
+    for shard in stats:
+        print(f"{os.path.basename(shard.path):<32}{shard.rows:>10,}{shard.duplicates:>8,}{shard.seconds:>10.2f}"
+              f"{shard.rows / shard.seconds:>12,.0f}{shard.size / 2 ** 20 / shard.seconds:>8.1f}")
+    print(f"{len(stats)} shards, {len(df):,} unique posts in {elapsed:.2f} s "
+          f"({sum(shard.rows for shard in stats) / elapsed:,.0f} rows/s overall)")
+
+
+@traced
+def load_cached_dataset(file_path: str = "twitter-posts.csv", refresh: bool = False,
+                        chunksize: Optional[int] = 100_000) -> pd.DataFrame:
+    """Load the compact dataset for file_path, reusing the binary cache stored next to the CSV when it is valid.
+
+    The cache is keyed by the CSV's size, modification time and SHA-256 content hash. Size and mtime are
+    checked first; the hash is only computed when they differ, so a touched but unchanged file does not
+    force a rebuild. The cache is rebuilt whenever the content has changed or `refresh` is True.
+
+    Preconditions:
+    - chunksize is None or chunksize > 0
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(
+            f"The dataset file '{file_path}' does not exist. Please ensure it is downloaded and in the correct folder."
+        )
+    data_path, meta_path = cache_paths(file_path)
+    stat = os.stat(file_path)
+
+    meta = None if refresh else _read_cache_meta(meta_path)
+    if meta is not None and os.path.exists(data_path):
+        if meta["size"] != stat.st_size or meta["mtime_ns"] != stat.st_mtime_ns:
+            if meta["size"] == stat.st_size and meta["sha256"] == file_sha256(file_path):
+                meta.update(mtime_ns=stat.st_mtime_ns)
+                _write_json_atomic(meta_path, meta)
+            else:
+                meta = None
+        if meta is not None:
+            try:
+                df = _read_cache_data(data_path, meta["format"])
+                count("rows", len(df))
+                print("Dataset loaded from cache.")
+                return _with_fingerprint(df, meta["sha256"])
+            except (OSError, ValueError, ImportError):
+                pass  # unreadable cache; fall through and rebuild it
+
+    df = load_dataset(file_path, compact=True, chunksize=chunksize)
+    cache_format = _write_cache_data(df, data_path)
+    meta = {
+        "version": CACHE_VERSION,
+        "format": cache_format,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(file_path),
+    }
+    _write_json_atomic(meta_path, meta)
+    return _with_fingerprint(df, meta["sha256"])
+
+
+def _with_fingerprint(df: pd.DataFrame, source_digest: str) -> pd.DataFrame:
+    """Record a fingerprint of df derived from the digest of its source files and CACHE_VERSION, so that
+    snapshots of data derived from df can be keyed without hashing its rows. Return df.
+    """
+    fingerprint = hashlib.sha256(f"{source_digest}:{CACHE_VERSION}".encode()).hexdigest()
+    cached_for_frame(df, "fingerprint", lambda _: fingerprint)
+    return df
+
+
+def cache_paths(file_path: str) -> tuple[str, str]:
+    """Return the (data, metadata) paths of the binary cache that belongs to the CSV at file_path."""
+    return file_path + ".cache", file_path + ".cache.json"
+
+
+def clear_dataset_cache(file_path: str = "twitter-posts.csv") -> None:
+    """Delete the binary cache of the CSV at file_path, if there is one."""
+    for path in cache_paths(file_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def file_sha256(file_path: str) -> str:
+    """Return the hex SHA-256 digest of the contents of file_path, read in HASH_BLOCK_SIZE blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_cache_meta(meta_path: str) -> Optional[dict]:
+    """Return the cache metadata stored at meta_path, or None if it is missing, unreadable or outdated."""
+    try:
+        with open(meta_path, encoding="utf-8") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("version") != CACHE_VERSION:
+        return None
+    return meta
+
+
+def _write_cache_data(df: pd.DataFrame, data_path: str) -> str:
+    """Write df to data_path as Parquet, falling back to pickle if no Parquet engine is installed.
+    Return the name of the format that was used.
+    """
+    tmp_path = data_path + ".tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+        cache_format = "parquet"
+    except ImportError:
+        df.to_pickle(tmp_path)
+        cache_format = "pickle"
+    os.replace(tmp_path, data_path)
+    return cache_format
+
+
+def _read_cache_data(data_path: str, cache_format: str) -> pd.DataFrame:
+    """Read a cache file written by _write_cache_data in the given format."""
+    if cache_format == "parquet":
+        return pd.read_parquet(data_path)
+    if cache_format == "pickle":
+        return pd.read_pickle(data_path)
+    raise ValueError(f"Unknown cache format '{cache_format}'.")
+
+
+def _write_json_atomic(path: str, content: dict) -> None:
+    """Write content as JSON to path, replacing any previous file atomically."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(content, file)
+    os.replace(tmp_path, path)
+
+
+def measure_load(loader: Callable[..., pd.DataFrame], *args, **kwargs) -> tuple[pd.DataFrame, float, int]:
+    """Run loader(*args, **kwargs) and return the loaded frame, the wall time in seconds and
+    the peak traced memory in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        df = loader(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return df, elapsed, peak
+
+
+def report_load_performance(file_path: str = "twitter-posts.csv", chunksize: int = 100_000) -> None:
+    """Load file_path with the full loader and with the compact loader (whole-file and chunked),
+    then print the load time, peak memory and resulting frame size of each.
+
+    Preconditions:
+    - chunksize > 0
+    """
+    modes = [
+        ("full", {}),
+        ("compact", {"compact": True}),
+        (f"compact, chunks of {chunksize}", {"compact": True, "chunksize": chunksize}),
+    ]
+    rows = []
+    for label, options in modes:
+        df, elapsed, peak = measure_load(load_dataset, file_path, **options)
+        rows.append((label, elapsed, peak, df.memory_usage(deep=True).sum()))
+
+    print(f"\n{'Mode':<32}{'Time (s)':>10}{'Peak (MB)':>12}{'Frame (MB)':>12}")
+    for label, elapsed, peak, frame_size in rows:
+        print(f"{label:<32}{elapsed:>10.2f}{peak / 2 ** 20:>12.1f}{frame_size / 2 ** 20:>12.1f}")
+
+
 if __name__ == "__main__":
+    import python_ta
 
     python_ta.check_all(config={
-        'extra-imports': ['pandas'],  # the names (strs) of imported modules
-        'allowed-io': ['load_dataset'],     # the names (strs) of functions that call print/open/input
+        'extra-imports': ['pandas', 'pandas.api.types', 'glob', 'hashlib', 'json', 'os', 'time', 'tracemalloc',
+                          'concurrent.futures', 'dataclasses', 'typing', 'instrumentation', 'preprocess'],
+        # the names (strs) of functions that call print/open/input
+        'allowed-io': ['load_dataset', 'load_cached_dataset', 'load_cached_shards', 'report_load_performance',
+                       'report_shard_ingestion', 'file_sha256', '_read_cache_meta', '_write_json_atomic'],
         'max-line-length': 130
     })
@@ -0,0 +1,207 @@
+"""CSC111 Final Project: Memory-Mapped Dataset Store
+
+Module Description
+==================
+This module saves the cleaned dataset as a directory of one NumPy file per column, which any number of
+processes can then open as read-only memory maps instead of each loading its own copy of the CSV.
+
+The store holds the integer-coded users, post dates and engagement counts, and the exploded hashtag and mention
+lists (offsets, codes and vocab of each ExplodedColumn of the TagIndex), together with the sorted TimeIndex.
+The operating system shares the mapped pages between processes, so opening a store costs no parsing and the
+numeric data is paged in only as it is used.
+
+load_store_frame turns a store into a DataFrame whose numeric columns are views of the memory maps, and seeds
+the per-frame caches of preprocess with the stored TagIndex and TimeIndex, so the frame can be passed to
+graph_builder, metrics and plotter like a loaded one. The raw text columns are not stored: the analyses read
+hashtags and mentions from the TagIndex only.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+from __future__ import annotations
+import json
+import os
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+import pandas as pd
+from data_loader import COUNT_COLUMNS, DATE_COL, USER_COL
+from graph_snapshots import dataset_fingerprint
+from preprocess import ExplodedColumn, TagIndex, cached_for_frame, get_tag_index
+from time_index import TimeIndex, get_time_index
+
+# Bump whenever the store layout changes so that old stores are rejected.
+STORE_VERSION = 2
+LIST_COLUMNS = ("hashtags", "tagged_tokens", "mentions")
+TIME_ARRAYS = ("order", "times", "days", "day_starts")
+
+
+@dataclass
+class DatasetStore:
+    """An opened dataset store; every array attribute is a memory map of a file in the store, read-only except
+    for counts.
+
+    Instance Attributes:
+    - path: the directory of the store.
+    - n_rows: the number of posts in the store.
+    - user_codes: int32 index into user_names of the posting user of every post (-1 if missing).
+    - user_names: the distinct posting users.
+    - dates: int64 nanoseconds since the epoch (UTC) of every post (the NaT value if missing), or None if
+      the dataset had no post dates.
+    - counts: the int32 likes, reposts and replies of every post, keyed by column name, mapped copy-on-write:
+      they can be modified, and modified pages are copied in memory without changing the store.
+    - tag_index: the TagIndex of the dataset, with memory-mapped offsets and codes.
+    - time_index: the TimeIndex of the dataset, or None if the dataset had no post dates.
+    - fingerprint: the dataset fingerprint (see graph_snapshots) of the frame the store was written from.
+
+    Representation Invariants:
+    - len(self.user_codes) == self.n_rows
+    - all(len(values) == self.n_rows for values in self.counts.values())
+    """
+    path: str
+    n_rows: int
+    user_codes: np.ndarray
+    user_names: list[str]
+    dates: Optional[np.ndarray]
+    counts: dict[str, np.ndarray]
+    tag_index: TagIndex
+    time_index: Optional[TimeIndex]
+    fingerprint: str
+
+
+def write_dataset_store(df: pd.DataFrame, store_dir: str) -> None:
+    """Write the compact frame df to a dataset store in store_dir, replacing any store already there.
+
+    The TagIndex (and TimeIndex, if df has post dates) of df are built if they are not cached yet.
+
+    Preconditions:
+    - df was produced by the compact loader
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    # Removed before any array is written and replaced atomically once all are, so a store that was only
+    # partly written or rewritten is never opened
+    meta_path = os.path.join(store_dir, "meta.json")
+    try:
+        os.remove(meta_path)
+    except FileNotFoundError:
+        pass
+    users = df[USER_COL].astype("category")
+    _save(store_dir, "users.codes", users.cat.codes.to_numpy(dtype=np.int32))
+    _save_vocab(store_dir, "users.vocab", users.cat.categories.astype(str))
+    for col in COUNT_COLUMNS:
+        _save(store_dir, col, df[col].to_numpy(dtype=np.int32))
+
+    has_dates = DATE_COL in df.columns
+    if has_dates:
+        stamps = pd.DatetimeIndex(pd.to_datetime(df[DATE_COL], utc=True, errors="coerce")).as_unit("ns")
+        _save(store_dir, DATE_COL, stamps.asi8)
+        time_index = get_time_index(df)
+        for name in TIME_ARRAYS:
+            _save(store_dir, f"time.{name}", getattr(time_index, name))
+
+    tag_index = get_tag_index(df)
+    for name in LIST_COLUMNS:
+        column = getattr(tag_index, name)
+        _save(store_dir, f"{name}.offsets", column.offsets)
+        _save(store_dir, f"{name}.codes", column.codes)
+        _save_vocab(store_dir, f"{name}.vocab", column.vocab)
+
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"version": STORE_VERSION, "rows": len(df), "dates": has_dates,
+                   "fingerprint": dataset_fingerprint(df)}, file)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def open_dataset_store(store_dir: str) -> DatasetStore:
+    """Open the dataset store in store_dir, memory-mapping its arrays (see DatasetStore).
+
+    Raise a ValueError if store_dir does not hold a complete store of the current STORE_VERSION.
+    """
+    try:
+        with open(os.path.join(store_dir, "meta.json"), encoding="utf-8") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        raise ValueError(f"'{store_dir}' does not contain a dataset store.")
+    if meta.get("version") != STORE_VERSION:
+        raise ValueError(f"The dataset store in '{store_dir}' is outdated; please write it again.")
+
+    tag_index = TagIndex(*(ExplodedColumn(_load(store_dir, f"{name}.offsets"), _load(store_dir, f"{name}.codes"),
+                                          np.asarray(_load_vocab(store_dir, f"{name}.vocab"), dtype=object))
+                           for name in LIST_COLUMNS))
+    time_index = None
+    if meta["dates"]:
+        time_index = TimeIndex(*(_load(store_dir, f"time.{name}") for name in TIME_ARRAYS))
+
+    return DatasetStore(
+        path=store_dir,
+        n_rows=meta["rows"],
+        user_codes=_load(store_dir, "users.codes"),
+        user_names=_load_vocab(store_dir, "users.vocab"),
+        dates=_load(store_dir, DATE_COL) if meta["dates"] else None,
+        counts={col: _load(store_dir, col, "c") for col in COUNT_COLUMNS},
+        tag_index=tag_index,
+        time_index=time_index,
+        fingerprint=meta["fingerprint"],
+    )
+
+
+def load_store_frame(store_dir: str) -> pd.DataFrame:
+    """Return the dataset in the store in store_dir as a DataFrame for the analysis modules.
+
+    The engagement count columns are views of the copy-on-write memory maps, so they take no memory of their
+    own until modified, and modifying them does not change the store. The TagIndex, TimeIndex and dataset
+    fingerprint of the frame are the stored ones.
+    """
+    store = open_dataset_store(store_dir)
+    columns = {USER_COL: pd.Categorical.from_codes(store.user_codes, categories=store.user_names)}
+    if store.dates is not None:
+        columns[DATE_COL] = pd.DatetimeIndex(store.dates.view("M8[ns]")).tz_localize("UTC")
+    columns.update(store.counts)
+    df = pd.DataFrame(columns, copy=False)
+
+    cached_for_frame(df, "tag_index", lambda _: store.tag_index)
+    cached_for_frame(df, "fingerprint", lambda _: store.fingerprint)
+    if store.time_index is not None:
+        cached_for_frame(df, "time_index", lambda _: store.time_index)
+    return df
+
+
+def _save(store_dir: str, name: str, values: np.ndarray) -> None:
+    """Write values to store_dir/<name>.npy."""
+    np.save(os.path.join(store_dir, name + ".npy"), np.ascontiguousarray(values))
+
+
+def _load(store_dir: str, name: str, mode: str = "r") -> np.ndarray:
+    """Memory-map store_dir/<name>.npy read-only, or copy-on-write if mode is 'c'."""
+    return np.load(os.path.join(store_dir, name + ".npy"), mmap_mode=mode)
+
+
+def _save_vocab(store_dir: str, name: str, vocab: np.ndarray) -> None:
+    """Write the strings of vocab to store_dir/<name>.json."""
+    with open(os.path.join(store_dir, name + ".json"), "w", encoding="utf-8") as file:
+        json.dump([str(token) for token in vocab], file)
+
+
+def _load_vocab(store_dir: str, name: str) -> list[str]:
+    """Read the strings written by _save_vocab."""
+    with open(os.path.join(store_dir, name + ".json"), encoding="utf-8") as file:
+        return json.load(file)
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['json', 'os', 'dataclasses', 'typing', 'numpy', 'pandas', 'data_loader', 'graph_snapshots',
+                          'preprocess', 'time_index'],
+        'allowed-io': ['write_dataset_store', 'open_dataset_store', '_save_vocab', '_load_vocab'],
+        'max-line-length': 130
+    })
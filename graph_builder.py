@@ -6,6 +6,10 @@ This module provides functions for constructing different types of graphs based
 user interaction data from a Twitter dataset.
 
 These graphs form the backbone of the network analysis conducted in the rest of the project.
+Mentions are read from the shared TagIndex of the DataFrame, so 'tagged_users' is only parsed once, and every
+builder extracts its edges as whole arrays before loading them into the graph with a single add_edges_from call.
+The same edges can also be loaded into a CompactGraph, which stores them as integer arrays at a fraction of the
+memory of a networkx graph.
 
 Copyright and Usage Information
 ===============================
@@ -18,81 +22,122 @@ without the explicit written permission of the project group.
 
 This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
 """
-import json
 import networkx as nx
-import python_ta
+import numpy as np
 import pandas as pd
+from compact_graph import CompactGraph
+from instrumentation import count, traced
+from preprocess import get_tag_index
 
 USER_COL = "user_posted"
 TAGGED_USERS_COL = "tagged_users"
+REPLY_COL = "replies"
 
 
+@traced
 def build_interaction_graph(df: pd.DataFrame) -> nx.Graph:
     """
     Build an undirected interaction graph from tagged mentions.
     Nodes are users; edges represent mentions.
     """
     interaction_graph = nx.Graph()
-
-    for _, row in df.iterrows():
-        user = row[USER_COL]
-
-        raw_mentions = row[TAGGED_USERS_COL]
-        try:
-            mentions = json.loads(raw_mentions)
-            if isinstance(mentions, list):
-                for m in mentions:
-                    if isinstance(m, dict) and 'profile_name' in m:
-                        tag_name = m['profile_name']
-                        interaction_graph.add_edge(user, tag_name)
-        except TypeError:
-            continue  # skip malformed entries
+    interaction_graph.add_edges_from(zip(*interaction_edges(df)))
+    count("edges", interaction_graph.number_of_edges())
 
     return interaction_graph
 
 
+@traced
 def build_retweet_graph(df: pd.DataFrame) -> nx.DiGraph:
     """
     Build a directed graph from retweet-like behavior.
     Assumes 'tagged_users' column includes retweet mentions.
     """
     retweet_graph = nx.DiGraph()
-
-    for _, row in df.iterrows():
-        user = row[USER_COL]
-        tagged = str(row[TAGGED_USERS_COL]).split(',')
-
-        for tagged_user in tagged:
-            tagged_user = tagged_user.strip()
-            if tagged_user and tagged_user != 'nan':
-                retweet_graph.add_edge(tagged_user, user)
+    retweet_graph.add_edges_from(zip(*retweet_edges(df)))
+    count("edges", retweet_graph.number_of_edges())
 
     return retweet_graph
 
 
+@traced
 def build_reply_graph(df: pd.DataFrame) -> nx.DiGraph:
     """
     Build a directed graph for reply trees (parent -> reply).
     Since we don't have reply IDs, we'll simulate using 'replies' field.
     """
     reply_graph = nx.DiGraph()
+    reply_graph.add_edges_from(zip(*reply_edges(df)))
+    count("edges", reply_graph.number_of_edges())
+
+    return reply_graph
 
-    for _, row in df.iterrows():
-        user = row[USER_COL]
-        replies = str(row['replies']).split(',')
 
-        for reply in replies:
-            reply = reply.strip()
-            if reply and reply != 'nan':
-                reply_graph.add_edge(user, reply)
+@traced
+def build_compact_interaction_graph(df: pd.DataFrame) -> CompactGraph:
+    """Return the graph of build_interaction_graph as a CompactGraph, with the same node order."""
+    graph = CompactGraph.from_edges(*interaction_edges(df), directed=False)
+    count("edges", len(graph.neighbors))
+    return graph
 
-    return reply_graph
+
+@traced
+def build_compact_retweet_graph(df: pd.DataFrame) -> CompactGraph:
+    """Return the graph of build_retweet_graph as a CompactGraph, with the same node order."""
+    graph = CompactGraph.from_edges(*retweet_edges(df), directed=True)
+    count("edges", len(graph.neighbors))
+    return graph
+
+
+@traced
+def build_compact_reply_graph(df: pd.DataFrame) -> CompactGraph:
+    """Return the graph of build_reply_graph as a CompactGraph, with the same node order."""
+    graph = CompactGraph.from_edges(*reply_edges(df), directed=True)
+    count("edges", len(graph.neighbors))
+    return graph
+
+
+def interaction_edges(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (posting user, mentioned user) pair of every mention in df as two aligned arrays."""
+    mentions = get_tag_index(df).mentions
+    users = df[USER_COL].to_numpy()
+    return users[mentions.rows], mentions.values
+
+
+def retweet_edges(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (tagged user, posting user) pair of every comma-separated 'tagged_users' token in df
+    as two aligned arrays.
+    """
+    tagged = get_tag_index(df).tagged_tokens
+    users = df[USER_COL].to_numpy()
+    return tagged.values, users[tagged.rows]
+
+
+def reply_edges(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (posting user, reply token) pair of every comma-separated 'replies' token in df
+    as two aligned arrays.
+
+    A numeric 'replies' column (the reply count of each post, as both loaders read it) gives one token per post
+    with at least one reply, the count written as an integer, so the compact loader (which stores missing counts
+    as 0) and the plain loader (which keeps them as NaN and the counts as floats) give the same edges.
+    """
+    if pd.api.types.is_numeric_dtype(df[REPLY_COL]):
+        counts = df[REPLY_COL].to_numpy(dtype=np.float64, na_value=np.nan)
+        has_replies = counts > 0
+        tokens = counts[has_replies].astype(np.int64).astype(str).astype(object)
+        return df[USER_COL].to_numpy()[has_replies], tokens
+    replies = pd.Series(df[REPLY_COL].to_numpy()).astype(str).str.split(',').explode().str.strip()
+    replies = replies[replies.notna() & (replies != '') & (replies != 'nan')]
+    users = df[USER_COL].to_numpy()[replies.index.to_numpy()]
+    return users, replies.to_numpy(dtype=object)
 
 
 if __name__ == "__main__":
+    import python_ta
 
     python_ta.check_all(config={
-        'extra-imports': ['pandas', 'networkx', 'json'],  # the names (strs) of imported modules
+        'extra-imports': ['pandas', 'networkx', 'numpy', 'compact_graph', 'instrumentation',
+                          'preprocess'],  # the names (strs) of imported modules
         'allowed-io': [],     # the names (strs) of functions that call print/open/input
         'max-line-length': 130
     })
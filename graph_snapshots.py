@@ -0,0 +1,180 @@
+"""CSC111 Final Project: Graph Snapshots
+
+Module Description
+==================
+This module saves the user graphs built from a dataset as binary snapshots on disk, so later runs load them in
+milliseconds instead of rebuilding them from the rows.
+
+A snapshot is a CompactGraph written to an .npz file (with its node names in a JSON file next to it), keyed by
+the kind of graph, a fingerprint of the dataset and BUILDER_VERSION. The fingerprint of a frame returned by
+data_loader.load_cached_dataset is derived from the SHA-256 of its CSV; any other frame is fingerprinted by
+hashing the columns the graphs are built from. A snapshot is therefore rebuilt only when the dataset or the
+builders change. Whether each graph was loaded or rebuilt, and how long that took, is printed.
+
+Only the SNAPSHOTS_PER_KIND most recently used snapshots of each kind of graph are kept, so snapshots of
+earlier versions of a dataset or of the builders do not pile up.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Callable, Optional
+import numpy as np
+import pandas as pd
+from compact_graph import CompactGraph
+from graph_builder import (REPLY_COL, TAGGED_USERS_COL, USER_COL, build_compact_interaction_graph,
+                           build_compact_reply_graph, build_compact_retweet_graph)
+from instrumentation import count, traced
+from preprocess import cached_for_frame
+
+SNAPSHOT_DIR = ".graph_snapshots"
+# Bump whenever a graph builder changes what it produces so that old snapshots are rebuilt.
+BUILDER_VERSION = 2
+SNAPSHOTS_PER_KIND = 4
+GRAPH_COLUMNS = [USER_COL, TAGGED_USERS_COL, REPLY_COL]
+
+GRAPH_BUILDERS: dict[str, Callable[[pd.DataFrame], CompactGraph]] = {
+    "interaction": build_compact_interaction_graph,
+    "retweet": build_compact_retweet_graph,
+    "reply": build_compact_reply_graph,
+}
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Return a hex digest identifying the contents of df, computing it on first use only.
+
+    Preconditions:
+    - df contains 'user_posted', 'tagged_users' and 'replies' columns, or was returned by the cached loader
+    """
+    return cached_for_frame(df, "fingerprint", _hash_frame)
+
+
+def _hash_frame(df: pd.DataFrame) -> str:
+    """Return the SHA-256 hex digest of the hashed rows of the graph columns of df."""
+    rows = pd.util.hash_pandas_object(df[GRAPH_COLUMNS].astype(object), index=False).to_numpy()
+    return hashlib.sha256(rows.tobytes()).hexdigest()
+
+
+def load_graph(df: pd.DataFrame, kind: str, build: Optional[Callable[[pd.DataFrame], CompactGraph]] = None,
+               persist: bool = True, snapshot_dir: str = SNAPSHOT_DIR) -> CompactGraph:
+    """Return the graph of the given kind for df, from memory, from its snapshot, or by building it.
+
+    build defaults to the builder of kind in GRAPH_BUILDERS. A rebuilt graph is saved as a snapshot in
+    snapshot_dir unless persist is False. The graph is also kept with df, so asking again is free.
+
+    Preconditions:
+    - build is not None or kind in GRAPH_BUILDERS
+    """
+    build = build or GRAPH_BUILDERS[kind]
+    return cached_for_frame(df, f"graph:{kind}", lambda frame: _load_or_build(frame, kind, build, persist, snapshot_dir))
+
+
+def _load_or_build(df: pd.DataFrame, kind: str, build: Callable[[pd.DataFrame], CompactGraph], persist: bool,
+                   snapshot_dir: str) -> CompactGraph:
+    """Load the snapshot of the given kind of graph for df, or build the graph (and save it if persist)."""
+    start = time.perf_counter()
+    stem = ""
+    if persist:
+        stem = os.path.join(snapshot_dir, f"{kind}-{dataset_fingerprint(df)[:20]}-v{BUILDER_VERSION}")
+        graph = read_snapshot(stem)
+        if graph is not None:
+            print(f"Loaded the {kind} graph snapshot in {time.perf_counter() - start:.3f} s.")
+            return graph
+
+    graph = build(df)
+    elapsed = time.perf_counter() - start
+    if persist:
+        write_snapshot(graph, stem)
+        _prune_snapshots(snapshot_dir, kind)
+        print(f"Built the {kind} graph in {elapsed:.3f} s and saved a snapshot.")
+    return graph
+
+
+def write_snapshot(graph: CompactGraph, stem: str) -> None:
+    """Write graph to stem.npz and its node names to stem.json."""
+    os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+    names = [None if isinstance(name, float) and np.isnan(name) else name for name in graph.names]
+    with open(stem + ".json.tmp", "w", encoding="utf-8") as file:
+        json.dump(names, file)
+    np.savez(stem + ".tmp.npz", offsets=graph.offsets, neighbors=graph.neighbors, directed=graph.directed)
+    os.replace(stem + ".json.tmp", stem + ".json")
+    os.replace(stem + ".tmp.npz", stem + ".npz")  # replaced last: a snapshot is only read once its .npz exists
+
+
+@traced
+def read_snapshot(stem: str) -> Optional[CompactGraph]:
+    """Return the graph written to stem by write_snapshot, or None if there is no usable snapshot."""
+    try:
+        with np.load(stem + ".npz", allow_pickle=False) as data:
+            offsets, neighbors, directed = data["offsets"], data["neighbors"], bool(data["directed"])
+        with open(stem + ".json", encoding="utf-8") as file:
+            names = json.load(file)
+    except (OSError, ValueError, KeyError):
+        return None
+    node_names = np.empty(len(names), dtype=object)
+    node_names[:] = [np.nan if name is None else name for name in names]
+    if len(offsets) != len(node_names) + 1:
+        return None
+    try:
+        os.utime(stem + ".npz")  # mark as recently used for _prune_snapshots
+    except OSError:
+        pass
+    count("edges", len(neighbors))
+    return CompactGraph(offsets, neighbors, node_names, directed)
+
+
+def _prune_snapshots(snapshot_dir: str, kind: str) -> None:
+    """Delete the least recently used snapshots of the given kind of graph in snapshot_dir beyond the newest
+    SNAPSHOTS_PER_KIND, whatever dataset fingerprint or BUILDER_VERSION they were written with.
+    """
+    pattern = re.compile(re.escape(kind) + r"-[0-9a-f]{20}-v\d+\.npz")
+    stems = [os.path.join(snapshot_dir, name[:-len(".npz")]) for name in os.listdir(snapshot_dir)
+             if pattern.fullmatch(name)]
+    if len(stems) <= SNAPSHOTS_PER_KIND:
+        return
+    stems.sort(key=lambda stem: _modified_time(stem + ".npz"))
+    for stem in stems[:len(stems) - SNAPSHOTS_PER_KIND]:
+        for path in (stem + ".npz", stem + ".json"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # already removed by another process
+
+
+def _modified_time(path: str) -> float:
+    """Return the modification time of path, or 0 if it was removed since it was listed."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def clear_graph_snapshots(snapshot_dir: str = SNAPSHOT_DIR) -> None:
+    """Delete every graph snapshot in snapshot_dir."""
+    if os.path.isdir(snapshot_dir):
+        for name in os.listdir(snapshot_dir):
+            if name.endswith((".npz", ".json")):
+                os.remove(os.path.join(snapshot_dir, name))
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['hashlib', 'json', 'os', 're', 'time', 'typing', 'numpy', 'pandas', 'compact_graph',
+                          'graph_builder', 'instrumentation', 'preprocess'],
+        'allowed-io': ['_load_or_build', 'write_snapshot', 'read_snapshot'],
+        'max-line-length': 130
+    })
@@ -0,0 +1,317 @@
+"""CSC111 Final Project: Instrumentation
+
+Module Description
+==================
+This module measures where the time of an analysis goes: loading, parsing, building graphs, PageRank or
+drawing. Functions of the analysis modules are wrapped with traced, which records a timing span for every
+call, nested under the span of the caller, and count adds to counters of the current span (rows read,
+edges built, iterations run).
+
+Instrumentation is off until enable is called. While it is off, a traced function costs one extra function
+call and a flag check, and count returns at once.
+
+A span started with no enclosing span becomes a trace of its own. main.py instead starts one trace per menu
+action with begin_trace and runs the action's work inside it with within, which can also profile the work
+with cProfile and record its peak traced memory. The recent traces can be formatted as an indented breakdown
+or written to a file in the Chrome trace event format, which chrome://tracing and Perfetto display.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+from __future__ import annotations
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+MAX_TRACES = 50
+PROFILE_LINES = 25
+
+_settings = {"enabled": False, "profile": False, "memory": False, "started_tracing": False}
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_traces: deque[Span] = deque(maxlen=MAX_TRACES)
+_traces_lock = threading.Lock()
+
+
+@dataclass
+class Span:
+    """A timed section of work, with the spans started inside it.
+
+    Instance Attributes:
+    - name: what the section does, usually the qualified name of a function.
+    - start: the time.perf_counter() at which the section started.
+    - end: the time.perf_counter() at which the section ended, or None while it is running.
+    - thread: the id of the thread that started the section.
+    - counters: totals added with count while the section was the current span.
+    - children: the spans started directly inside this one, in order.
+    - profile: the cProfile reports of the work done inside the span, if it was profiled.
+
+    Representation Invariants:
+    - self.end is None or self.end >= self.start
+    """
+    name: str
+    start: float
+    end: Optional[float] = None
+    thread: int = 0
+    counters: dict[str, float] = field(default_factory=dict)
+    children: list[Span] = field(default_factory=list)
+    profile: list[str] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        """Return the duration of the span, up to now if it is still running."""
+        return (time.perf_counter() if self.end is None else self.end) - self.start
+
+
+class _SpanContext:
+    """The context manager returned by span while instrumentation is on."""
+    _name: str
+    _span: Optional[Span]
+    _token: Any
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._span = None
+        self._token = None
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        self._span = Span(self._name, time.perf_counter(), thread=threading.get_ident())
+        if parent is None:
+            _add_trace(self._span)
+        else:
+            parent.children.append(self._span)
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._span.end = time.perf_counter()
+        _current_span.reset(self._token)
+
+
+class _NoSpan:
+    """The context manager returned by span while instrumentation is off; it does nothing."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def enable(profile: bool = False, memory: bool = False) -> None:
+    """Turn instrumentation on. If profile is True, the work run with within is also profiled with cProfile;
+    if memory is True, its peak traced memory is recorded with tracemalloc (which slows it down).
+    """
+    _settings.update(enabled=True, profile=profile, memory=memory)
+    if memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _settings["started_tracing"] = True
+
+
+def disable() -> None:
+    """Turn instrumentation off, stopping memory tracing if enable started it (tracing started by anything
+    else is left running).
+    """
+    if _settings["started_tracing"]:
+        import tracemalloc
+        tracemalloc.stop()
+    _settings.update(enabled=False, profile=False, memory=False, started_tracing=False)
+
+
+def is_enabled() -> bool:
+    """Return whether instrumentation is on."""
+    return _settings["enabled"]
+
+
+def span(name: str) -> Any:
+    """Return a context manager that records the work inside it as a span called name, nested in the
+    current span. It yields the Span, or None while instrumentation is off.
+    """
+    return _SpanContext(name) if _settings["enabled"] else _NO_SPAN
+
+
+def traced(func: Callable) -> Callable:
+    """Return func wrapped so that each call is recorded as a span named after func's module and name."""
+    name = f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> Any:
+        """Call func, inside a span if instrumentation is on."""
+        if not _settings["enabled"]:
+            return func(*args, **kwargs)
+        with _SpanContext(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def count(name: str, value: float = 1) -> None:
+    """Add value to the counter called name of the current span, if instrumentation is on."""
+    if _settings["enabled"]:
+        current = _current_span.get()
+        if current is not None:
+            current.counters[name] = current.counters.get(name, 0) + value
+
+
+def begin_trace(name: str) -> Optional[Span]:
+    """Start and return a trace called name for work to be run with within, or return None if
+    instrumentation is off. The trace is listed by recent_traces right away.
+    """
+    if not _settings["enabled"]:
+        return None
+    trace = Span(name, time.perf_counter(), thread=threading.get_ident())
+    _add_trace(trace)
+    return trace
+
+
+def within(trace: Optional[Span], func: Callable) -> Callable:
+    """Return a function that calls func with trace as the current span, extending the end of trace to
+    when func returns. func is returned unchanged if trace is None.
+
+    While it runs, func is profiled with cProfile and its peak traced memory recorded under the counter
+    'peak_mb' if enable asked for that. Work from several threads may run within one trace; the memory
+    peak is shared by everything running at the same time.
+    """
+    if trace is None:
+        return func
+
+    def run(*args, **kwargs) -> Any:
+        """Call func inside trace."""
+        token = _current_span.set(trace)
+        profiler = _start_profile()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _finish_profile(trace, profiler)
+            trace.end = max(trace.end or 0.0, time.perf_counter())
+            _current_span.reset(token)
+
+    return run
+
+
+def discard_trace(trace: Optional[Span]) -> None:
+    """Remove trace (started by begin_trace) from the recent traces, for work that was never run.
+    Do nothing if trace is None or no longer recent.
+    """
+    with _traces_lock:
+        remaining = [recent for recent in _traces if recent is not trace]
+        _traces.clear()
+        _traces.extend(remaining)
+
+
+def recent_traces() -> list[Span]:
+    """Return the last MAX_TRACES traces, most recent first."""
+    with _traces_lock:
+        return list(reversed(_traces))
+
+
+def clear_traces() -> None:
+    """Forget every recorded trace."""
+    with _traces_lock:
+        _traces.clear()
+
+
+def format_breakdown(trace: Span) -> str:
+    """Return the spans of trace as an indented table of durations, shares of the parent and counters,
+    followed by its cProfile reports if it was profiled.
+    """
+    lines = []
+    _format_span(trace, 0, trace.seconds, lines)
+    for report in trace.profile:
+        lines.extend(["", report])
+    return "\n".join(lines)
+
+
+def _format_span(current: Span, depth: int, parent_seconds: float, lines: list[str]) -> None:
+    """Append the line of current and those of its children (indented one more level) to lines."""
+    share = current.seconds / parent_seconds * 100 if parent_seconds > 0 else 100.0
+    counters = ", ".join(f"{name}={value:,.0f}" if float(value).is_integer() else f"{name}={value:,.2f}"
+                         for name, value in current.counters.items())
+    lines.append(f"{'  ' * depth}{current.name:<{max(60 - 2 * depth, 20)}} {current.seconds * 1000:>10.1f} ms "
+                 f"{share:>5.1f}%  {counters}".rstrip())
+    for child in current.children:
+        _format_span(child, depth + 1, current.seconds, lines)
+
+
+def write_chrome_trace(path: str, traces: Optional[list[Span]] = None) -> None:
+    """Write traces (the recent traces by default) to path in the Chrome trace event format."""
+    traces = recent_traces() if traces is None else traces
+    events = []
+    for trace in traces:
+        _trace_events(trace, events)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+def _trace_events(current: Span, events: list[dict]) -> None:
+    """Append a complete ('X') event for current and each of its descendants to events."""
+    events.append({"name": current.name, "ph": "X", "ts": current.start * 1e6, "dur": current.seconds * 1e6,
+                   "pid": os.getpid(), "tid": current.thread, "args": dict(current.counters)})
+    for child in current.children:
+        _trace_events(child, events)
+
+
+def _add_trace(trace: Span) -> None:
+    """Add trace to the recent traces."""
+    with _traces_lock:
+        _traces.append(trace)
+
+
+def _start_profile() -> Any:
+    """Start and return a cProfile profiler if profiling is on, and reset the traced memory peak if
+    memory tracing is on. Return None if profiling is off.
+    """
+    if _settings["memory"]:
+        import tracemalloc
+        tracemalloc.reset_peak()
+    if not _settings["profile"]:
+        return None
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _finish_profile(trace: Span, profiler: Any) -> None:
+    """Stop profiler (if any) and add its report to trace, and record the traced memory peak if on."""
+    if _settings["memory"]:
+        import tracemalloc
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        trace.counters["peak_mb"] = max(trace.counters.get("peak_mb", 0.0), peak)
+    if profiler is not None:
+        import io
+        import pstats
+        profiler.disable()
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        trace.profile.append(report.getvalue().strip())
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['functools', 'json', 'os', 'threading', 'time', 'collections', 'contextvars',
+                          'dataclasses', 'typing', 'tracemalloc', 'cProfile', 'io', 'pstats'],
+        'allowed-io': ['write_chrome_trace'],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
@@ -0,0 +1,178 @@
+"""CSC111 Final Project: Network Layout Cache
+
+Module Description
+==================
+This module computes node positions for the network plots and caches them, so reopening a view does not
+recompute its force-directed layout.
+
+Layouts are keyed by a fingerprint of the graph (its nodes, edges and edge weights) together with the layout
+parameters, and are kept both in memory and as .npz files on disk, so they survive restarts of the program.
+Both caches are bounded: the MEMORY_CACHE_SIZE most recently used layouts stay in memory, and the
+DISK_CACHE_FILES most recently used files stay on disk, so windowed views do not make them grow forever.
+Besides the exact spring layout used so far, a faster option runs fewer force-directed iterations starting from
+the previous layout of the same view, which keeps large graphs quick to re-lay out and visually stable.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+import networkx as nx
+import numpy as np
+from instrumentation import traced
+
+LAYOUT_CACHE_DIR = ".layout_cache"
+LAYOUT_METHODS = ("auto", "spring", "fast")
+# Graphs with at least this many nodes use the fast layout under method='auto'
+LARGE_GRAPH_NODES = 500
+SPRING_ITERATIONS = 50
+FAST_ITERATIONS = 15
+MEMORY_CACHE_SIZE = 64
+DISK_CACHE_FILES = 256
+
+# layout key -> positions, least recently used first; view name -> positions of the last layout of that view
+_MEMORY_CACHE: OrderedDict[str, dict] = OrderedDict()
+_LAST_LAYOUT: dict[str, dict] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def graph_fingerprint(graph: nx.Graph, weight: str = "weight") -> str:
+    """Return a hex digest identifying the nodes (in order), edges and edge weights of graph."""
+    digest = hashlib.sha256()
+    index = {node: i for i, node in enumerate(graph)}
+    digest.update(repr(list(index)).encode())
+    edges = sorted((min(index[u], index[v]), max(index[u], index[v]), data.get(weight, 1))
+                   for u, v, data in graph.edges(data=True))
+    digest.update(repr(edges).encode())
+    return digest.hexdigest()
+
+
+@traced
+def compute_layout(graph: nx.Graph, view: Optional[str] = None, method: str = "auto", seed: int = 42,
+                   cache_dir: Optional[str] = LAYOUT_CACHE_DIR) -> dict:
+    """Return a mapping from each node of graph to its 2D position, reusing a cached layout if there is one.
+
+    method='spring' is nx.spring_layout with the given seed, as the plots have always used. method='fast'
+    runs FAST_ITERATIONS iterations instead of SPRING_ITERATIONS, starting from the positions the nodes had
+    in the last layout computed for the same view (nodes new to the view start at random positions).
+    method='auto' picks 'fast' for graphs of at least LARGE_GRAPH_NODES nodes and 'spring' otherwise.
+    Layouts are cached in memory and, unless cache_dir is None, as .npz files in cache_dir (see
+    MEMORY_CACHE_SIZE and DISK_CACHE_FILES).
+
+    Preconditions:
+    - method in LAYOUT_METHODS
+    """
+    if method not in LAYOUT_METHODS:
+        raise ValueError(f"Unknown layout method '{method}'; expected one of {LAYOUT_METHODS}.")
+    if method == "auto":
+        method = "fast" if graph.number_of_nodes() >= LARGE_GRAPH_NODES else "spring"
+
+    key = hashlib.sha256(f"{graph_fingerprint(graph)}|{method}|{seed}".encode()).hexdigest()
+    with _CACHE_LOCK:
+        pos = _MEMORY_CACHE.get(key)
+    if pos is None and cache_dir is not None:
+        pos = _read_layout(graph, os.path.join(cache_dir, key + ".npz"))
+    if pos is None:
+        if method == "fast":
+            pos = _fast_layout(graph, _LAST_LAYOUT.get(view, {}), seed)
+        else:
+            pos = nx.spring_layout(graph, iterations=SPRING_ITERATIONS, seed=seed)
+        if cache_dir is not None:
+            _write_layout(graph, pos, cache_dir, key)
+            _prune_layout_files(cache_dir)
+
+    with _CACHE_LOCK:
+        _MEMORY_CACHE[key] = pos
+        _MEMORY_CACHE.move_to_end(key)
+        while len(_MEMORY_CACHE) > MEMORY_CACHE_SIZE:
+            _MEMORY_CACHE.popitem(last=False)
+    if view is not None:
+        _LAST_LAYOUT[view] = pos
+    return pos
+
+
+def clear_layout_cache(cache_dir: Optional[str] = LAYOUT_CACHE_DIR) -> None:
+    """Forget every cached layout, in memory and in cache_dir."""
+    with _CACHE_LOCK:
+        _MEMORY_CACHE.clear()
+    _LAST_LAYOUT.clear()
+    if cache_dir is not None and os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith(".npz"):
+                os.remove(os.path.join(cache_dir, name))
+
+
+def _fast_layout(graph: nx.Graph, previous: dict, seed: int) -> dict:
+    """Run a short force-directed layout of graph starting from the previous positions of its nodes."""
+    rng = np.random.default_rng(seed)
+    initial = {node: previous[node] if node in previous else rng.random(2) for node in graph}
+    return nx.spring_layout(graph, pos=initial, iterations=FAST_ITERATIONS, seed=seed)
+
+
+def _read_layout(graph: nx.Graph, path: str) -> Optional[dict]:
+    """Return the layout stored at path for graph, or None if there is no usable file."""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            coordinates = data["positions"]
+    except (OSError, ValueError, KeyError):
+        return None
+    if coordinates.shape != (graph.number_of_nodes(), 2):
+        return None
+    try:
+        os.utime(path)  # mark as recently used for _prune_layout_files
+    except OSError:
+        pass
+    return dict(zip(graph, coordinates))
+
+
+def _write_layout(graph: nx.Graph, pos: dict, cache_dir: str, key: str) -> None:
+    """Store the positions of the nodes of graph, in node order, as cache_dir/<key>.npz."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key + ".npz")
+    tmp_path = os.path.join(cache_dir, key + ".tmp.npz")
+    np.savez(tmp_path, positions=np.array([pos[node] for node in graph], dtype=np.float64).reshape(-1, 2))
+    os.replace(tmp_path, path)
+
+
+def _prune_layout_files(cache_dir: str) -> None:
+    """Delete the least recently used layout files of cache_dir beyond the newest DISK_CACHE_FILES."""
+    paths = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+             if name.endswith(".npz") and not name.endswith(".tmp.npz")]
+    if len(paths) <= DISK_CACHE_FILES:
+        return
+    paths.sort(key=_modified_time)
+    for path in paths[:len(paths) - DISK_CACHE_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # already removed by another thread
+
+
+def _modified_time(path: str) -> float:
+    """Return the modification time of path, or 0 if it was removed (by another thread) since it was listed."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['hashlib', 'os', 'threading', 'collections', 'typing', 'networkx', 'numpy',
+                          'instrumentation'],  # the names (strs) of imported modules
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
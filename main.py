@@ -6,6 +6,16 @@ This module defines the graphical user interface (GUI) for interacting with the
 data analysis toolkit. It uses the Tkinter library to display a menu of visual and
 text-based data analysis options.
 
+The menu is shown before anything heavy happens: the dataset is loaded on a worker thread, and the
+analysis modules (and with them pandas, networkx and matplotlib) are only imported when first needed.
+Run with --startup-check to measure the time until the menu is shown against STARTUP_BUDGET_SECONDS,
+and with --lint to run python_ta instead of the GUI.
+
+Run with --instrument to record where the time of every menu action goes (see instrumentation), with
+--profile to also profile each action with cProfile, or with --trace-memory to also record its peak memory.
+The breakdown of the recent actions is shown by the performance breakdown button, which also writes them to
+TRACE_PATH for chrome://tracing or Perfetto.
+
 Copyright and Usage Information
 ===============================
 
@@ -18,90 +28,302 @@ without the explicit written permission of the project group.
 This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
 """
 
+import time
+import importlib
 import tkinter as tk
-from tkinter import simpledialog, messagebox, scrolledtext
+from tkinter import simpledialog, messagebox, scrolledtext, ttk
 import sys
-from io import StringIO
-import python_ta
-from pandas import DataFrame
-from data_loader import load_dataset
-from metrics import (
-    compute_pagerank,
-)
-from plotter import (
-    plot_user_hashtag_graph,
-    plot_hashtag_cooccurrence,
-    plot_engagement_distribution,
-    generate_hashtag_wordcloud
-)
-
-
-def show_output_window(title: str, content: str) -> None:
-    """Display a new window with scrollable text content."""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import instrumentation
+
+PROCESS_START = time.perf_counter()
+
+DATASET_PATH = "twitter-posts.csv"
+TRACE_PATH = "analysis-trace.json"
+POLL_INTERVAL_MS = 100
+WORKER_THREADS = 2
+# Time from the start of main.py until the menu is drawn
+STARTUP_BUDGET_SECONDS = 0.5
+
+
+class AnalysisRunner:
+    """Runs analyses on worker threads and hands their results back to the Tk thread.
+
+    Tk widgets may only be touched from the thread running the main loop, so the runner polls its
+    jobs with root.after and calls each job's render function on the Tk thread once it finishes.
+    A job that is still running cannot be interrupted; cancelling it discards its result instead.
+
+    Instance Attributes:
+    - root: the Tk root window.
+    - status: the text shown in the status bar.
+    - progress: the progress bar, animated while any job is running.
+    - cancel_button: the button that cancels every running job.
+    """
+    root: tk.Tk
+    status: tk.StringVar
+    progress: ttk.Progressbar
+    cancel_button: tk.Button
+    _executor: ThreadPoolExecutor
+    _jobs: dict[str, tuple[str, Future, Callable[[Any], None], Optional[instrumentation.Span]]]
+    _polling: bool
+
+    def __init__(self, root_window: tk.Tk, max_workers: int = WORKER_THREADS) -> None:
+        """Initialize the runner and add its status bar, progress bar and cancel button to root_window.
+
+        Preconditions:
+        - max_workers > 0
+        """
+        self.root = root_window
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self._jobs = {}
+        self._polling = False
+
+        self.status = tk.StringVar(value="Ready")
+        bar = tk.Frame(root_window)
+        bar.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+        tk.Label(bar, textvariable=self.status, anchor="w").pack(side=tk.TOP, fill=tk.X)
+        self.progress = ttk.Progressbar(bar, mode="indeterminate")
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cancel_button = tk.Button(bar, text="Cancel", state=tk.DISABLED, command=self.cancel)
+        self.cancel_button.pack(side=tk.RIGHT, padx=(5, 0))
+
+    def submit(self, key: str, title: str, compute: Callable[[], Any], render: Callable[[Any], None]) -> Future:
+        """Run compute on a worker thread, then call render with its result on the Tk thread.
+        Return the future of the job.
+
+        A job with the same key that is still running absorbs the request, so repeated clicks
+        on one button start a single job. If instrumentation is on, compute and render are recorded
+        in one trace named title.
+        """
+        if key in self._jobs:
+            self.status.set(f"{title} is already running...")
+            return self._jobs[key][1]
+        trace = instrumentation.begin_trace(title)
+        future = self._executor.submit(instrumentation.within(trace, compute))
+        self._jobs[key] = (title, future, instrumentation.within(trace, render), trace)
+        self._refresh()
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        return future
+
+    def cancel(self) -> None:
+        """Cancel every running job. Jobs that have already started finish in the background and
+        their results are discarded; the traces of jobs that never started are dropped.
+        """
+        for _, future, _, trace in self._jobs.values():
+            if future.cancel():
+                instrumentation.discard_trace(trace)
+        self._jobs.clear()
+        self._refresh()
+
+    def shutdown(self) -> None:
+        """Cancel every job and stop the worker threads without waiting for them."""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self) -> None:
+        """Render the results of finished jobs and poll again while any job is still running."""
+        finished = [key for key, (_, future, _, _) in self._jobs.items() if future.done()]
+        for key in finished:
+            title, future, render, _ = self._jobs.pop(key)
+            self._refresh()
+            error = future.exception()
+            if error is not None:
+                messagebox.showerror("Error", f"{title} failed: {error}")
+            else:
+                render(future.result())
+
+        if self._jobs:
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _refresh(self) -> None:
+        """Update the status bar, progress bar and cancel button to reflect the running jobs."""
+        if self._jobs:
+            self.status.set("Running: " + ", ".join(title for title, _, _, _ in self._jobs.values()))
+            self.progress.start(10)
+            self.cancel_button.config(state=tk.NORMAL)
+        else:
+            self.status.set("Ready")
+            self.progress.stop()
+            self.cancel_button.config(state=tk.DISABLED)
+
+
+def lazy(module: str, name: str) -> Callable[..., Any]:
+    """Return a function that imports module when first called and forwards its arguments to module.name."""
+
+    def call(*args, **kwargs) -> Any:
+        """Call module.name, importing module if it has not been imported yet."""
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+
+    return call
+
+
+def load_analysis_dataset(refresh: bool) -> Any:
+    """Load the dataset and build the shared hashtag index and per-user aggregates used by every analysis."""
+    dataset = lazy("data_loader", "load_cached_dataset")(DATASET_PATH, refresh=refresh)
+    lazy("preprocess", "get_tag_index")(dataset)
+    lazy("aggregates", "get_user_aggregates")(dataset)
+    return dataset
+
+
+def show_output_window(title: str, content: str, width: int = 60) -> None:
+    """Display a new window with scrollable text content, width characters wide."""
 
     output_win = tk.Toplevel(root)
     output_win.title(title)
-    text_area = scrolledtext.ScrolledText(output_win, wrap=tk.WORD, width=60, height=20)
+    text_area = scrolledtext.ScrolledText(output_win, wrap=tk.WORD, width=width, height=20)
     text_area.pack(padx=10, pady=10)
     text_area.insert(tk.END, content)
     text_area.config(state=tk.DISABLED)
 
 
-def run_analysis(choice: str, df: DataFrame) -> None:
+def show_text(title: str) -> Callable[[str], None]:
+    """Return a render function that shows its text result in an output window with the given title."""
+    return lambda content: show_output_window(title, content)
+
+
+def show_figure(draw: Callable[..., Any], empty_message: str) -> Callable[[Optional[tuple]], None]:
+    """Return a render function that draws its prepared arguments with draw and shows the figure,
+    or shows empty_message if there was nothing to draw.
+    """
+
+    def render(prepared: Optional[tuple]) -> None:
+        """Draw and show prepared, or tell the user there is nothing to show."""
+        if prepared is None:
+            messagebox.showinfo("Notice", empty_message)
+            return
+        draw(*prepared)
+        # Shown once render has returned, so the time the figure stays open is not counted as drawing time
+        root.after_idle(lazy("matplotlib.pyplot", "show"))
+
+    return render
+
+
+def run_analysis(choice: str, dataset: Future) -> None:
     """Run the selected analysis option based on user input.
 
+    The analysis itself runs on a worker thread, after waiting for the dataset to finish loading
+    if necessary; its output window or figure is shown once it finishes.
+
     Preconditions:
-    - `df` is a non-empty pandas DataFrame with valid Twitter data and
+    - `dataset` resolves to a non-empty pandas DataFrame with valid Twitter data and
       includes at least the following columns: "user_posted", "likes",
       "reposts", "replies", and "hashtags".
     """
 
-    if choice == "1":
-        top_users = df.groupby("user_posted")["likes"].sum().sort_values(ascending=False).head(10)
-        show_output_window("Top Users by Likes", top_users.to_string())
-    elif choice == "2":
-        top_users = df.groupby("user_posted")["reposts"].sum().sort_values(ascending=False).head(10)
-        show_output_window("Top Users by Retweets", top_users.to_string())
-    elif choice == "3":
-        top_users = df.groupby("user_posted")["replies"].sum().sort_values(ascending=False).head(10)
-        show_output_window("Top Users by Replies", top_users.to_string())
-    elif choice == "4":
-        buffer = StringIO()
-        sys.stdout = buffer
-        compute_pagerank(df)
-        sys.stdout = sys.__stdout__
-        show_output_window("PageRank Influencers", buffer.getvalue())
+    def df() -> Any:
+        """Return the loaded dataset, waiting for it if it is still loading."""
+        with instrumentation.span("waiting for the dataset"):
+            return dataset.result()
+
+    top_users = lazy("metrics", "top_users")
+    format_top_users = lazy("presentation", "format_top_users")
+
+    analyses = {
+        "1": ("Top Users by Likes", lambda: format_top_users(top_users(df(), "likes"))),
+        "2": ("Top Users by Retweets", lambda: format_top_users(top_users(df(), "reposts"))),
+        "3": ("Top Users by Replies", lambda: format_top_users(top_users(df(), "replies"))),
+        "4": ("PageRank Influencers",
+              lambda: lazy("presentation", "format_pagerank")(lazy("metrics", "compute_pagerank")(df()))),
+    }
+    plots = {
+        "6": ("User-Hashtag Graph", lambda: lazy("plotter", "prepare_user_hashtag_graph")(df()),
+              show_figure(lazy("plotter", "draw_user_hashtag_graph"), "No users found with relevant hashtag connections.")),
+        "7": ("Hashtag Co-occurrence", lambda: lazy("plotter", "prepare_hashtag_cooccurrence")(df()),
+              show_figure(lazy("plotter", "draw_hashtag_cooccurrence"), "No hashtags to form connections.")),
+        "9": ("Hashtag Word Cloud", lambda: _as_args(lazy("plotter", "prepare_hashtag_wordcloud")(df())),
+              show_figure(lazy("plotter", "draw_hashtag_wordcloud"), "No hashtags available for word cloud.")),
+    }
+
+    if choice in analyses:
+        title, compute = analyses[choice]
+        runner.submit(choice, title, compute, show_text(title))
+    elif choice in plots:
+        runner.submit(choice, *plots[choice])
     elif choice == "5":
         messagebox.showinfo("Notice", "This option has been removed.")
-    elif choice == "6":
-        plot_user_hashtag_graph(df)
-    elif choice == "7":
-        plot_hashtag_cooccurrence(df)
     elif choice == "8":
         limit_str = simpledialog.askstring("Input", "Enter limit (e.g., 1000):")
         if limit_str is None:
             return  # User cancelled the input
         try:
             limit = int(limit_str)
-            plot_engagement_distribution(df, limit)
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid number.")
-    elif choice == "9":
-        generate_hashtag_wordcloud(df)
+            return
+        runner.submit(choice, "Engagement Distribution",
+                      lambda: (lazy("plotter", "prepare_engagement_distribution")(df(), limit),),
+                      show_figure(lazy("plotter", "draw_engagement_distribution"), "No engagement data available."))
+    elif choice == "P":
+        show_performance_breakdown()
     elif choice == "0":
+        runner.shutdown()
         root.destroy()
     else:
         messagebox.showwarning("Warning", "Invalid choice. Please try again.")
 
 
+def show_performance_breakdown() -> None:
+    """Show the timing breakdown of the recent menu actions, most recent first, and write them to TRACE_PATH."""
+    if not instrumentation.is_enabled():
+        messagebox.showinfo("Notice", "Performance recording is off. Start the program with --instrument "
+                                      "(or --profile / --trace-memory) to record it.")
+        return
+    traces = instrumentation.recent_traces()
+    if not traces:
+        messagebox.showinfo("Notice", "No actions have been recorded yet.")
+        return
+    instrumentation.write_chrome_trace(TRACE_PATH, traces)
+    breakdowns = "\n\n".join(instrumentation.format_breakdown(trace) for trace in traces)
+    show_output_window("Performance Breakdown", f"Trace written to {TRACE_PATH}.\n\n{breakdowns}", width=120)
+
+
+def _as_args(prepared: Any) -> Optional[tuple]:
+    """Wrap a single prepared value as an argument tuple, keeping None as None."""
+    return None if prepared is None else (prepared,)
+
+
+def report_startup() -> None:
+    """Print the time from the start of main.py until the menu was drawn, then close the program with
+    exit status 1 if STARTUP_BUDGET_SECONDS was exceeded and 0 otherwise.
+    """
+    elapsed = time.perf_counter() - PROCESS_START
+    within_budget = elapsed <= STARTUP_BUDGET_SECONDS
+    verdict = "within" if within_budget else "OVER"
+    print(f"Menu shown after {elapsed:.3f} s ({verdict} the {STARTUP_BUDGET_SECONDS:.2f} s startup budget).")
+    runner.shutdown()
+    root.destroy()
+    sys.exit(0 if within_budget else 1)
+
+
 if __name__ == "__main__":
+    if "--lint" in sys.argv:
+        import python_ta
+
+        python_ta.check_all(config={
+            'extra-imports': ['tkinter', 'sys', 'time', 'importlib', 'concurrent.futures', 'typing', 'instrumentation'],
+            'allowed-io': ['report_startup'],
+            # the names (strs) of functions that call print/open/input
+            'max-line-length': 150,
+            'max-branches': 13
+        })
+        sys.exit(0)
+
     # GUI root initialization
     root = tk.Tk()
     root.title("Twitter Data Analysis")
-    root.geometry("400x500")
+    root.geometry("400x600")
+    runner = AnalysisRunner(root)
+    if any(flag in sys.argv for flag in ("--instrument", "--profile", "--trace-memory")):
+        instrumentation.enable(profile="--profile" in sys.argv, memory="--trace-memory" in sys.argv)
 
-    # Load dataset
-    dataframe = load_dataset("twitter-posts.csv")
+    # Load dataset in the background (pass --refresh-cache to rebuild the binary cache from the CSV)
+    dataframe = runner.submit("load", "Loading dataset", lambda: load_analysis_dataset("--refresh-cache" in sys.argv),
+                              lambda df: runner.status.set(f"Dataset ready ({len(df):,} posts)"))
 
     # Button configuration
     options = [
@@ -113,6 +335,7 @@ if __name__ == "__main__":
         ("7", "Visualize hashtag co-occurrence"),
         ("8", "Show engagement distribution"),
         ("9", "Generate hashtag word cloud"),
+        ("P", "Show performance breakdown"),
         ("0", "Exit")
     ]
 
@@ -122,12 +345,7 @@ if __name__ == "__main__":
     for val, label in options:
         tk.Button(root, text=label, width=40, command=lambda v=val: run_analysis(v, dataframe)).pack(pady=5)
 
-    python_ta.check_all(config={
-        'extra-imports': ['tkinter', 'data_loader', 'metrics', 'pandas', 'plotter', 'io', 'sys'],  # the names (strs) of imported modules
-        'allowed-io': ['compute_pagerank', 'show_top_users'],
-        # the names (strs) of functions that call print/open/input
-        'max-line-length': 150,
-        'max-branches': 13
-    })
-
+    root.update_idletasks()
+    if "--startup-check" in sys.argv:
+        root.after_idle(report_startup)
     root.mainloop()
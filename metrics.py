@@ -8,6 +8,9 @@ specifically identifying influential users based on PageRank and engagement metr
 These functions are designed to be used in conjunction with a cleaned Twitter dataset and
 a graph-building helper function.
 
+PageRank is computed by power iteration on a SciPy CSR adjacency matrix over integer-coded users, which scales
+to graphs far larger than networkx's dict-based implementation can handle while giving the same scores.
+
 Copyright and Usage Information
 ===============================
 
@@ -19,70 +22,348 @@ without the explicit written permission of the project group.
 
 This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
 """
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Optional
 import networkx as nx
+import numpy as np
 import pandas as pd
-import python_ta
-from graph_builder import build_interaction_graph
+from scipy import sparse
+from aggregates import ENGAGEMENT_COLUMNS, top_users_by
+from compact_graph import CompactGraph
+from graph_snapshots import load_graph
+from instrumentation import count, traced
+from preprocess import get_tag_index
+from time_index import window_frame, window_top_users
+
+USER_COL = "user_posted"
 
 
-def compute_pagerank(df: pd.DataFrame, top_n: int = 10) -> None:
-    """Compute PageRank scores for users and print the top N most influential users.
+@traced
+def compute_pagerank(df: pd.DataFrame, top_n: Optional[int] = 10, damping: float = 0.85, tol: float = 1.0e-6,
+                     max_iter: int = 100, start: Any = None, end: Any = None) -> pd.Series:
+    """Compute PageRank scores for users and return the top N most influential users.
 
     This function builds a cleaned interaction graph from tagged mentions
-    and computes PageRank centrality to determine influence.
+    and computes PageRank centrality to determine influence. The result is a Series of
+    scores named 'pagerank', indexed by user and ranked from most to least influential.
+    If `top_n` is None, every user in the graph is returned.
+
+    Mentions are directed from whichever user of the pair appears first in the dataset, which
+    is how the undirected interaction graph was previously copied into a directed one. The graph is
+    loaded from its snapshot when the dataset has not changed (see graph_snapshots).
+    If `start` or `end` is given, only the posts of the time window [start, end) are used.
 
     Preconditions:
     - `df` must contain a 'user_posted' column with non-null user identifiers.
-    - `build_interaction_graph(df)` must return a graph with string-type nodes.
-    - `top_n` must be a positive integer.
+    - `top_n` is None or a positive integer.
+    - 0 < damping < 1 and tol > 0 and max_iter > 0
+    """
+    windowed = start is not None or end is not None
+    graph = load_graph(window_frame(df, start, end), "mentions", mention_graph, persist=not windowed)
+    scores = sparse_pagerank(graph.to_csr(), damping, tol, max_iter)[0]
+    return _ranked_scores(scores, graph.names, top_n)
+
+
+@traced
+def mention_graph(df: pd.DataFrame) -> CompactGraph:
+    """Return the directed mention graph that PageRank runs on (see interaction_adjacency) as a CompactGraph."""
+    adjacency, users = interaction_adjacency(df)
+    count("edges", adjacency.nnz)
+    return CompactGraph(adjacency.indptr.astype(np.int64), adjacency.indices.astype(np.int32), users, directed=True)
+
+
+def _ranked_scores(scores: np.ndarray, users: np.ndarray, top_n: Optional[int]) -> pd.Series:
+    """Return the top_n highest PageRank scores (all if top_n is None) as a Series indexed by user,
+    keeping the order of users on ties.
+    """
+    ranking = np.argsort(-scores, kind="stable")[:top_n]
+    return pd.Series(scores[ranking], index=pd.Index(users[ranking], name="user"), name="pagerank")
+
+
+def interaction_adjacency(df: pd.DataFrame) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """Return the directed mention adjacency matrix of df and the user name of every matrix index.
+
+    Posting users are stripped, and users that are missing or look like dictionary strings (bad data)
+    are left out, as are mentioned names containing '{'. Users are numbered in order of first
+    appearance, and each distinct mention pair becomes a single edge from the lower to the higher number.
+    """
+    node_codes, names = pd.factorize(_interaction_pairs(df))
+    names = np.asarray(names, dtype=object)
+    source, target = _directed_edges(node_codes, _bad_names(names))
+    return _adjacency_from_edges(source, target, names)
+
+
+def _interaction_pairs(df: pd.DataFrame) -> np.ndarray:
+    """Return the cleaned (posting user, mentioned user) pairs of df interleaved into one flat array."""
+    # Clean each distinct posting user once instead of every row
+    user_codes, distinct_users = pd.factorize(df[USER_COL])
+    distinct_users = pd.Series(distinct_users, dtype=object).astype(str).str.strip()
+    valid_users = ~distinct_users.str.contains(r"\{|\}", na=False).to_numpy()
+
+    mentions = get_tag_index(df).mentions
+    mention_users = user_codes[mentions.rows]
+    keep = mention_users >= 0
+    keep[keep] = valid_users[mention_users[keep]]
+
+    pairs = np.empty(2 * int(keep.sum()), dtype=object)
+    pairs[0::2] = distinct_users.to_numpy()[mention_users[keep]]
+    pairs[1::2] = mentions.values[keep]
+    return pairs
+
+
+def _directed_edges(pair_codes: np.ndarray, bad_name: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Direct each interleaved pair of node codes from the lower code to the higher one, dropping pairs
+    that touch a node marked in bad_name. Return the (source, target) code arrays.
     """
+    first, second = pair_codes[0::2], pair_codes[1::2]
+    source, target = np.minimum(first, second), np.maximum(first, second)
+    clean = ~(bad_name[source] | bad_name[target])
+    return source[clean], target[clean]
 
-    df_clean = df[df["user_posted"].notna()].copy()
-    df_clean["user_posted"] = df_clean["user_posted"].astype(str).str.strip()
 
-    # Filter out users that look like dictionary strings (bad data)
-    df_clean = df_clean[~df_clean["user_posted"].str.contains(r"\{|\}", na=False)]
+def _bad_names(names: Any) -> np.ndarray:
+    """Return a mask of the names that contain '{' (bad data left out of the mention graph)."""
+    return pd.Series(names, dtype=object).str.contains("{", regex=False, na=False).to_numpy(dtype=bool)
 
-    graph = build_interaction_graph(df_clean)
 
-    # Remove weird tagged users from nodes too
-    cleaned_graph = nx.DiGraph()
-    for u, v in graph.edges():
-        if isinstance(u, str) and isinstance(v, str) and "{" not in u and "{" not in v:
-            cleaned_graph.add_edge(u, v)
+def _adjacency_from_edges(source: np.ndarray, target: np.ndarray,
+                          names: np.ndarray) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """Return the 0/1 CSR adjacency matrix of the distinct (source, target) edges and the names of its nodes,
+    keeping only nodes that have at least one edge, in their original order.
+    """
+    used = np.zeros(len(names), dtype=bool)
+    used[source] = True
+    used[target] = True
+    new_codes = np.cumsum(used) - 1
+    n_nodes = int(used.sum())
 
-    pagerank_scores = nx.pagerank(cleaned_graph)
-    top_users = sorted(pagerank_scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    adjacency = sparse.csr_matrix((np.ones(len(source), dtype=np.float64), (new_codes[source], new_codes[target])),
+                                  shape=(n_nodes, n_nodes))
+    adjacency.sum_duplicates()
+    adjacency.data[:] = 1.0
+    return adjacency, names[used]
+
+
+@traced
+def sparse_pagerank(adjacency: sparse.csr_matrix, damping: float = 0.85, tol: float = 1.0e-6, max_iter: int = 100,
+                    start: Optional[np.ndarray] = None) -> tuple[np.ndarray, int, float]:
+    """Run PageRank power iteration on a square adjacency matrix with uniform teleportation.
+
+    Rank held by nodes without outgoing edges is spread uniformly over all nodes. Iteration stops
+    once the L1 change between iterations is below n_nodes * tol, matching networkx.pagerank.
+    Return the score vector, the number of iterations run and the final L1 residual.
+    If `start` is given it is used (after normalization) as the initial vector.
+
+    Preconditions:
+    - adjacency.shape[0] == adjacency.shape[1]
+    - 0 < damping < 1 and tol > 0 and max_iter > 0
+    - start is None or len(start) == adjacency.shape[0]
+    """
+    n_nodes = adjacency.shape[0]
+    count("nodes", n_nodes)
+    count("edges", adjacency.nnz)
+    if n_nodes == 0:
+        return np.zeros(0), 0, 0.0
 
-    print("\nTop Influential Users by PageRank:")
-    for user, score in top_users:
-        print(f"{user}: {score:.4f}")
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inverse_degree = np.divide(1.0, out_degree, out=np.zeros(n_nodes), where=~dangling)
+    transition = (sparse.diags(inverse_degree) @ adjacency).T.tocsr()
 
+    if start is None:
+        scores = np.full(n_nodes, 1.0 / n_nodes)
+    else:
+        scores = np.asarray(start, dtype=np.float64) / np.sum(start)
 
-def show_top_users(df: pd.DataFrame, metric: str, top_n: int = 10) -> None:
-    """Print the top top_n number of users by a specified engagement metric.
+    residual = float("inf")
+    for iteration in range(1, max_iter + 1):
+        previous = scores
+        scores = damping * (transition @ previous + previous[dangling].sum() / n_nodes) + (1.0 - damping) / n_nodes
+        residual = float(np.abs(scores - previous).sum())
+        if residual < n_nodes * tol:
+            count("iterations", iteration)
+            return scores, iteration, residual
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+@dataclass
+class PageRankStats:
+    """Convergence statistics of one PageRank run.
+
+    Instance Attributes:
+    - iterations: the number of power iterations run.
+    - residual: the L1 change of the scores in the last iteration.
+    - n_nodes: the number of users in the graph.
+    - n_edges: the number of distinct mention edges in the graph.
+    - new_edges: the number of edges added by the batch that triggered the run.
+    """
+    iterations: int
+    residual: float
+    n_nodes: int
+    n_edges: int
+    new_edges: int
+
+
+class IncrementalPageRank:
+    """PageRank over the mention graph of a growing dataset.
+
+    Each call to update adds a batch of new rows to the stored graph and re-runs power iteration
+    starting from the previous scores, so a small batch converges in a few iterations instead of a
+    full run from the uniform vector. Only the new users of a batch are checked for bad names, and its
+    new edges are merged into the sorted edges by binary search. Users are numbered in order of first
+    appearance across all batches, so the scores agree with compute_pagerank on all rows seen so far.
+
+    Instance Attributes:
+    - damping: the PageRank damping factor.
+    - tol: the per-node convergence tolerance.
+    - max_iter: the maximum number of power iterations per update.
+    - names: the name of every user seen so far, indexed by user number.
+    - stats: the convergence statistics of the most recent update, or None before the first one.
+
+    Representation Invariants:
+    - 0 < self.damping < 1 and self.tol > 0 and self.max_iter > 0
+    - len(self._scores) == len(self.names)
+    """
+    damping: float
+    tol: float
+    max_iter: int
+    names: list[str]
+    stats: Optional[PageRankStats]
+    _codes: dict[str, int]
+    _bad: np.ndarray
+    _edge_keys: np.ndarray
+    _scores: np.ndarray
+
+    def __init__(self, damping: float = 0.85, tol: float = 1.0e-6, max_iter: int = 100) -> None:
+        """Initialize an empty incremental PageRank with the given parameters.
+
+        Preconditions:
+        - 0 < damping < 1 and tol > 0 and max_iter > 0
+        """
+        self.damping = damping
+        self.tol = tol
+        self.max_iter = max_iter
+        self.names = []
+        self.stats = None
+        self._codes = {}
+        self._bad = np.zeros(0, dtype=bool)
+        self._edge_keys = np.zeros(0, dtype=np.int64)
+        self._scores = np.zeros(0)
+
+    def update(self, delta: pd.DataFrame) -> PageRankStats:
+        """Add the mentions in the new rows of delta to the graph and recompute the scores,
+        warm-starting from the previous ones. Return the convergence statistics of the run.
+
+        Preconditions:
+        - `delta` has the columns of the Twitter dataset, including 'user_posted' and 'tagged_users'
+        """
+        pairs = _interaction_pairs(delta)
+        batch_codes, batch_names = pd.factorize(pairs)
+        new_names = [name for name in batch_names if name not in self._codes]
+        self._codes.update(zip(new_names, range(len(self.names), len(self.names) + len(new_names))))
+        self.names.extend(new_names)
+        self._bad = np.concatenate((self._bad, _bad_names(new_names)))
+        global_codes = np.fromiter((self._codes[name] for name in batch_names), dtype=np.int64,
+                                   count=len(batch_names))
+
+        source, target = _directed_edges(global_codes[batch_codes], self._bad)
+        keys = np.unique((source << 32) | target)
+        positions = np.searchsorted(self._edge_keys, keys)
+        inside = positions < len(self._edge_keys)
+        known = np.zeros(len(keys), dtype=bool)
+        known[inside] = self._edge_keys[positions[inside]] == keys[inside]
+        self._edge_keys = np.insert(self._edge_keys, positions[~known], keys[~known])
+        self._scores = np.concatenate((self._scores, np.zeros(len(self.names) - len(self._scores))))
+        return self._solve(int((~known).sum()))
+
+    def _solve(self, new_edges: int) -> PageRankStats:
+        """Recompute the scores of the stored graph from the previous ones and record the statistics."""
+        source, target = self._edge_keys >> 32, self._edge_keys & 0xFFFFFFFF
+        adjacency = _adjacency_from_edges(source, target, np.arange(len(self.names)))[0]
+        used = np.zeros(len(self.names), dtype=bool)
+        used[source] = True
+        used[target] = True
+
+        start = self._scores[used]
+        if start.sum() > 0:
+            # Users new to the graph start at the uniform score
+            start = np.where(start > 0, start, 1.0 / max(len(start), 1))
+        else:
+            start = None
+        scores, iterations, residual = sparse_pagerank(adjacency, self.damping, self.tol, self.max_iter, start)
+
+        self._scores = np.zeros(len(self.names))
+        self._scores[used] = scores
+        self.stats = PageRankStats(iterations, residual, int(used.sum()), len(self._edge_keys), new_edges)
+        return self.stats
+
+    def ranking(self, top_n: Optional[int] = None) -> pd.Series:
+        """Return the current scores of the top_n users in the graph (all if top_n is None),
+        in the same format as compute_pagerank.
+        """
+        in_graph = np.flatnonzero(self._scores > 0)
+        return _ranked_scores(self._scores[in_graph], np.asarray(self.names, dtype=object)[in_graph], top_n)
+
+    def save(self, file_path: str) -> None:
+        """Persist the graph, the scores and the parameters to file_path, in the .npz format. file_path is
+        used as given (np.savez would otherwise append '.npz' to it).
+        """
+        with open(file_path, "wb") as file:
+            np.savez(file, names=np.array(self.names, dtype=str), edge_keys=self._edge_keys, scores=self._scores,
+                     params=np.array([self.damping, self.tol, self.max_iter]))
+
+    @classmethod
+    def load(cls, file_path: str) -> IncrementalPageRank:
+        """Return the incremental PageRank persisted at file_path by save.
+
+        Preconditions:
+        - file_path was written by IncrementalPageRank.save
+        """
+        with np.load(file_path, allow_pickle=False) as data:
+            damping, tol, max_iter = data["params"]
+            pagerank = cls(float(damping), float(tol), int(max_iter))
+            pagerank.names = data["names"].tolist()
+            pagerank._codes = {name: code for code, name in enumerate(pagerank.names)}
+            pagerank._bad = _bad_names(pagerank.names)
+            pagerank._edge_keys = data["edge_keys"]
+            pagerank._scores = data["scores"]
+        return pagerank
+
+
+@traced
+def top_users(df: pd.DataFrame, metric: str, top_n: int = 10, start: Any = None, end: Any = None) -> pd.Series:
+    """Return the top top_n number of users by a specified engagement metric.
 
     This function groups tweets by user and calculates the sum of the given metric
-    (e.g., likes, reposts, replies) to identify the most engaged-with users.
+    (e.g., likes, reposts, replies) to identify the most engaged-with users. The result
+    is a Series named after the metric, indexed by user and sorted in descending order.
+    Likes, reposts and replies are served from the shared per-user aggregate table.
+    If `start` or `end` is given, only the posts of the time window [start, end) are counted.
+
+    Raise a ValueError if `metric` is not a column of `df`.
 
     Preconditions:
-    - `metric` must be one of the numeric columns in `df`, such as 'likes', 'reposts', or 'replies'.
     - `df` must contain a 'user_posted' column
     - `top_n` >= 0
     """
 
     if metric not in df.columns:
-        print(f"Column '{metric}' not found in dataset.")
-        return
-    top_users = df.groupby("user_posted")[metric].sum().sort_values(ascending=False).head(top_n)
-    print(f"\nTop Users by {metric.capitalize()}:")
-    print(top_users)
+        raise ValueError(f"Column '{metric}' not found in dataset.")
+    if metric in ENGAGEMENT_COLUMNS:
+        if start is None and end is None:
+            return top_users_by(df, metric, top_n)
+        return window_top_users(df, metric, top_n, start, end)
+    df = window_frame(df, start, end)
+    return df.groupby(USER_COL, observed=True)[metric].sum().sort_values(ascending=False).head(top_n)
 
 
 if __name__ == "__main__":
+    import python_ta
 
     python_ta.check_all(config={
-        'extra-imports': ['networkx', 'pandas', 'graph_builder'],  # the names (strs) of imported modules
-        'allowed-io': ['compute_pagerank', 'show_top_users'],     # the names (strs) of functions that call print/open/input
+        'extra-imports': ['networkx', 'numpy', 'pandas', 'scipy', 'aggregates', 'compact_graph', 'graph_snapshots',
+                          'instrumentation', 'preprocess', 'time_index', 'typing', 'dataclasses'],
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
         'max-line-length': 130
     })
@@ -5,7 +5,15 @@ Module Description
 This module provides a suite of data visualization functions for analyzing a Twitter dataset.
 
 These visualizations help uncover user behavior patterns, hashtag trends, and influential participants
-in the dataset using graph theory and data aggregation techniques.
+in the dataset using graph theory and data aggregation techniques. Hashtags and mentions are read from the
+shared TagIndex of the DataFrame instead of being re-split for every plot.
+
+Each view is split into a prepare_* function that does the data work (and may run on any thread) and a
+draw_* function that draws the prepared data on a new figure and returns it. The plot_* functions combine
+the two and show the figure. Every prepare_* and plot_* function that takes a DataFrame also takes optional
+start and end timestamps, which restrict it to the posts of the time window [start, end) (see time_index).
+Every prepare_* and draw_* function is traced, so its time shows up in the per-action breakdown of
+instrumentation.
 
 Copyright and Usage Information
 ===============================
@@ -17,65 +25,91 @@ without the explicit written permission of the project group.
 
 This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
 """
-from collections import Counter, defaultdict
+from __future__ import annotations
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Optional, Union
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import python_ta
 import networkx as nx
-from wordcloud import WordCloud
 from matplotlib import widgets
+from matplotlib.figure import Figure
+from aggregates import top_users_by
+from communities import Communities, get_communities
+from cooccurrence import focus_edges
+from instrumentation import count, traced
+from layouts import compute_layout
+from preprocess import ExplodedColumn, get_tag_index
+from sketches import STREAM_CHUNKSIZE, SpaceSaving, stream_token_counts
+from time_index import window_frame, window_hashtag_counts, window_top_users
+
+if TYPE_CHECKING:
+    from wordcloud import WordCloud
 
 HASHTAG_COL = 'hashtags'
 TAGGED_USERS_COL = 'tagged_users'
 USER_COL = 'user_posted'
 REPLY_COL = 'replies'
+ENGAGEMENT_METRICS = ['likes', 'reposts', 'replies']
+# The number of largest communities that get a color of their own when nodes are colored by community
+COMMUNITY_COLORS = 10
 
 
-def plot_user_hashtag_graph(df: pd.DataFrame, hashtag_limit: int = 20) -> None:
-    """Visualize a bipartite graph of users and the top hashtags they use.
+@traced
+def prepare_user_hashtag_graph(df: pd.DataFrame, hashtag_limit: int = 20, start: Any = None, end: Any = None,
+                               color_by_community: bool = False) -> Optional[tuple[nx.Graph, dict]]:
+    """Return the user-hashtag bipartite graph of df and its layout, or None if no user uses a top hashtag.
 
-    The graph displays relationships between users and their associated hashtags,
-    limited to the most frequently used hashtags.
+    Users are attached to the hashtags among the hashtag_limit most frequent ones that they used. The
+    top hashtags are found from the hashtag counts first, so only their user-hashtag pairs become a graph.
+    If color_by_community is True, every user node gets a 'community' attribute with its community in the
+    mention graph (see communities.get_communities), which draw_user_hashtag_graph colors it by.
 
     Preconditions:
     - `df` must contain columns: 'user_posted' and 'hashtags'.
     - `hashtag_limit` > 0
     """
-    df_cleaned = df.dropna(subset=[USER_COL, HASHTAG_COL]).copy()
-    df_cleaned[HASHTAG_COL] = df_cleaned[HASHTAG_COL].str.lower().str.replace(r'[^a-z0-9_#]', '', regex=True)
+    df = window_frame(df, start, end)
+    users = df[USER_COL].to_numpy()
+    hashtags = get_tag_index(df).hashtags.remap(_clean_hashtag).select_rows(df[USER_COL].notna().to_numpy())
 
-    hashtag_counts = df_cleaned[HASHTAG_COL].str.split(',').explode().str.strip().value_counts().head(hashtag_limit)
-    top_hashtags = set(hashtag_counts.index)
+    counts = hashtags.counts()
+    order = np.argsort(-counts, kind='stable')[:hashtag_limit]
+    is_top = np.zeros(len(hashtags.vocab), dtype=bool)
+    is_top[order[counts[order] > 0]] = True
 
-    bi_graph = nx.Graph()
-    user_connections = defaultdict(set)
+    top_entries = is_top[hashtags.codes]
+    pairs = pd.DataFrame({"user": users[hashtags.rows[top_entries]],
+                          "tag": hashtags.codes[top_entries]}).drop_duplicates()
+    # Group each user's hashtags together, users in order of first appearance
+    pairs = pairs.iloc[np.argsort(pd.factorize(pairs["user"])[0], kind='stable')]
 
-    for _, row in df_cleaned.iterrows():
-        user = row[USER_COL]
-        for tag in str(row[HASHTAG_COL]).lower().split(','):
-            tag = tag.strip().replace('"', '').replace("'", '')
-            tag = ''.join(c for c in tag if c.isalnum() or c in {'#', '_'})
-            if tag and tag in top_hashtags:
-                user_connections[user].add(tag)
+    if pairs.empty:
+        return None
 
-    selected_users = [username for username, tags in user_connections.items() if len(tags) > 0]
+    bi_graph = nx.Graph()
+    for user, tag in zip(pairs["user"], hashtags.vocab[pairs["tag"].to_numpy()]):
+        bi_graph.add_node(user, bipartite=0)
+        bi_graph.add_node(tag, bipartite=1)
+        bi_graph.add_edge(user, tag)
+    if color_by_community:
+        windowed = start is not None or end is not None
+        _set_communities(bi_graph, get_communities(df, "mentions", persist=not windowed), pairs["user"].unique())
+    count("edges", bi_graph.number_of_edges())
 
-    if not selected_users:
-        print("No users found with relevant hashtag connections.")
-        return
+    return bi_graph, compute_layout(bi_graph, view='user_hashtag_graph')
 
-    for user in selected_users:
-        for tag in user_connections[user]:
-            bi_graph.add_node(user, bipartite=0)
-            bi_graph.add_node(tag, bipartite=1)
-            bi_graph.add_edge(user, tag)
 
-    pos = nx.spring_layout(bi_graph, seed=42)
+@traced
+def draw_user_hashtag_graph(bi_graph: nx.Graph, pos: dict) -> Figure:
+    """Draw the bipartite graph returned by prepare_user_hashtag_graph on a new figure and return it."""
     user_nodes = {n for n, d in bi_graph.nodes(data=True) if d.get('bipartite') == 0}
     hashtag_nodes = set(bi_graph) - user_nodes
 
-    plt.figure(figsize=(14, 12))
-    nx.draw_networkx_nodes(bi_graph, pos, nodelist=user_nodes, node_color='lightblue', node_size=600, label='Users')
+    fig = plt.figure(figsize=(14, 12))
+    user_nodes = list(user_nodes)
+    nx.draw_networkx_nodes(bi_graph, pos, nodelist=user_nodes, node_color=_node_colors(bi_graph, user_nodes, 'lightblue'),
+                           node_size=600, label='Users')
     nx.draw_networkx_nodes(bi_graph, pos, nodelist=hashtag_nodes, node_color='lightcoral', node_size=600, label='Hashtags')
     nx.draw_networkx_edges(bi_graph, pos, alpha=0.5)
     nx.draw_networkx_labels(bi_graph, pos, font_size=9)
@@ -83,67 +117,116 @@ def plot_user_hashtag_graph(df: pd.DataFrame, hashtag_limit: int = 20) -> None:
     plt.legend()
     plt.axis("off")
     plt.tight_layout()
+    return fig
+
+
+def plot_user_hashtag_graph(df: pd.DataFrame, hashtag_limit: int = 20, start: Any = None, end: Any = None,
+                            color_by_community: bool = False) -> None:
+    """Visualize a bipartite graph of users and the top hashtags they use.
+
+    The graph displays relationships between users and their associated hashtags,
+    limited to the most frequently used hashtags. With color_by_community, users are colored by their
+    community in the mention graph.
+
+    Preconditions:
+    - `df` must contain columns: 'user_posted' and 'hashtags'.
+    - `hashtag_limit` > 0
+    """
+    prepared = prepare_user_hashtag_graph(df, hashtag_limit, start, end, color_by_community)
+    if prepared is None:
+        print("No users found with relevant hashtag connections.")
+        return
+    draw_user_hashtag_graph(*prepared)
     plt.show()
 
 
-def plot_hashtag_cooccurrence(df: pd.DataFrame, max_nodes: int = 25) -> None:
-    """Visualize a graph of hashtag co-occurrence based on tweets.
+@traced
+def prepare_hashtag_cooccurrence(df: pd.DataFrame, max_nodes: int = 25, start: Any = None, end: Any = None,
+                                 color_by_community: bool = False) -> Optional[tuple[nx.Graph, dict]]:
+    """Return the weighted hashtag co-occurrence graph to display and its layout, or None if no two
+    hashtags are used together.
 
-    Edges represent hashtags used together in the same tweet, with edge width
-    representing frequency. Only the most connected component is shown.
+    The graph is restricted to the max_nodes highest-degree hashtags of the largest connected component,
+    which are selected before any graph is built. If color_by_community is True, every node gets a
+    'community' attribute with its hashtag cluster in the full co-occurrence graph (see
+    communities.get_communities), which draw_hashtag_cooccurrence colors it by.
 
     Preconditions:
     - `df` must contain a 'hashtags' column with comma-separated hashtags.
     - `max_nodes` > 0
     """
-    hashtag_graph = nx.Graph()
-    edge_weights = defaultdict(int)
+    df = window_frame(df, start, end)
+    focus_nodes, edges = focus_edges(_without_nan_tokens(get_tag_index(df).hashtags), max_nodes)
+    if len(focus_nodes) == 0:
+        return None
 
-    for hashtags in df[HASHTAG_COL].dropna():
-        tags = [tag.strip() for tag in hashtags.split(',') if tag and tag.lower() != 'nan']
-        for i in range(len(tags)):
-            for j in range(i + 1, len(tags)):
-                edge = tuple(sorted([tags[i], tags[j]]))
-                edge_weights[edge] += 1
+    focus_sub_graph = nx.Graph()
+    focus_sub_graph.add_nodes_from(focus_nodes)
+    focus_sub_graph.add_weighted_edges_from(edges.itertuples(index=False, name=None))
+    if color_by_community:
+        _set_communities(focus_sub_graph, get_communities(df, "hashtags"), focus_nodes)
+    count("edges", focus_sub_graph.number_of_edges())
 
-    for (tag1, tag2), weight in edge_weights.items():
-        hashtag_graph.add_edge(tag1, tag2, weight=weight)
+    return focus_sub_graph, compute_layout(focus_sub_graph, view='hashtag_cooccurrence')
 
-    if hashtag_graph.number_of_edges() == 0:
-        print("No hashtags to form connections.")
-        return
-
-    largest_cc = max(nx.connected_components(hashtag_graph), key=len)
-    sub_hash_graph = hashtag_graph.subgraph(list(largest_cc)).copy()
-
-    top_nodes = sorted(sub_hash_graph.degree, key=lambda x: x[1], reverse=True)[:max_nodes]
-    focus_nodes = [n for n, _ in top_nodes]
-    focus_sub_graph = sub_hash_graph.subgraph(focus_nodes)
 
+@traced
+def draw_hashtag_cooccurrence(focus_sub_graph: nx.Graph, pos: dict) -> Figure:
+    """Draw the graph returned by prepare_hashtag_cooccurrence on a new figure and return it."""
     edge_widths = [focus_sub_graph[u][v]['weight'] for u, v in focus_sub_graph.edges()]
 
-    plt.figure(figsize=(12, 10))
-    pos = nx.spring_layout(focus_sub_graph, seed=42)
-    nx.draw_networkx_nodes(focus_sub_graph, pos, node_size=700, node_color='lightgreen')
+    fig = plt.figure(figsize=(12, 10))
+    nx.draw_networkx_nodes(focus_sub_graph, pos, node_size=700,
+                           node_color=_node_colors(focus_sub_graph, list(focus_sub_graph), 'lightgreen'))
     nx.draw_networkx_labels(focus_sub_graph, pos, font_size=10)
     nx.draw_networkx_edges(focus_sub_graph, pos, width=edge_widths, edge_color='gray')
     plt.title("Interactive Hashtag Co-occurrence Network (Weighted)")
     plt.axis('off')
     plt.tight_layout()
-    plt.show()
+    return fig
 
 
-def plot_engagement_distribution(df: pd.DataFrame, limit: int) -> None:
-    """Show a histogram for tweet engagement (likes, reposts, replies) with clipping.
+def plot_hashtag_cooccurrence(df: pd.DataFrame, max_nodes: int = 25, start: Any = None, end: Any = None,
+                              color_by_community: bool = False) -> None:
+    """Visualize a graph of hashtag co-occurrence based on tweets.
+
+    Edges represent hashtags used together in the same tweet, with edge width
+    representing frequency. Only the most connected component is shown. With color_by_community, hashtags
+    are colored by their cluster in the co-occurrence graph.
+
+    Preconditions:
+    - `df` must contain a 'hashtags' column with comma-separated hashtags.
+    - `max_nodes` > 0
+    """
+    prepared = prepare_hashtag_cooccurrence(df, max_nodes, start, end, color_by_community)
+    if prepared is None:
+        print("No hashtags to form connections.")
+        return
+    draw_hashtag_cooccurrence(*prepared)
+    plt.show()
 
-    Allows switching between metrics using an interactive radio button UI.
+
+@traced
+def prepare_engagement_distribution(df: pd.DataFrame, limit: int, start: Any = None, end: Any = None) -> pd.DataFrame:
+    """Return the likes, reposts and replies columns of df clipped at limit.
 
     Preconditions:
     - `df` must contain numeric columns: 'likes', 'reposts', and 'replies'.
     - `limit` > 0
     """
-    filtered_df = df.copy()
-    filtered_df[['likes', 'reposts', 'replies']] = filtered_df[['likes', 'reposts', 'replies']].clip(upper=limit)
+    return window_frame(df, start, end)[ENGAGEMENT_METRICS].clip(upper=limit)
+
+
+@traced
+def draw_engagement_distribution(filtered_df: pd.DataFrame, metric: str = 'likes', interactive: bool = True) -> Figure:
+    """Draw a histogram of one column of the frame returned by prepare_engagement_distribution
+    on a new figure and return it.
+
+    If interactive is True, radio buttons for switching between the metrics are added to the figure.
+
+    Preconditions:
+    - metric in ENGAGEMENT_METRICS
+    """
 
     def update(label) -> None:
         """
@@ -160,20 +243,59 @@ def plot_engagement_distribution(df: pd.DataFrame, limit: int) -> None:
         ax.set_title(f"Engagement Distribution: {label.capitalize()})")
         ax.set_xlabel(f"The number of {label}")
         ax.set_ylabel("The amount of tweets")
-        plt.draw()
+        fig.canvas.draw_idle()
+
+    fig, ax = plt.subplots(figsize=(10, 6))
 
-    ax = plt.subplots(figsize=(10, 6))[1]
-    plt.subplots_adjust(left=0.3)
+    if interactive:
+        plt.subplots_adjust(left=0.3)
+        dropdown_ax = plt.axes((0.05, 0.4, 0.15, 0.15))
+        dropdown = widgets.RadioButtons(dropdown_ax, tuple(ENGAGEMENT_METRICS), active=ENGAGEMENT_METRICS.index(metric))
+        dropdown.on_clicked(update)
+        fig.engagement_selector = dropdown  # widgets stop responding once garbage collected
 
-    dropdown_ax = plt.axes((0.05, 0.4, 0.15, 0.15))
-    dropdown = widgets.RadioButtons(dropdown_ax, ('likes', 'reposts', 'replies'))
-    dropdown.on_clicked(update)
+    update(metric)
+    return fig
+
+
+def plot_engagement_distribution(df: pd.DataFrame, limit: int, start: Any = None, end: Any = None) -> None:
+    """Show a histogram for tweet engagement (likes, reposts, replies) with clipping.
+
+    Allows switching between metrics using an interactive radio button UI.
 
-    update('likes')
+    Preconditions:
+    - `df` must contain numeric columns: 'likes', 'reposts', and 'replies'.
+    - `limit` > 0
+    """
+    draw_engagement_distribution(prepare_engagement_distribution(df, limit, start, end))
     plt.show()
 
 
-def plot_reply_leaderboard(df: pd.DataFrame, top_n: int = 15) -> None:
+@traced
+def prepare_reply_leaderboard(df: pd.DataFrame, top_n: int = 15, start: Any = None, end: Any = None) -> pd.Series:
+    """Return the total replies received by the top_n users of df.
+
+    Preconditions:
+    - `df` must contain 'user_posted' and 'replies' columns.
+    - `top_n` > 0
+    """
+    return _top_users_by(df, 'replies', top_n, start, end)
+
+
+@traced
+def draw_reply_leaderboard(reply_sums: pd.Series) -> Figure:
+    """Draw the Series returned by prepare_reply_leaderboard as a bar chart on a new figure and return it."""
+    fig = plt.figure(figsize=(12, 6))
+    reply_sums.plot(kind='bar', color='orange')
+    plt.title(f"Top {len(reply_sums)} Users by Total Replies Received")
+    plt.ylabel("Replies")
+    plt.xlabel("User")
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    return fig
+
+
+def plot_reply_leaderboard(df: pd.DataFrame, top_n: int = 15, start: Any = None, end: Any = None) -> None:
     """Display a bar chart of users who received the most replies.
 
     Aggregates total replies received per user and visualizes the top N.
@@ -182,47 +304,155 @@ def plot_reply_leaderboard(df: pd.DataFrame, top_n: int = 15) -> None:
     - `df` must contain 'user_posted' and 'replies' columns.
     - `top_n` > 0
     """
-    reply_sums = df.groupby(USER_COL)['replies'].sum().sort_values(ascending=False).head(top_n)
+    reply_sums = prepare_reply_leaderboard(df, top_n, start, end)
 
     if reply_sums.empty:
         print("No reply data available.")
         return
 
-    plt.figure(figsize=(12, 6))
-    reply_sums.plot(kind='bar', color='orange')
-    plt.title(f"Top {top_n} Users by Total Replies Received")
-    plt.ylabel("Replies")
-    plt.xlabel("User")
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    draw_reply_leaderboard(reply_sums)
     plt.show()
 
 
-def generate_hashtag_wordcloud(df: pd.DataFrame) -> None:
-    """Generate and display a word cloud of all hashtags used in the dataset.
+@traced
+def prepare_hashtag_wordcloud(df: pd.DataFrame, start: Any = None, end: Any = None) -> Optional[WordCloud]:
+    """Return a word cloud of all hashtags used in df, or None if there are none.
 
-    Size of each hashtag is proportional to its frequency. Hashtags are split, stripped, and filtered from nulls.
+    Each hashtag is sized by its number of occurrences, counted from the TagIndex of df (or from the
+    per-day hashtag counts of df when a time window is given).
 
     Preconditions:
     - `df` must contain a 'hashtags' column with comma-separated values.
     """
+    hashtags = get_tag_index(df).hashtags
+    if start is None and end is None:
+        counts = hashtags.counts()
+    else:
+        counts = window_hashtag_counts(df, start, end)
+    used = (counts > 0) & ~_nan_tokens(hashtags.vocab)
+    return _frequency_wordcloud(dict(zip(hashtags.vocab[used], counts[used].tolist())))
 
-    all_hashtags = df[HASHTAG_COL].dropna().str.split(',').explode().str.strip()
-    text = ' '.join(tag for tag in all_hashtags if tag.lower() != 'nan')
-    if not text:
-        print("No hashtags available for word cloud.")
-        return
 
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-    plt.figure(figsize=(10, 6))
+@traced
+def prepare_file_hashtag_wordcloud(file_path: str, chunksize: int = STREAM_CHUNKSIZE,
+                                   capacity: Optional[int] = None) -> Optional[WordCloud]:
+    """Return a word cloud of all hashtags used in the CSV file at file_path, or None if there are none.
+
+    The hashtags are counted while streaming the file in chunks of chunksize rows, so it is never loaded
+    as a whole. If capacity is given, only capacity counters are kept (see sketches.SpaceSaving), which
+    bounds memory; a capacity well above the number of words drawn keeps the largest words exact in practice.
+
+    Preconditions:
+    - chunksize > 0
+    - capacity is None or capacity > 0
+    """
+    return prepare_counted_hashtag_wordcloud(stream_token_counts(file_path, HASHTAG_COL, chunksize, capacity))
+
+
+@traced
+def prepare_counted_hashtag_wordcloud(counts: Union[Counter, SpaceSaving]) -> Optional[WordCloud]:
+    """Return a word cloud of the hashtag counts in counts (as returned by sketches.stream_token_counts),
+    or None if there are none.
+    """
+    return _frequency_wordcloud({tag: count for tag, count in counts.most_common() if tag.lower() != 'nan'})
+
+
+def _frequency_wordcloud(frequencies: dict[str, int]) -> Optional[WordCloud]:
+    """Return a word cloud sized by the given hashtag frequencies, or None if there are none."""
+    from wordcloud import WordCloud  # only this view needs it, so keep it out of the module import
+
+    if not frequencies:
+        return None
+    return WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(frequencies)
+
+
+@traced
+def draw_hashtag_wordcloud(wordcloud: WordCloud) -> Figure:
+    """Draw the word cloud returned by prepare_hashtag_wordcloud on a new figure and return it."""
+    fig = plt.figure(figsize=(10, 6))
     plt.imshow(wordcloud, interpolation='bilinear')
     plt.axis("off")
     plt.title("Hashtag Word Cloud")
     plt.tight_layout()
+    return fig
+
+
+def generate_hashtag_wordcloud(df: pd.DataFrame, start: Any = None, end: Any = None) -> None:
+    """Generate and display a word cloud of all hashtags used in the dataset.
+
+    Size of each hashtag is proportional to its frequency. Hashtags are split, stripped, and filtered from nulls.
+
+    Preconditions:
+    - `df` must contain a 'hashtags' column with comma-separated values.
+    """
+    wordcloud = prepare_hashtag_wordcloud(df, start=start, end=end)
+    if wordcloud is None:
+        print("No hashtags available for word cloud.")
+        return
+
+    draw_hashtag_wordcloud(wordcloud)
     plt.show()
 
 
-def plot_top_mentioned_users(df: pd.DataFrame, top_n: int = 10) -> None:
+@traced
+def prepare_top_mentioned_users(df: pd.DataFrame, top_n: int = 10, start: Any = None, end: Any = None) -> pd.Series:
+    """Return how often each of the top_n most mentioned users of df was mentioned.
+
+    Preconditions:
+    - `df` must contain a 'tagged_users' column with comma-separated usernames.
+    - `top_n` must be a positive integer.
+    """
+    tagged = _without_nan_tokens(get_tag_index(window_frame(df, start, end)).tagged_tokens)
+    mentioned_counts = pd.Series(tagged.counts(), index=tagged.vocab)
+    mentioned_counts = mentioned_counts[mentioned_counts > 0]
+    return mentioned_counts.sort_values(ascending=False).head(top_n)
+
+
+@traced
+def prepare_file_top_mentioned_users(file_path: str, top_n: int = 10, chunksize: int = STREAM_CHUNKSIZE,
+                                     capacity: Optional[int] = None) -> pd.Series:
+    """Return how often each of the top_n most mentioned users of the CSV file at file_path was mentioned,
+    in the format of prepare_top_mentioned_users.
+
+    The mentions are counted while streaming the file in chunks of chunksize rows. If capacity is given,
+    only capacity counters are kept (see sketches.SpaceSaving), so memory stays flat however many distinct
+    users are mentioned, and the counts shown may overcount by at most the number of mentions / capacity.
+
+    Preconditions:
+    - top_n > 0
+    - chunksize > 0
+    - capacity is None or capacity > 0
+    """
+    return prepare_counted_top_mentioned_users(stream_token_counts(file_path, TAGGED_USERS_COL, chunksize, capacity),
+                                               top_n)
+
+
+@traced
+def prepare_counted_top_mentioned_users(counts: Union[Counter, SpaceSaving], top_n: int = 10) -> pd.Series:
+    """Return the top_n most mentioned users in counts (the 'tagged_users' token counts returned by
+    sketches.stream_token_counts), in the format of prepare_top_mentioned_users.
+
+    Preconditions:
+    - top_n > 0
+    """
+    top = [(user, count) for user, count in counts.most_common() if user.lower() != 'nan'][:top_n]
+    return pd.Series(dict(top), dtype=np.int64)
+
+
+@traced
+def draw_top_mentioned_users(top_mentions: pd.Series) -> Figure:
+    """Draw the Series returned by prepare_top_mentioned_users as a bar chart on a new figure and return it."""
+    fig = plt.figure(figsize=(10, 6))
+    top_mentions.plot(kind='bar', color='skyblue')
+    plt.title(f"Top {len(top_mentions)} Most Mentioned Users")
+    plt.ylabel("Times Mentioned")
+    plt.xlabel("User")
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    return fig
+
+
+def plot_top_mentioned_users(df: pd.DataFrame, top_n: int = 10, start: Any = None, end: Any = None) -> None:
     """Visualize the most frequently mentioned users in a bar chart.
 
     Mentions are parsed from the 'tagged_users' column.
@@ -231,31 +461,43 @@ def plot_top_mentioned_users(df: pd.DataFrame, top_n: int = 10) -> None:
     - `df` must contain a 'tagged_users' column with comma-separated usernames.
     - `top_n` must be a positive integer.
     """
-    mentioned_counts = Counter()
+    top_mentions = prepare_top_mentioned_users(df, top_n, start, end)
 
-    for tags in df[TAGGED_USERS_COL].dropna():
-        for tag in str(tags).split(','):
-            tag = tag.strip()
-            if tag and tag.lower() != 'nan':
-                mentioned_counts[tag] += 1
-
-    if not mentioned_counts:
+    if top_mentions.empty:
         print("No mentions found.")
         return
 
-    top_mentions = pd.Series(dict(mentioned_counts)).sort_values(ascending=False).head(top_n)
+    draw_top_mentioned_users(top_mentions)
+    plt.show()
 
-    plt.figure(figsize=(10, 6))
-    top_mentions.plot(kind='bar', color='skyblue')
-    plt.title(f"Top {top_n} Most Mentioned Users")
-    plt.ylabel("Times Mentioned")
+
+@traced
+def prepare_influence_scores(df: pd.DataFrame, top_n: int = 10, start: Any = None, end: Any = None) -> Optional[pd.Series]:
+    """Return the total influence score (likes + reposts + replies) of the top_n users of df,
+    or None if df is missing one of the engagement columns.
+
+    Preconditions:
+    - `top_n` > 0
+    """
+    if not all(col in df.columns for col in ENGAGEMENT_METRICS):
+        return None
+    return _top_users_by(df, 'influence', top_n, start, end)
+
+
+@traced
+def draw_influence_scores(influence_scores: pd.Series) -> Figure:
+    """Draw the Series returned by prepare_influence_scores as a bar chart on a new figure and return it."""
+    fig = plt.figure(figsize=(10, 6))
+    influence_scores.plot(kind='bar', color='mediumseagreen')
+    plt.title(f"Top {len(influence_scores)} Users by Total Influence Score")
+    plt.ylabel("Influence (likes + reposts + replies)")
     plt.xlabel("User")
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
+    return fig
 
 
-def plot_influence_scores(df: pd.DataFrame, top_n: int = 10) -> None:
+def plot_influence_scores(df: pd.DataFrame, top_n: int = 10, start: Any = None, end: Any = None) -> None:
     """Calculate and plot influence scores (likes + reposts + replies) for users.
 
     Users are ranked by total engagement to show top influencers.
@@ -264,32 +506,70 @@ def plot_influence_scores(df: pd.DataFrame, top_n: int = 10) -> None:
     - `df` must contain columns: 'likes', 'reposts', 'replies', and 'user_posted'.
     - `top_n` > 0
     """
-    if not all(col in df.columns for col in ['likes', 'reposts', 'replies']):
+    influence_scores = prepare_influence_scores(df, top_n, start, end)
+
+    if influence_scores is None:
         print("Missing one or more engagement columns: likes, reposts, replies.")
         return
-
-    df_copy = df.copy()
-    df_copy['influence'] = df_copy[['likes', 'reposts', 'replies']].sum(axis=1)
-    influence_scores = df_copy.groupby(USER_COL)['influence'].sum().sort_values(ascending=False).head(top_n)
-
     if influence_scores.empty:
         print("No influence data available.")
         return
 
-    plt.figure(figsize=(10, 6))
-    influence_scores.plot(kind='bar', color='mediumseagreen')
-    plt.title(f"Top {top_n} Users by Total Influence Score")
-    plt.ylabel("Influence (likes + reposts + replies)")
-    plt.xlabel("User")
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    draw_influence_scores(influence_scores)
     plt.show()
 
 
+def _set_communities(graph: nx.Graph, communities: Communities, nodes: np.ndarray) -> None:
+    """Set the 'community' attribute of each of nodes in graph that has a community in communities."""
+    labels = communities.as_series()
+    labels = labels[labels.index.isin(nodes)]
+    nx.set_node_attributes(graph, dict(zip(labels.index, labels.tolist())), 'community')
+
+
+def _node_colors(graph: nx.Graph, nodes: list, default: str) -> list:
+    """Return the color of each of nodes: the color of its community for the COMMUNITY_COLORS largest
+    communities, grey for the other communities, and default if it has no 'community' attribute.
+    """
+    palette = plt.get_cmap('tab10')
+    colors = []
+    for node in nodes:
+        community = graph.nodes[node].get('community')
+        if community is None:
+            colors.append(default)
+        else:
+            colors.append(palette(community) if community < COMMUNITY_COLORS else 'lightgrey')
+    return colors
+
+
+def _clean_hashtag(tag: str) -> str:
+    """Return tag lowercased, keeping only alphanumeric characters, '#' and '_'."""
+    return ''.join(c for c in tag.lower() if c.isalnum() or c in {'#', '_'})
+
+
+def _without_nan_tokens(column: ExplodedColumn) -> ExplodedColumn:
+    """Return column without tokens that spell 'nan' in any letter case."""
+    return column.select(~_nan_tokens(column.vocab))
+
+
+def _nan_tokens(vocab: np.ndarray) -> np.ndarray:
+    """Return a mask of the tokens of vocab that spell 'nan' in any letter case."""
+    return np.array([token.lower() == 'nan' for token in vocab], dtype=bool)
+
+
+def _top_users_by(df: pd.DataFrame, metric: str, top_n: int, start: Any, end: Any) -> pd.Series:
+    """Return the top_n users of df by the total of metric, over the posts of [start, end) if either is given."""
+    if start is None and end is None:
+        return top_users_by(df, metric, top_n)
+    return window_top_users(df, metric, top_n, start, end)
+
+
 if __name__ == "__main__":
+    import python_ta
 
     python_ta.check_all(config={
-        'extra-imports': ['pandas', 'networkx', 'matplotlib.pyplot', 'matplotlib.widgets', 'wordcloud', 'collections'],
+        'extra-imports': ['pandas', 'networkx', 'matplotlib.pyplot', 'matplotlib.widgets', 'matplotlib.figure', 'wordcloud',
+                          'collections', 'typing', 'numpy', 'aggregates', 'communities', 'cooccurrence', 'instrumentation', 'layouts',
+                          'preprocess', 'sketches', 'time_index'],
         'allowed-io': ['plot_influence_scores', 'plot_top_mentioned_users', 'generate_hashtag_wordcloud',
                        'plot_reply_leaderboard', 'plot_hashtag_cooccurrence', 'plot_user_hashtag_graph'],
         'max-line-length': 160,
@@ -0,0 +1,278 @@
+"""CSC111 Final Project: Twitter Preprocessing
+
+Module Description
+==================
+This module parses the list-valued columns of the Twitter dataset ('hashtags' and 'tagged_users') once into an
+integer-coded, exploded representation that every plotter and graph builder shares.
+
+Each parsed column is stored as an ExplodedColumn: a CSR-style offsets array over the rows of the DataFrame, the
+integer code of every token, and an interning table (vocab) mapping codes back to strings. Parsing is done on the
+distinct cell values only, so repeated cells cost a single parse.
+
+Derived data is cached per DataFrame object through cached_for_frame, so a frame is parsed at most once no matter
+how many analyses are run on it. Frames are treated as read-only once they have been handed to an analysis.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+from __future__ import annotations
+import json
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+import numpy as np
+import pandas as pd
+from instrumentation import count, traced
+
+HASHTAG_COL = "hashtags"
+TAGGED_USERS_COL = "tagged_users"
+
+# (id of frame, key) -> (number of rows when cached, cached value)
+_FRAME_CACHE: dict[tuple[int, str], tuple[int, Any]] = {}
+_FRAME_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class ExplodedColumn:
+    """A list-valued column exploded into integer codes.
+
+    Instance Attributes:
+    - offsets: int64 array of length n_rows + 1; the tokens of row i are codes[offsets[i]:offsets[i + 1]].
+    - codes: int32 array with the vocab index of every token, in row order.
+    - vocab: object array of the distinct token strings, in order of first appearance.
+
+    Representation Invariants:
+    - self.offsets[0] == 0 and self.offsets[-1] == len(self.codes)
+    - all(0 <= code < len(self.vocab) for code in self.codes)
+    """
+    offsets: np.ndarray
+    codes: np.ndarray
+    vocab: np.ndarray
+
+    @property
+    def n_rows(self) -> int:
+        """Return the number of rows of the DataFrame this column was parsed from."""
+        return len(self.offsets) - 1
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Return the row position of every token, aligned with self.codes."""
+        return np.repeat(np.arange(self.n_rows, dtype=np.int32), np.diff(self.offsets))
+
+    @property
+    def values(self) -> np.ndarray:
+        """Return the string of every token, aligned with self.codes."""
+        return self.vocab[self.codes]
+
+    def counts(self) -> np.ndarray:
+        """Return the number of occurrences of every vocab entry."""
+        return np.bincount(self.codes, minlength=len(self.vocab))
+
+    def row_tokens(self, row: int) -> np.ndarray:
+        """Return the token strings of the given row position."""
+        return self.vocab[self.codes[self.offsets[row]:self.offsets[row + 1]]]
+
+    def select(self, keep: np.ndarray) -> ExplodedColumn:
+        """Return a copy keeping only the tokens whose vocab entry is marked True in keep.
+
+        The vocab is left unchanged, so codes remain comparable with this column.
+
+        Preconditions:
+        - len(keep) == len(self.vocab)
+        """
+        kept = keep[self.codes]
+        per_row = np.bincount(self.rows[kept], minlength=self.n_rows)
+        return ExplodedColumn(_offsets_from_lengths(per_row), self.codes[kept], self.vocab)
+
+    def select_rows(self, row_mask: np.ndarray) -> ExplodedColumn:
+        """Return a copy keeping only the tokens of the rows marked True in row_mask.
+
+        Preconditions:
+        - len(row_mask) == self.n_rows
+        """
+        lengths = np.diff(self.offsets)
+        kept = np.repeat(row_mask, lengths)
+        return ExplodedColumn(_offsets_from_lengths(np.where(row_mask, lengths, 0)), self.codes[kept], self.vocab)
+
+    def take(self, rows: np.ndarray) -> ExplodedColumn:
+        """Return the column made of the given row positions of this one, in the given order.
+
+        The vocab is left unchanged, so codes remain comparable with this column.
+        """
+        lengths = self.offsets[rows + 1] - self.offsets[rows]
+        offsets = _offsets_from_lengths(lengths)
+        positions = np.repeat(self.offsets[rows] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return ExplodedColumn(offsets, self.codes[positions], self.vocab)
+
+    def remap(self, normalize: Callable[[str], str]) -> ExplodedColumn:
+        """Return a copy with every vocab entry passed through normalize and re-interned.
+
+        The function is applied once per distinct token rather than once per occurrence. Tokens that
+        normalize to the empty string are dropped.
+        """
+        new_codes, new_vocab = pd.factorize(pd.Series([normalize(token) for token in self.vocab], dtype=object))
+        new_vocab = np.asarray(new_vocab, dtype=object)
+        empty = np.flatnonzero(new_vocab == "")
+        old_to_new = new_codes.astype(np.int32)
+        if len(empty) > 0:
+            old_to_new[old_to_new == empty[0]] = -1
+            old_to_new[old_to_new > empty[0]] -= 1
+            new_vocab = np.delete(new_vocab, empty[0])
+        mapped = old_to_new[self.codes]
+        kept = mapped >= 0
+        per_row = np.bincount(self.rows[kept], minlength=self.n_rows)
+        return ExplodedColumn(_offsets_from_lengths(per_row), mapped[kept], new_vocab)
+
+
+@dataclass
+class TagIndex:
+    """The parsed list-valued columns of one DataFrame.
+
+    Instance Attributes:
+    - hashtags: the 'hashtags' cells split on commas, stripped, without empty and 'nan' tokens.
+    - tagged_tokens: the 'tagged_users' cells split on commas in the same way.
+    - mentions: the 'profile_name' entries of the 'tagged_users' cells parsed as JSON lists of objects.
+    """
+    hashtags: ExplodedColumn
+    tagged_tokens: ExplodedColumn
+    mentions: ExplodedColumn
+
+
+def cached_for_frame(df: pd.DataFrame, key: str, build: Callable[[pd.DataFrame], Any]) -> Any:
+    """Return build(df), computing it only the first time it is requested for this DataFrame object.
+
+    The cached value is dropped when df is garbage collected, and is recomputed if the number of rows
+    of df has changed since it was cached. Safe to call from several threads; two threads asking for
+    the same uncached value at once may both build it.
+    """
+    cache_key = (id(df), key)
+    entry = _FRAME_CACHE.get(cache_key)
+    if entry is not None and entry[0] == len(df):
+        return entry[1]
+
+    value = build(df)
+    with _FRAME_CACHE_LOCK:
+        if not any(frame_id == id(df) for frame_id, _ in _FRAME_CACHE):
+            weakref.finalize(df, _forget_frame, id(df))
+        _FRAME_CACHE[cache_key] = (len(df), value)
+    return value
+
+
+def peek_cached(df: pd.DataFrame, key: str) -> Optional[Any]:
+    """Return the value cached for df under key by cached_for_frame, or None if there is none."""
+    entry = _FRAME_CACHE.get((id(df), key))
+    return entry[1] if entry is not None and entry[0] == len(df) else None
+
+
+def _forget_frame(frame_id: int) -> None:
+    """Drop every cached value of the DataFrame with the given id."""
+    with _FRAME_CACHE_LOCK:
+        for cache_key in [cache_key for cache_key in _FRAME_CACHE if cache_key[0] == frame_id]:
+            del _FRAME_CACHE[cache_key]
+
+
+def get_tag_index(df: pd.DataFrame) -> TagIndex:
+    """Return the TagIndex of df, parsing its list-valued columns on first use only.
+
+    Preconditions:
+    - df contains 'hashtags' and 'tagged_users' columns
+    """
+    return cached_for_frame(df, "tag_index", build_tag_index)
+
+
+def take_tag_index(index: TagIndex, rows: np.ndarray) -> TagIndex:
+    """Return the TagIndex of the frame made of the given row positions of the frame index was built from."""
+    return TagIndex(index.hashtags.take(rows), index.tagged_tokens.take(rows), index.mentions.take(rows))
+
+
+@traced
+def build_tag_index(df: pd.DataFrame) -> TagIndex:
+    """Parse the 'hashtags' and 'tagged_users' columns of df into a TagIndex.
+
+    Preconditions:
+    - df contains 'hashtags' and 'tagged_users' columns
+    """
+    count("rows", len(df))
+    return TagIndex(
+        hashtags=explode_column(df[HASHTAG_COL], split_tokens),
+        tagged_tokens=explode_column(df[TAGGED_USERS_COL], split_tokens),
+        mentions=explode_column(df[TAGGED_USERS_COL], parse_profile_names),
+    )
+
+
+def split_tokens(value: Any) -> list[str]:
+    """Split a comma-separated cell into stripped tokens, leaving out empty and 'nan' tokens."""
+    tokens = []
+    for token in str(value).split(','):
+        token = token.strip()
+        if token and token != 'nan':
+            tokens.append(token)
+    return tokens
+
+
+def parse_profile_names(value: Any) -> list[str]:
+    """Return the 'profile_name' entries of a cell holding a JSON list of objects.
+
+    Malformed cells yield no names.
+    """
+    try:
+        mentions = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(mentions, list):
+        return []
+    return [m['profile_name'] for m in mentions
+            if isinstance(m, dict) and isinstance(m.get('profile_name'), str)]
+
+
+def explode_column(column: pd.Series, parse: Callable[[Any], list[str]]) -> ExplodedColumn:
+    """Parse every non-null cell of column with parse and intern the resulting tokens.
+
+    parse is called once per distinct cell value; rows sharing a value share its parse.
+    """
+    cell_codes, distinct = pd.factorize(column)
+    parsed = [parse(value) for value in distinct]
+
+    # Tokens of the distinct values, laid out back to back.
+    distinct_lengths = np.fromiter((len(tokens) for tokens in parsed), dtype=np.int64, count=len(parsed))
+    distinct_offsets = _offsets_from_lengths(distinct_lengths)
+    token_codes, vocab = pd.factorize(pd.Series([t for tokens in parsed for t in tokens], dtype=object))
+    token_codes = token_codes.astype(np.int32)
+
+    # Gather each row's slice of the distinct-value tokens.
+    present = cell_codes >= 0
+    row_lengths = np.zeros(len(cell_codes), dtype=np.int64)
+    row_lengths[present] = distinct_lengths[cell_codes[present]]
+    offsets = _offsets_from_lengths(row_lengths)
+    starts = np.zeros(len(cell_codes), dtype=np.int64)
+    starts[present] = distinct_offsets[cell_codes[present]]
+    positions = np.repeat(starts - offsets[:-1], row_lengths) + np.arange(offsets[-1])
+
+    return ExplodedColumn(offsets, token_codes[positions], np.asarray(vocab, dtype=object))
+
+
+def _offsets_from_lengths(lengths: np.ndarray) -> np.ndarray:
+    """Return the CSR offsets array for the given per-row lengths."""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['json', 'threading', 'weakref', 'dataclasses', 'typing', 'numpy', 'pandas',
+                          'instrumentation'],  # the names (strs) of imported modules
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
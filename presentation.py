@@ -0,0 +1,74 @@
+"""CSC111 Final Project: Twitter Result Presentation
+
+Module Description
+==================
+This module turns the structured results returned by the metrics module into text for display.
+
+The analysis functions return ranked pandas Series instead of printing, so their results can be cached,
+serialized or shown by any front end; this module is the thin layer that formats them for the console
+and the GUI text windows.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+import pandas as pd
+from metrics import compute_pagerank, top_users
+
+
+def format_pagerank(ranking: pd.Series) -> str:
+    """Return the PageRank ranking as one 'user: score' line per user.
+
+    Preconditions:
+    - ranking was returned by metrics.compute_pagerank
+    """
+    lines = ["Top Influential Users by PageRank:"]
+    lines.extend(f"{user}: {score:.4f}" for user, score in ranking.items())
+    return "\n".join(lines) + "\n"
+
+
+def format_top_users(ranking: pd.Series) -> str:
+    """Return the engagement ranking as a titled two-column table.
+
+    Preconditions:
+    - ranking was returned by metrics.top_users
+    """
+    return f"Top Users by {str(ranking.name).capitalize()}:\n{ranking.to_string()}\n"
+
+
+def show_pagerank(df: pd.DataFrame, top_n: int = 10) -> None:
+    """Print the top top_n users of df by PageRank.
+
+    Preconditions:
+    - `top_n` must be a positive integer.
+    """
+    print("\n" + format_pagerank(compute_pagerank(df, top_n)), end="")
+
+
+def show_top_users(df: pd.DataFrame, metric: str, top_n: int = 10) -> None:
+    """Print the top top_n users of df by the engagement metric, or a message if it is not a column of df.
+
+    Preconditions:
+    - `top_n` >= 0
+    """
+    try:
+        print("\n" + format_top_users(top_users(df, metric, top_n)), end="")
+    except ValueError as error:
+        print(error)
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['pandas', 'metrics'],  # the names (strs) of imported modules
+        'allowed-io': ['show_pagerank', 'show_top_users'],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
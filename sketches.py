@@ -0,0 +1,528 @@
+"""CSC111 Final Project: Streaming Token Counts and Sketches
+
+Module Description
+==================
+This module counts the tokens of a list-valued column (such as 'hashtags') straight from the CSV file, one
+chunk at a time, so the counts of a file of any size can be computed without loading it as a DataFrame.
+
+Each chunk is parsed with the same rules as the shared TagIndex and reduced to per-token counts before it is
+merged into the running totals. The totals are either exact (a Counter, whose size grows with the number of
+distinct tokens only) or a Space-Saving summary that keeps a fixed number of counters, so memory stays flat
+however large the input grows. Both answer most_common(n).
+
+Two more fixed-size sketches answer other questions approximately: HyperLogLog estimates the number of
+distinct tokens (such as distinct users), and a Count-Min sketch estimates the count of any given token.
+All three sketches are updated with the per-token counts of a chunk, can be merged with a sketch of the same
+configuration built from another shard, and can be saved to and loaded from an .npz file. Their size is
+chosen when they are created, and each reports its memory use and its error bound; report_sketch_accuracy
+compares them with the exact counts of a file.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+from __future__ import annotations
+import math
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, Union
+import numpy as np
+import pandas as pd
+from data_loader import shard_paths
+from preprocess import HASHTAG_COL, explode_column, split_tokens
+
+STREAM_CHUNKSIZE = 100_000
+# Sketch configurations compared by report_sketch_accuracy
+REPORT_CAPACITIES = (100, 1_000, 10_000)
+REPORT_PRECISIONS = (10, 12, 14)
+REPORT_EPSILONS = (1.0e-3, 1.0e-4)
+
+
+class SpaceSaving:
+    """Approximate counts of the most frequent tokens of a stream, kept in a fixed number of counters.
+
+    This is the Space-Saving algorithm of Metwally, Agrawal and El Abbadi, applied to batches of counts:
+    a token that is not monitored takes over the counter of the least counted token once all counters are
+    in use. The estimate of a monitored token never undercounts, and overcounts by at most its error, which
+    is at most total / capacity. Every token occurring more than total / capacity times is monitored.
+
+    Instance Attributes:
+    - capacity: the number of counters kept.
+    - total: the total count of all tokens seen.
+
+    Representation Invariants:
+    - self.capacity > 0
+    - len(self._counts) <= self.capacity
+    - (self._errors <= self._counts).all()
+    """
+    capacity: int
+    total: int
+    # token -> estimated count, and token -> largest possible overcount of that estimate
+    _counts: pd.Series
+    _errors: pd.Series
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty summary with capacity counters.
+
+        Preconditions:
+        - capacity > 0
+        """
+        self.capacity = capacity
+        self.total = 0
+        self._counts = pd.Series(dtype=np.int64)
+        self._errors = pd.Series(dtype=np.int64)
+
+    def update(self, counts: pd.Series) -> None:
+        """Add counts (indexed by token, with positive integer values) to the summary."""
+        self.total += int(counts.sum())
+        floor = int(self._counts.min()) if len(self._counts) >= self.capacity else 0
+        known = counts.index.isin(self._counts.index)
+
+        updated = self._counts + counts[known].reindex(self._counts.index, fill_value=0)
+        new = counts[~known].astype(np.int64) + floor
+        all_counts = pd.concat([updated, new])
+        all_errors = pd.concat([self._errors, pd.Series(floor, index=new.index, dtype=np.int64)])
+
+        keep = np.argsort(-all_counts.to_numpy(), kind="stable")[:self.capacity]
+        self._counts = all_counts.iloc[keep]
+        self._errors = all_errors.iloc[keep]
+
+    def most_common(self, n: Optional[int] = None) -> list[tuple[str, int]]:
+        """Return the n tokens with the highest estimated counts (all monitored tokens if n is None)
+        and their estimates, from most to least common.
+        """
+        ranked = self._counts.sort_values(ascending=False, kind="stable")
+        if n is not None:
+            ranked = ranked.head(n)
+        return list(zip(ranked.index, ranked.tolist()))
+
+    def error(self, token: str) -> int:
+        """Return the largest possible overcount of the estimate of token, or the smallest estimate kept
+        if token is not monitored (its true count is at most that).
+        """
+        if token in self._errors.index:
+            return int(self._errors[token])
+        return int(self._counts.min()) if len(self._counts) >= self.capacity else 0
+
+    def merge(self, other: SpaceSaving) -> None:
+        """Add the summary other (of a disjoint part of the stream) to this summary.
+
+        A token monitored by only one of the summaries is counted with the smallest estimate kept by the
+        other (0 if the other is not full), and that is added to its error, so the guarantees above still hold.
+
+        Preconditions:
+        - other.capacity == self.capacity
+        """
+        floors = [int(summary._counts.min()) if len(summary._counts) >= summary.capacity else 0
+                  for summary in (self, other)]
+        tokens = self._counts.index.union(other._counts.index, sort=False)
+        all_counts = (self._counts.reindex(tokens, fill_value=floors[0])
+                      + other._counts.reindex(tokens, fill_value=floors[1]))
+        all_errors = (self._errors.reindex(tokens, fill_value=floors[0])
+                      + other._errors.reindex(tokens, fill_value=floors[1]))
+
+        keep = np.argsort(-all_counts.to_numpy(), kind="stable")[:self.capacity]
+        self._counts = all_counts.iloc[keep].astype(np.int64)
+        self._errors = all_errors.iloc[keep].astype(np.int64)
+        self.total += other.total
+
+    @property
+    def error_bound(self) -> float:
+        """Return the largest possible overcount of any estimate, total / capacity."""
+        return self.total / self.capacity
+
+    def memory_bytes(self) -> int:
+        """Return the number of bytes taken by the counters, including the monitored token strings."""
+        return int(self._counts.memory_usage(deep=True) + self._errors.memory_usage(deep=False))
+
+    def save(self, path: str) -> None:
+        """Write the summary to path, in the .npz format."""
+        _save_arrays(path, kind="space_saving", capacity=self.capacity, total=self.total,
+                     tokens=np.array(self._counts.index, dtype=str), counts=self._counts.to_numpy(),
+                     errors=self._errors.to_numpy())
+
+    @classmethod
+    def load(cls, path: str) -> SpaceSaving:
+        """Return the summary written to path by save."""
+        data = _load_arrays(path, "space_saving")
+        summary = cls(int(data["capacity"]))
+        summary.total = int(data["total"])
+        tokens = pd.Index(data["tokens"].astype(object))
+        summary._counts = pd.Series(data["counts"], index=tokens, dtype=np.int64)
+        summary._errors = pd.Series(data["errors"], index=tokens, dtype=np.int64)
+        return summary
+
+
+class HyperLogLog:
+    """An estimate of the number of distinct tokens of a stream, kept in 2 ** precision one-byte registers.
+
+    This is the HyperLogLog algorithm of Flajolet, Fusy, Gandouet and Meunier, with the linear counting
+    correction for small counts. Every token is hashed to 64 bits; the first precision bits choose a
+    register, which keeps the largest position of the first 1 bit among the remaining bits of its tokens.
+    The relative standard error of the estimate is about 1.04 / sqrt(2 ** precision).
+
+    Instance Attributes:
+    - precision: the base-2 logarithm of the number of registers.
+
+    Representation Invariants:
+    - 4 <= self.precision <= 18
+    - len(self._registers) == 2 ** self.precision
+    """
+    precision: int
+    _registers: np.ndarray
+
+    def __init__(self, precision: int = 14) -> None:
+        """Initialize an empty sketch with 2 ** precision registers.
+
+        Preconditions:
+        - 4 <= precision <= 18
+        """
+        self.precision = precision
+        self._registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def update(self, counts: pd.Series) -> None:
+        """Add the tokens in the index of counts to the sketch (how often each occurred does not matter)."""
+        hashes = _hash_tokens(counts.index, 0)
+        rest_bits = 64 - self.precision
+        registers = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        ranks = (rest_bits + 1 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self._registers, registers, ranks)
+
+    def merge(self, other: HyperLogLog) -> None:
+        """Add the tokens of the sketch other to this sketch.
+
+        Preconditions:
+        - other.precision == self.precision
+        """
+        np.maximum(self._registers, other._registers, out=self._registers)
+
+    def estimate(self) -> int:
+        """Return the estimated number of distinct tokens added to the sketch."""
+        size = len(self._registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(size, 0.7213 / (1 + 1.079 / size))
+        raw = alpha * size ** 2 / np.sum(np.ldexp(1.0, -self._registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self._registers == 0))
+        if raw <= 2.5 * size and empty > 0:
+            return round(size * math.log(size / empty))
+        return round(raw)
+
+    @property
+    def relative_error(self) -> float:
+        """Return the relative standard error of the estimate, 1.04 / sqrt(2 ** precision)."""
+        return 1.04 / math.sqrt(len(self._registers))
+
+    def memory_bytes(self) -> int:
+        """Return the number of bytes taken by the registers."""
+        return self._registers.nbytes
+
+    def save(self, path: str) -> None:
+        """Write the sketch to the .npz file at path."""
+        _save_arrays(path, kind="hyperloglog", precision=self.precision, registers=self._registers)
+
+    @classmethod
+    def load(cls, path: str) -> HyperLogLog:
+        """Return the sketch written to path by save."""
+        data = _load_arrays(path, "hyperloglog")
+        sketch = cls(int(data["precision"]))
+        sketch._registers = data["registers"].astype(np.uint8)
+        return sketch
+
+
+class CountMinSketch:
+    """Approximate counts of every token of a stream, kept in a depth-by-width table of counters.
+
+    This is the Count-Min sketch of Cormode and Muthukrishnan: each row of the table adds the count of a
+    token to one counter chosen by a hash of the token, and the estimate of a token is the smallest of its
+    counters. An estimate never undercounts, and with probability at least 1 - exp(-depth) it overcounts by
+    at most e / width times the total count.
+
+    Instance Attributes:
+    - width: the number of counters in each row.
+    - depth: the number of rows.
+    - seed: the seed of the hash functions; only sketches with the same seed can be merged.
+    - total: the total count of all tokens seen.
+
+    Representation Invariants:
+    - self.width > 0 and self.depth > 0
+    - self._table.shape == (self.depth, self.width)
+    """
+    width: int
+    depth: int
+    seed: int
+    total: int
+    _table: np.ndarray
+
+    def __init__(self, width: int = 2 ** 14, depth: int = 4, seed: int = 0) -> None:
+        """Initialize an empty sketch of depth rows of width counters.
+
+        Preconditions:
+        - width > 0 and depth > 0
+        - 0 <= seed < 10 ** 16
+        """
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.total = 0
+        self._table = np.zeros((depth, width), dtype=np.int64)
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float, seed: int = 0) -> CountMinSketch:
+        """Return an empty sketch whose estimates overcount by at most epsilon times the total count with
+        probability at least 1 - delta.
+
+        Preconditions:
+        - 0 < epsilon < 1 and 0 < delta < 1
+        """
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)), seed)
+
+    def update(self, counts: pd.Series) -> None:
+        """Add counts (indexed by token, with positive integer values) to the sketch."""
+        columns = self._columns(counts.index)
+        values = counts.to_numpy(dtype=np.float64)
+        for row in range(self.depth):
+            self._table[row] += np.bincount(columns[row], weights=values, minlength=self.width).astype(np.int64)
+        self.total += int(counts.sum())
+
+    def estimate(self, tokens: Any) -> np.ndarray:
+        """Return the estimated count of each of tokens."""
+        columns = self._columns(pd.Index(tokens, dtype=object))
+        return self._table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: CountMinSketch) -> None:
+        """Add the counts of the sketch other to this sketch.
+
+        Preconditions:
+        - (other.width, other.depth, other.seed) == (self.width, self.depth, self.seed)
+        """
+        self._table += other._table
+        self.total += other.total
+
+    @property
+    def error_bound(self) -> float:
+        """Return the overcount that an estimate stays within with probability at least 1 - exp(-depth)."""
+        return math.e / self.width * self.total
+
+    def memory_bytes(self) -> int:
+        """Return the number of bytes taken by the table."""
+        return self._table.nbytes
+
+    def save(self, path: str) -> None:
+        """Write the sketch to the .npz file at path."""
+        _save_arrays(path, kind="count_min", seed=self.seed, total=self.total, table=self._table)
+
+    @classmethod
+    def load(cls, path: str) -> CountMinSketch:
+        """Return the sketch written to path by save."""
+        data = _load_arrays(path, "count_min")
+        depth, width = data["table"].shape
+        sketch = cls(width, depth, int(data["seed"]))
+        sketch.total = int(data["total"])
+        sketch._table = data["table"].astype(np.int64)
+        return sketch
+
+    def _columns(self, tokens: pd.Index) -> np.ndarray:
+        """Return the depth-by-len(tokens) array of the counter of each token in each row, from two 32-bit
+        halves h1 and h2 of one 64-bit hash as h1 + row * h2 (the Kirsch-Mitzenmacher construction).
+        """
+        hashes = _hash_tokens(tokens, self.seed)
+        low, high = hashes & np.uint64(0xFFFFFFFF), hashes >> np.uint64(32)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((low + rows * high) % np.uint64(self.width)).astype(np.int64)
+
+
+Sketch = Union[SpaceSaving, HyperLogLog, CountMinSketch]
+
+
+def _hash_tokens(tokens: pd.Index, seed: int) -> np.ndarray:
+    """Return a 64-bit hash of every token, the same in every process for the same seed."""
+    return pd.util.hash_array(np.asarray(tokens, dtype=object), hash_key=f"{seed:016d}")
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Return the number of bits needed to write each of the uint64 values (0 for 0)."""
+    high = np.frexp((values >> np.uint64(32)).astype(np.float64))[1]
+    low = np.frexp((values & np.uint64(0xFFFFFFFF)).astype(np.float64))[1]
+    return np.where(high > 0, high + 32, low)
+
+
+def _save_arrays(path: str, **arrays: Any) -> None:
+    """Write arrays to path in the .npz format. path is used as given (np.savez would append '.npz' to it)."""
+    with open(path, "wb") as file:
+        np.savez(file, **arrays)
+
+
+def _load_arrays(path: str, kind: str) -> dict[str, np.ndarray]:
+    """Return the arrays of the sketch of the given kind saved at path.
+    Raise a ValueError if path holds another kind of sketch.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    if str(arrays.get("kind")) != kind:
+        raise ValueError(f"'{path}' does not contain a {kind} sketch.")
+    return arrays
+
+
+def chunk_token_counts(column: pd.Series, parse: Callable[[Any], list[str]] = split_tokens) -> pd.Series:
+    """Return the number of occurrences of every token of column, with each cell parsed by parse like the
+    TagIndex (by default as comma-separated tokens).
+    """
+    tokens = explode_column(column, parse)
+    counts = pd.Series(tokens.counts(), index=tokens.vocab)
+    return counts[counts > 0]
+
+
+def stream_token_counts(file_path: str, column: str = HASHTAG_COL, chunksize: int = STREAM_CHUNKSIZE,
+                        capacity: Optional[int] = None) -> Union[Counter, SpaceSaving]:
+    """Return the counts of the tokens of column in the CSV file at file_path, reading chunksize rows at a time.
+
+    Only column is read from the file. The counts are exact (a Counter) if capacity is None, and a
+    SpaceSaving summary with capacity counters otherwise.
+
+    Preconditions:
+    - chunksize > 0
+    - capacity is None or capacity > 0
+    """
+    totals = Counter() if capacity is None else SpaceSaving(capacity)
+    for chunk in pd.read_csv(file_path, usecols=[column], dtype={column: "object"}, chunksize=chunksize):
+        counts = chunk_token_counts(chunk[column])
+        if capacity is None:
+            totals.update(dict(zip(counts.index, counts.tolist())))
+        else:
+            totals.update(counts)
+    return totals
+
+
+def stream_sketches(file_path: str, sketches: list[Sketch], column: str = HASHTAG_COL,
+                    chunksize: int = STREAM_CHUNKSIZE) -> list[Sketch]:
+    """Update every sketch of sketches with the token counts of column in the CSV file at file_path, reading
+    chunksize rows at a time, and return sketches.
+
+    Preconditions:
+    - chunksize > 0
+    """
+    stream_column_sketches(file_path, [(column, split_tokens, sketches)], chunksize)
+    return sketches
+
+
+def stream_column_sketches(file_path: str, plan: list[tuple[str, Callable[[Any], list[str]], list[Sketch]]],
+                           chunksize: int = STREAM_CHUNKSIZE) -> None:
+    """For every (column, parse, sketches) entry of plan, update every sketch of sketches with the token counts
+    of column in the CSV file at file_path, with each cell parsed by parse.
+
+    The file is read once, chunksize rows at a time, and only the columns named in plan are read. Entries
+    with the same column and parse share the counts of each chunk.
+
+    Preconditions:
+    - chunksize > 0
+    """
+    columns = sorted({column for column, _, _ in plan})
+    for chunk in pd.read_csv(file_path, usecols=columns, dtype=dict.fromkeys(columns, "object"), chunksize=chunksize):
+        chunk_counts = {}
+        for column, parse, sketches in plan:
+            if (column, parse) not in chunk_counts:
+                chunk_counts[column, parse] = chunk_token_counts(chunk[column], parse)
+            for sketch in sketches:
+                sketch.update(chunk_counts[column, parse])
+
+
+def shard_sketches(source: str, sketches: list[Sketch], column: str = HASHTAG_COL, workers: Optional[int] = None,
+                   chunksize: int = STREAM_CHUNKSIZE) -> list[Sketch]:
+    """Update every sketch of sketches with the token counts of column in every shard named by source
+    (see data_loader.shard_paths), and return sketches. Each shard is sketched from an empty copy of the
+    sketches in its own worker process, and the results are merged into sketches.
+
+    Rows repeated across shards are counted once per shard (distinct counts are unaffected).
+
+    Raise a ValueError if no shard matches source.
+
+    Preconditions:
+    - workers is None or workers > 0
+    - chunksize > 0
+    """
+    paths = shard_paths(source)
+    if not paths:
+        raise ValueError(f"No CSV shards match '{source}'. Please check the directory or pattern.")
+    empty = [_empty_like(sketch) for sketch in sketches]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [executor.submit(stream_sketches, path, empty, column, chunksize) for path in paths]
+        for job in jobs:
+            for sketch, shard_sketch in zip(sketches, job.result()):
+                sketch.merge(shard_sketch)
+    return sketches
+
+
+def _empty_like(sketch: Sketch) -> Sketch:
+    """Return an empty sketch with the same configuration as sketch, which can be merged into it."""
+    if isinstance(sketch, SpaceSaving):
+        return SpaceSaving(sketch.capacity)
+    if isinstance(sketch, HyperLogLog):
+        return HyperLogLog(sketch.precision)
+    return CountMinSketch(sketch.width, sketch.depth, sketch.seed)
+
+
+def report_sketch_accuracy(file_path: str, column: str = HASHTAG_COL, top_n: int = 10,
+                           chunksize: int = STREAM_CHUNKSIZE) -> None:
+    """Sketch column of the CSV file at file_path with every configuration in REPORT_CAPACITIES,
+    REPORT_PRECISIONS and REPORT_EPSILONS and print the memory, error bound and actual error of each
+    compared with the exact counts.
+
+    The actual error is the relative error of the distinct count for HyperLogLog, and the largest
+    overcount among the exact top_n tokens for Space-Saving and Count-Min; the Space-Saving line also
+    shows how many of the exact top_n tokens are among its top_n.
+
+    Preconditions:
+    - top_n > 0
+    - chunksize > 0
+    """
+    exact = Counter()
+    sketches = ([SpaceSaving(capacity) for capacity in REPORT_CAPACITIES]
+                + [HyperLogLog(precision) for precision in REPORT_PRECISIONS]
+                + [CountMinSketch.from_error(epsilon, 0.01) for epsilon in REPORT_EPSILONS])
+    for chunk in pd.read_csv(file_path, usecols=[column], dtype={column: "object"}, chunksize=chunksize):
+        counts = chunk_token_counts(chunk[column])
+        exact.update(dict(zip(counts.index, counts.tolist())))
+        for sketch in sketches:
+            sketch.update(counts)
+
+    top = [token for token, _ in exact.most_common(top_n)]
+    top_counts = np.array([exact[token] for token in top], dtype=np.int64)
+    exact_memory = sys.getsizeof(exact) + sum(sys.getsizeof(token) + sys.getsizeof(count) for token, count in exact.items())
+    print(f"\n{len(exact):,} distinct tokens, {sum(exact.values()):,} occurrences "
+          f"(exact Counter: about {exact_memory / 1024:,.0f} KB)")
+    print(f"{'Sketch':<30}{'Memory (KB)':>12}{'Bound':>12}{'Error':>12}{'Top-' + str(top_n):>8}")
+    for sketch in sketches:
+        if isinstance(sketch, SpaceSaving):
+            estimates = dict(sketch.most_common())
+            error = max(estimates.get(token, 0) - exact[token] for token in top)
+            found = len(set(top) & {token for token, _ in sketch.most_common(top_n)})
+            name, bound, actual = f"SpaceSaving({sketch.capacity})", f"{sketch.error_bound:,.0f}", f"{error:,}"
+            recall = f"{found}/{len(top)}"
+        elif isinstance(sketch, HyperLogLog):
+            error = abs(sketch.estimate() - len(exact)) / max(len(exact), 1)
+            name, bound, actual = f"HyperLogLog({sketch.precision})", f"{sketch.relative_error:.2%}", f"{error:.2%}"
+            recall = ""
+        else:
+            error = int((sketch.estimate(top) - top_counts).max()) if top else 0
+            name, bound, actual = f"CountMin({sketch.width}x{sketch.depth})", f"{sketch.error_bound:,.0f}", f"{error:,}"
+            recall = ""
+        print(f"{name:<30}{sketch.memory_bytes() / 1024:>12,.1f}{bound:>12}{actual:>12}{recall:>8}")
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['math', 'sys', 'collections', 'concurrent.futures', 'typing', 'numpy', 'pandas', 'data_loader',
+                          'preprocess'],  # the names (strs) of imported modules
+        'allowed-io': ['report_sketch_accuracy', '_save_arrays'],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })
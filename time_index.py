@@ -0,0 +1,334 @@
+"""CSC111 Final Project: Time-Windowed Analytics
+
+Module Description
+==================
+This module lets the analyses be scoped to a time window [start, end) of the 'date_posted' column.
+
+A TimeIndex is built once per DataFrame: the positions of the dated rows sorted by post time, so the rows of any
+window are found by two binary searches. On top of it, per-day engagement totals per user and per-day hashtag
+counts are pre-aggregated, so a window is answered from the day totals of the whole days it covers plus the
+individual rows of the partial days at its edges; narrow windows cost proportionally less than wide ones.
+
+Analyses that need the rows themselves (graphs, PageRank) run on window_frame, the sub-frame of the window,
+which is cached per parent frame so that its parsed hashtags and aggregates are shared between analyses. Only
+the WINDOW_CACHE_SIZE most recently used windows of a frame are kept, so sliding windows do not pile up.
+Timestamps without a time zone are taken to be UTC; rows without a valid date fall outside every window.
+
+Copyright and Usage Information
+===============================
+
+This file is part of a group project submitted for CSC111 at the University of Toronto St. George campus.
+It is intended for grading purposes by course instructors and teaching assistants only.
+
+All other forms of distribution, publication, or external use of this code are strictly prohibited
+without the explicit written permission of the project group.
+
+This file is Copyright (c) 2025 CSC111 Project Group: Elena Ding, Nehan Punjani, Raphael Ramesar, Joey Lai
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from aggregates import AGGREGATED_METRICS, ENGAGEMENT_COLUMNS, USER_COL, get_user_aggregates, top_from_aggregates
+from preprocess import cached_for_frame, get_tag_index, peek_cached, take_tag_index
+
+DATE_COL = "date_posted"
+DAY_NS = 86_400 * 10 ** 9
+# Number of window frames (with their derived data) kept per parent frame
+WINDOW_CACHE_SIZE = 8
+
+_WINDOW_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class TimeIndex:
+    """The dated rows of one DataFrame in order of post time.
+
+    Instance Attributes:
+    - order: int64 row positions of the rows with a valid date, sorted by date (ties keep row order).
+    - times: int64 nanoseconds since the epoch (UTC) of the rows in order.
+    - days: the distinct UTC day numbers (days since the epoch) of the rows, ascending.
+    - day_starts: int64 array of length len(days) + 1; the rows of days[i] are order[day_starts[i]:day_starts[i + 1]].
+
+    Representation Invariants:
+    - len(self.order) == len(self.times) == self.day_starts[-1]
+    - all(self.times[i] <= self.times[i + 1] for i in range(len(self.times) - 1))
+    """
+    order: np.ndarray
+    times: np.ndarray
+    days: np.ndarray
+    day_starts: np.ndarray
+
+    def bounds(self, start: Optional[int], end: Optional[int]) -> tuple[int, int]:
+        """Return the slice [lo, hi) of self.order holding the rows posted in [start, end) (in nanoseconds).
+        A bound of None leaves that side of the window open.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.times, start, side="left"))
+        hi = len(self.times) if end is None else int(np.searchsorted(self.times, end, side="left"))
+        return lo, max(lo, hi)
+
+    def split(self, lo: int, hi: int) -> tuple[tuple[int, int], tuple[int, int], tuple[int, int]]:
+        """Split the slice [lo, hi) of self.order into a leading partial day, a run of whole days and a
+        trailing partial day. Return ((lo, a), (first_day, last_day), (b, hi)), where the whole days are
+        self.days[first_day:last_day] and cover self.order[a:b].
+        """
+        first_day = int(np.searchsorted(self.day_starts, lo, side="left"))
+        last_day = int(np.searchsorted(self.day_starts, hi, side="right")) - 1
+        if first_day >= last_day:
+            return (lo, hi), (0, 0), (hi, hi)
+        return (lo, int(self.day_starts[first_day])), (first_day, last_day), (int(self.day_starts[last_day]), hi)
+
+
+@dataclass
+class DailyEngagement:
+    """The engagement totals of every user on every day of one DataFrame.
+
+    Instance Attributes:
+    - user_codes: int64 position in the per-user aggregate table of the user of every row (-1 if none).
+    - values: float64 array with the likes, reposts, replies and influence of every row (missing values as 0).
+    - day_offsets: int64 array of length len(TimeIndex.days) + 1 over the entries, grouped by day.
+    - entry_users: int64 user code of every (day, user) entry.
+    - entry_values: float64 totals of AGGREGATED_METRICS of every entry.
+    """
+    user_codes: np.ndarray
+    values: np.ndarray
+    day_offsets: np.ndarray
+    entry_users: np.ndarray
+    entry_values: np.ndarray
+
+
+def get_time_index(df: pd.DataFrame) -> TimeIndex:
+    """Return the TimeIndex of df, building it on first use only.
+
+    Preconditions:
+    - df contains a 'date_posted' column
+    """
+    return cached_for_frame(df, "time_index", build_time_index)
+
+
+def build_time_index(df: pd.DataFrame) -> TimeIndex:
+    """Sort the rows of df with a valid 'date_posted' value by date into a TimeIndex.
+
+    Raise a ValueError if df has no 'date_posted' column.
+    """
+    if DATE_COL not in df.columns:
+        raise ValueError(f"Column '{DATE_COL}' not found in dataset.")
+    stamps = pd.DatetimeIndex(pd.to_datetime(df[DATE_COL], utc=True, errors="coerce")).as_unit("ns")
+    dated = np.flatnonzero(~stamps.isna())
+    ns = stamps.asi8[dated]
+    sort = np.argsort(ns, kind="stable")
+    order, times = dated[sort].astype(np.int64), ns[sort]
+
+    day_numbers = times // DAY_NS
+    days, first = np.unique(day_numbers, return_index=True)
+    day_starts = np.append(first, len(times)).astype(np.int64)
+    return TimeIndex(order, times, days, day_starts)
+
+
+def to_nanoseconds(moment: Any) -> Optional[int]:
+    """Return moment (anything pd.Timestamp accepts, or None) as nanoseconds since the epoch in UTC."""
+    if moment is None:
+        return None
+    stamp = pd.Timestamp(moment)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize("UTC")
+    return int(stamp.as_unit("ns").value)
+
+
+def window_rows(df: pd.DataFrame, start: Any = None, end: Any = None) -> np.ndarray:
+    """Return the positions of the rows of df posted in [start, end), in row order."""
+    index = get_time_index(df)
+    lo, hi = index.bounds(to_nanoseconds(start), to_nanoseconds(end))
+    return np.sort(index.order[lo:hi])
+
+
+def window_frame(df: pd.DataFrame, start: Any = None, end: Any = None) -> pd.DataFrame:
+    """Return the rows of df posted in [start, end) as a new frame with a fresh RangeIndex, or df itself if
+    both bounds are None.
+
+    The frames of the WINDOW_CACHE_SIZE most recently used windows are cached per df, so analyses of the
+    same window share its derived data; older windows are dropped along with their derived data.
+    """
+    if start is None and end is None:
+        return df
+    key = (to_nanoseconds(start), to_nanoseconds(end))
+    windows = cached_for_frame(df, "windows", lambda _: OrderedDict())
+    with _WINDOW_CACHE_LOCK:
+        if key in windows:
+            windows.move_to_end(key)
+            return windows[key]
+
+    window = _build_window_frame(df, start, end)
+    with _WINDOW_CACHE_LOCK:
+        windows[key] = window
+        while len(windows) > WINDOW_CACHE_SIZE:
+            windows.popitem(last=False)
+    return window
+
+
+def _build_window_frame(df: pd.DataFrame, start: Any, end: Any) -> pd.DataFrame:
+    """Return the rows of df posted in [start, end), deriving the window's TagIndex from that of df if it
+    has already been built (the frames of a dataset store have no text columns to parse it from).
+    """
+    rows = window_rows(df, start, end)
+    window = df.iloc[rows].reset_index(drop=True)
+    tag_index = peek_cached(df, "tag_index")
+    if tag_index is not None:
+        cached_for_frame(window, "tag_index", lambda _: take_tag_index(tag_index, rows))
+    return window
+
+
+def get_daily_engagement(df: pd.DataFrame) -> DailyEngagement:
+    """Return the per-day, per-user engagement totals of df, building them on first use only.
+
+    Preconditions:
+    - df contains 'date_posted', 'user_posted', 'likes', 'reposts' and 'replies' columns
+    """
+    return cached_for_frame(df, "daily_engagement", build_daily_engagement)
+
+
+def build_daily_engagement(df: pd.DataFrame) -> DailyEngagement:
+    """Sum the engagement of df per day and user.
+
+    Preconditions:
+    - df contains 'date_posted', 'user_posted', 'likes', 'reposts' and 'replies' columns
+    """
+    index = get_time_index(df)
+    table = get_user_aggregates(df)
+    user_codes = table.index.get_indexer(df[USER_COL]).astype(np.int64)
+    values = np.nan_to_num(df[ENGAGEMENT_COLUMNS].to_numpy(dtype=np.float64))
+    values = np.column_stack([values, values.sum(axis=1)])
+
+    # One entry per distinct (day, user) pair, keyed as day * n_users + user so that entries sort by day
+    n_users = max(len(table), 1)
+    users = user_codes[index.order]
+    has_user = users >= 0
+    day_of_row = np.repeat(np.arange(len(index.days), dtype=np.int64), np.diff(index.day_starts))
+    keys, inverse = np.unique(day_of_row[has_user] * n_users + users[has_user], return_inverse=True)
+    row_values = values[index.order[has_user]]
+    entry_values = np.column_stack([np.bincount(inverse, weights=row_values[:, i], minlength=len(keys))
+                                    for i in range(len(AGGREGATED_METRICS))]).reshape(len(keys), len(AGGREGATED_METRICS))
+
+    day_offsets = np.searchsorted(keys // n_users, np.arange(len(index.days) + 1), side="left").astype(np.int64)
+    return DailyEngagement(user_codes, values, day_offsets, keys % n_users, entry_values)
+
+
+def window_top_users(df: pd.DataFrame, metric: str, top_n: int = 10, start: Any = None, end: Any = None) -> pd.Series:
+    """Return the top_n users of df by the total of metric over the posts in [start, end), named after
+    the metric, in the same format and tie order as aggregates.top_users_by.
+
+    Whole days of the window are read from the per-day totals and only its partial days row by row.
+
+    Preconditions:
+    - metric in AGGREGATED_METRICS
+    - top_n >= 0
+    """
+    index = get_time_index(df)
+    daily = get_daily_engagement(df)
+    table = get_user_aggregates(df)
+    column = AGGREGATED_METRICS.index(metric)
+
+    (lo, a), (first_day, last_day), (b, hi) = index.split(*index.bounds(to_nanoseconds(start), to_nanoseconds(end)))
+    rows = np.concatenate([index.order[lo:a], index.order[b:hi]])
+    rows = rows[daily.user_codes[rows] >= 0]
+    entries = slice(daily.day_offsets[first_day], daily.day_offsets[last_day])
+
+    users = np.concatenate([daily.user_codes[rows], daily.entry_users[entries]])
+    totals = np.bincount(users, weights=np.concatenate([daily.values[rows, column], daily.entry_values[entries, column]]),
+                         minlength=len(table))
+    active = np.zeros(len(table), dtype=bool)
+    active[users] = True
+
+    dtype = table[f"{metric}_sum"].dtype
+    windowed = pd.DataFrame({f"{metric}_sum": totals[active].astype(dtype)}, index=table.index[active])
+    return top_from_aggregates(windowed, f"{metric}_sum", top_n).rename(metric)
+
+
+def get_daily_hashtag_counts(df: pd.DataFrame) -> sparse.csr_matrix:
+    """Return the day-by-hashtag matrix of hashtag counts of df, over the days of its TimeIndex and the vocab
+    of its TagIndex hashtags, building it on first use only.
+
+    Preconditions:
+    - df contains 'date_posted', 'hashtags' and 'tagged_users' columns
+    """
+    return cached_for_frame(df, "daily_hashtag_counts", build_daily_hashtag_counts)
+
+
+def build_daily_hashtag_counts(df: pd.DataFrame) -> sparse.csr_matrix:
+    """Count the hashtags of df per day.
+
+    Preconditions:
+    - df contains 'date_posted', 'hashtags' and 'tagged_users' columns
+    """
+    index = get_time_index(df)
+    hashtags = get_tag_index(df).hashtags
+    day_of_row = np.full(hashtags.n_rows, -1, dtype=np.int64)
+    day_of_row[index.order] = np.repeat(np.arange(len(index.days)), np.diff(index.day_starts))
+    token_days = day_of_row[hashtags.rows]
+    dated = token_days >= 0
+    counts = sparse.csr_matrix((np.ones(int(dated.sum()), dtype=np.int64), (token_days[dated], hashtags.codes[dated])),
+                               shape=(len(index.days), len(hashtags.vocab)))
+    counts.sum_duplicates()
+    return counts
+
+
+def window_hashtag_counts(df: pd.DataFrame, start: Any = None, end: Any = None) -> np.ndarray:
+    """Return the number of occurrences of every TagIndex hashtag of df in the posts of [start, end).
+
+    Whole days of the window are read from the per-day counts and only its partial days row by row.
+    """
+    index = get_time_index(df)
+    hashtags = get_tag_index(df).hashtags
+    daily = get_daily_hashtag_counts(df)
+
+    (lo, a), (first_day, last_day), (b, hi) = index.split(*index.bounds(to_nanoseconds(start), to_nanoseconds(end)))
+    counts = np.asarray(daily[first_day:last_day].sum(axis=0)).ravel().astype(np.int64)
+    for rows in (index.order[lo:a], index.order[b:hi]):
+        counts += hashtags.take(rows).counts()
+    return counts
+
+
+def trending_hashtags(df: pd.DataFrame, end: Any = None, window: Any = "1D", top_n: int = 10,
+                      min_count: int = 5) -> pd.DataFrame:
+    """Return the hashtags of df whose use grew the most in the window of length window ending at end
+    (the latest post if None), compared with the window of the same length just before it.
+
+    The result has one row per hashtag, indexed by hashtag, with 'count' (uses in the window), 'previous'
+    (uses in the previous window) and 'growth' ((count + 1) / (previous + 1)) columns, sorted by growth and
+    then count. Only hashtags used at least min_count times in the window are considered. Calling this for
+    successive values of end gives a sliding-window view of trending hashtags.
+
+    Preconditions:
+    - window is a positive duration accepted by pd.Timedelta
+    - top_n >= 0 and min_count >= 1
+    """
+    index = get_time_index(df)
+    length = pd.Timedelta(window).as_unit("ns").value
+    if end is not None:
+        end_ns = to_nanoseconds(end)
+    else:
+        end_ns = int(index.times[-1]) + 1 if len(index.times) > 0 else 0
+    current = window_hashtag_counts(df, end_ns - length, end_ns)
+    previous = window_hashtag_counts(df, end_ns - 2 * length, end_ns - length)
+
+    candidates = np.flatnonzero(current >= min_count)
+    growth = (current[candidates] + 1) / (previous[candidates] + 1)
+    ranked = candidates[np.lexsort((-current[candidates], -growth))][:top_n]
+    return pd.DataFrame({"count": current[ranked], "previous": previous[ranked],
+                         "growth": (current[ranked] + 1) / (previous[ranked] + 1)},
+                        index=pd.Index(get_tag_index(df).hashtags.vocab[ranked], name="hashtag"))
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['threading', 'collections', 'dataclasses', 'typing', 'numpy', 'pandas', 'scipy', 'aggregates',
+                          'preprocess'],
+        'allowed-io': [],     # the names (strs) of functions that call print/open/input
+        'max-line-length': 130
+    })